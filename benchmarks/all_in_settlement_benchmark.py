@@ -0,0 +1,88 @@
+"""
+Run PYTHONPATH=. python benchmarks/all_in_settlement_benchmark.py from root directory
+
+Measures how much all_in_settlement cuts the variance of a simulation: a loose
+and a tight push/fold player (deterministic, so both see the same decisions on
+every deck) play the same seeded decks heads-up with 100 big blind stacks reset
+every hand, settled by the single dealt runout, RunItTimes and EquityChop.
+Reports the loose player's win rate in bb/hand with its standard error, the
+hands needed for the same error relative to a single runout, and hands/s.
+"""
+import argparse
+import statistics
+import time
+from poker_engine import evaluate_hand, table_evaluator # builds the tables up front
+from poker_engine.action_type import ActionType
+from poker_engine.all_in_settlement import EquityChop, RunItTimes
+from poker_engine.cards import Card
+from poker_engine.hand_manager import HandManager
+from poker_engine.players import Player
+from poker_engine.rng import make_rng
+
+BLINDS = [1, 2]
+STACK = 200
+
+def loose(player: Player) -> bool:
+    # any pair, any ace, two cards ten or higher
+    high, low = sorted(card.val for card in player.hands)[::-1]
+    return high == low or high == 12 or low >= 8
+
+def tight(player: Player) -> bool:
+    # eights or better, ace king, ace queen
+    high, low = sorted(card.val for card in player.hands)[::-1]
+    return high == low >= 6 or high == 12 and low >= 10
+
+def play(decks: list[list[int]], settlement) -> list[int]:
+    '''Net chips of the loose player (seat 0) per hand, the seats swap blinds every hand'''
+    nets = []
+    for i, deck in enumerate(decks):
+        players = [Player(STACK), Player(STACK)]
+        ranges = {id(players[0]): loose, id(players[1]): tight}
+        hand = HandManager(players, i % 2, BLINDS, deck=deck, all_in_settlement=settlement)
+        while not hand.is_complete():
+            curr_round = hand.betting_round()
+            state = next(curr_round)
+            try:
+                while True:
+                    options, player = state["options"], state["player"]
+                    if options[ActionType.ALL_IN] and ranges[id(player)](player):
+                        action = ActionType.ALL_IN
+                    elif options[ActionType.CALL] and state["current_bet"] == player.money_in:
+                        action = ActionType.CALL # check
+                    else:
+                        action = ActionType.FOLD
+                    state = curr_round.send({"action": action})
+            except StopIteration:
+                pass
+        nets.append(players[0].balance - STACK)
+    return nets
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--hands", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=2, help="boards dealt by RunItTimes")
+    parser.add_argument("--exact-budget", type=int, default=2_000, help="EquityChop boards")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--evaluator", choices=evaluate_hand.EVALUATORS, default="table")
+    args = parser.parse_args()
+
+    evaluate_hand.set_evaluator(args.evaluator)
+    rng = make_rng(args.seed)
+    decks = [rng.sample(Card.ALL_CARDS_ID, Card.DECK_SIZE) for _ in range(args.hands)]
+    baseline_variance = None
+    for name, settlement in (
+        ("single runout", None),
+        (f"run it {args.runs} times", RunItTimes(args.runs)),
+        ("equity chop", EquityChop(args.exact_budget))
+    ):
+        start = time.perf_counter()
+        nets = play(decks, settlement)
+        elapsed = time.perf_counter() - start
+        mean, variance = statistics.fmean(nets), statistics.variance(nets)
+        baseline_variance = baseline_variance or variance
+        print(f"{name:<18} {mean / BLINDS[1]:+.4f} bb/hand +- {(variance / len(nets)) ** 0.5 / BLINDS[1]:.4f}"
+              f"   hands for the same error x{variance / baseline_variance:.3f}"
+              f"   {len(nets) / elapsed:>9,.0f} hands/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Run PYTHONPATH=. python benchmarks/async_game_runner_benchmark.py from root directory
+
+Load test of AsyncGameRunner: hosts many tables of fake remote players in one
+event loop. Each fake client answers after a random think time (a small share
+never answers and hits the action timeout) and reports tables per process,
+decisions per second and the p50 / p99 action latency overhead (time from the
+turn starting to the action being applied, minus the client's think time).
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional
+from poker_engine.action_type import ActionType
+from poker_engine.async_game_runner import AsyncGameRunner
+from poker_engine.players import Player
+from poker_engine.poker_manager import PokerManager
+from poker_engine.rng import derive_seed, make_rng
+
+class FakeClients:
+    '''Plays the remote seats of one table: calls, with random think times and some no-shows'''
+    def __init__(self, think: float, no_show: float, rng: random.Random, overheads: list[float]):
+        self.think = think
+        self.no_show = no_show
+        self.rng = rng
+        self.overheads = overheads
+        self._pending: Optional[tuple[float, float]] = None
+
+    async def on_player_turn(self, state, hand_status, game_status) -> dict:
+        start = time.perf_counter()
+        if self.rng.random() < self.no_show:
+            await asyncio.sleep(3600) # cancelled by the action timeout
+        delay = self.rng.uniform(0, 2 * self.think)
+        await asyncio.sleep(delay)
+        self._pending = (start, delay)
+        options = state["options"]
+        return {"action": ActionType.CALL if options[ActionType.CALL] else ActionType.ALL_IN}
+
+    def applied(self, *_):
+        # the previous action has been applied once the next turn or round starts
+        if self._pending is not None:
+            start, delay = self._pending
+            self.overheads.append(time.perf_counter() - start - delay)
+            self._pending = None
+
+async def run(args) -> tuple[int, float, list[float], list[AsyncGameRunner]]:
+    rng = make_rng(args.seed)
+    overheads: list[float] = []
+    runners = [
+        AsyncGameRunner(
+            PokerManager([5, 10], [Player(10 ** 6) for _ in range(args.players)],
+                         rng=make_rng(derive_seed(args.seed, table))),
+            action_timeout=args.timeout_ms / 1000
+        )
+        for table in range(args.tables)
+    ]
+    tables = [FakeClients(args.think_ms / 1000, args.no_show, rng, overheads) for _ in runners]
+    start = time.perf_counter()
+    hands = await asyncio.gather(*(
+        runner.play_game(clients.on_player_turn, clients.applied, on_round_end=clients.applied,
+                         max_hands=args.hands)
+        for runner, clients in zip(runners, tables)
+    ))
+    return sum(hands), time.perf_counter() - start, overheads, runners
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--tables", type=int, default=2_000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--hands", type=int, default=3, help="hands per table")
+    parser.add_argument("--think-ms", type=float, default=50, help="mean client think time")
+    parser.add_argument("--timeout-ms", type=float, default=500)
+    parser.add_argument("--no-show", type=float, default=0.001, help="share of actions never answered")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    hands, elapsed, overheads, runners = asyncio.run(run(args))
+    timeouts = sum(runner.timeouts for runner in runners)
+    decisions = len(overheads) + timeouts
+    overheads = [overhead * 1000 for overhead in overheads]
+    print(f"{args.tables:,} tables of {args.players} in one process: {hands:,} hands, "
+          f"{decisions:,} decisions in {elapsed:.1f}s "
+          f"({decisions / elapsed:,.0f} decisions/s, {timeouts:,} timed out)")
+    print(f"Action latency overhead p50 {percentile(overheads, 0.5):.2f}ms, "
+          f"p99 {percentile(overheads, 0.99):.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Run PYTHONPATH=. python benchmarks/batch_evaluator_benchmark.py from root directory
+
+Cross-checks the NumPy batch evaluator against the scalar lookup-table evaluator on
+a sample of hands and showdowns, then times evaluate_batch on --hands random
+7-card hands (10M by default).
+"""
+import argparse
+import time
+import numpy as np
+from poker_engine.cards import Card
+from poker_engine.evaluate_hand import strength_to_int
+from poker_engine import batch_evaluator, table_evaluator
+
+def random_card_ids(rng: np.random.Generator, n: int, card_num: int) -> np.ndarray:
+    return np.argsort(rng.random((n, Card.DECK_SIZE)), axis=1)[:, :card_num]
+
+def verify(rng: np.random.Generator, samples: int, players: int):
+    for card_num in (5, 6, 7):
+        hands = random_card_ids(rng, samples, card_num)
+        strengths = batch_evaluator.evaluate_batch(hands)
+        for hand, strength in zip(hands.tolist(), strengths.tolist()):
+            expected = strength_to_int(table_evaluator.evaluate_ids(hand))
+            if strength != expected:
+                raise AssertionError(f"{hand}: scalar {expected}, batch {strength}")
+    deals = random_card_ids(rng, samples, 5 + 2 * players)
+    boards, holes = deals[:, :5], deals[:, 5:].reshape(samples, players, 2)
+    strengths = batch_evaluator.evaluate_showdowns(boards, holes)
+    for board, hole, row in zip(boards.tolist(), holes.tolist(), strengths.tolist()):
+        expected = [strength_to_int(table_evaluator.evaluate_ids(board + cards)) for cards in hole]
+        if row != expected:
+            raise AssertionError(f"{board} {hole}: scalar {expected}, batch {row}")
+    print(f"Batch evaluator agrees with the scalar evaluator on {3 * samples:,} hands "
+          f"and {samples:,} {players}-player showdowns")
+
+def benchmark(rng: np.random.Generator, hands: int, chunk: int):
+    elapsed = 0.0
+    for start in range(0, hands, chunk):
+        card_ids = random_card_ids(rng, min(chunk, hands - start), 7)
+        begin = time.perf_counter()
+        batch_evaluator.evaluate_batch(card_ids)
+        elapsed += time.perf_counter() - begin
+    print(f"evaluate_batch: {hands:,} hands in {elapsed:.2f}s ({hands / elapsed:,.0f} /s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--hands", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    verify(rng, args.samples, args.players)
+    # generating the random hands is excluded from the timings
+    benchmark(rng, args.hands, batch_evaluator.DEFAULT_CHUNK_SIZE)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Run PYTHONPATH=. python benchmarks/batch_runner_benchmark.py from root directory
+
+Throughput of BatchGameRunner against batch size: plays the same tables of
+EquityBots with make_decisions batches of each given size (1 is the same as
+deciding one seat at a time) and reports decisions per second and the mean
+batch size actually reached.
+"""
+import argparse
+import time
+from poker_engine import PokerManagerBuilder
+from poker_engine.batch_runner import BatchGameRunner
+from poker_engine.rng import derive_seed
+from poker_bot.simple_bots import EquityBot
+
+def build_games(args):
+    return [
+        PokerManagerBuilder().with_blinds(5, 10).with_seed(derive_seed(args.seed, table))
+        .add_players(EquityBot(10 ** 6, samples=args.samples, seed=derive_seed(args.seed, table, seat))
+                     for seat in range(args.players)).build()
+        for table in range(args.tables)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--tables", type=int, default=256)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--hands", type=int, default=5, help="hands per table")
+    parser.add_argument("--samples", type=int, default=100, help="equity samples per decision")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.tables} tables of {args.players} EquityBots, {args.hands} hands each, "
+          f"{args.samples} samples per decision")
+    for batch_size in args.batch_sizes:
+        runner = BatchGameRunner(build_games(args), max_batch=batch_size)
+        start = time.perf_counter()
+        hands = sum(runner.play_games(max_hands=args.hands))
+        elapsed = time.perf_counter() - start
+        print(f"max batch {batch_size:>5}: {runner.decisions:,} decisions, {hands:,} hands in {elapsed:.2f}s "
+              f"({runner.decisions / elapsed:,.0f} decisions/s, "
+              f"mean batch {runner.decisions / runner.batches:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Run PYTHONPATH=. python benchmarks/chip_conservation_fuzz.py from root directory
+
+Fuzzes HandManager settlement: plays random hands (2 to 9 players, random and
+often short stacks, random folds, calls, raises and all ins) and checks that
+- no chips are created or lost and no balance goes negative
+- the final balances equal those of GameState, which replays the same actions
+  and settles the side pots independently (GameState.payoffs)
+A share of the hands is dealt a broadway board to force split pots and odd chips.
+With --settlement run_it_twice or equity, all in hands are paid by
+all_in_settlement instead and only the first check applies.
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from poker_engine import evaluate_hand, table_evaluator # builds the tables up front
+from poker_engine.action_type import ActionType
+from poker_engine.all_in_settlement import EquityChop, RunItTimes
+from poker_engine.cards import Card
+from poker_engine.game_state import GameState
+from poker_engine.hand_manager import HandManager
+from poker_engine.players import Player
+from poker_engine.rng import derive_seed
+
+BLINDS = [5, 10]
+_BROADWAY_RANKS = (8, 9, 10, 11, 12) # T J Q K A
+SETTLEMENTS = {"runout": lambda: None, "run_it_twice": lambda: RunItTimes(2), "equity": EquityChop}
+
+def random_deck(rng: random.Random, split_board: float) -> list[int]:
+    if rng.random() >= split_board:
+        return rng.sample(Card.ALL_CARDS_ID, Card.DECK_SIZE)
+    # dealing pops hole cards from the end, the first 5 cards are the board
+    board = [rank * 4 + rng.randrange(4) for rank in _BROADWAY_RANKS]
+    rest = [card for card in Card.ALL_CARDS_ID if card not in board]
+    rng.shuffle(rest)
+    return board + rest
+
+def random_action(rng: random.Random, options: dict) -> dict:
+    roll = rng.random()
+    if roll < 0.15:
+        return {"action": ActionType.FOLD}
+    if roll < 0.3 and options[ActionType.ALL_IN]:
+        return {"action": ActionType.ALL_IN}
+    if roll < 0.5 and options[ActionType.RAISE]:
+        low, high = options[ActionType.RAISE]
+        return {"action": ActionType.RAISE, "amount": rng.randint(low, high)}
+    if options[ActionType.CALL]:
+        return {"action": ActionType.CALL}
+    return {"action": ActionType.ALL_IN if options[ActionType.ALL_IN] else ActionType.FOLD}
+
+def play_hand(rng: random.Random, split_board: float, settlement: str) -> dict:
+    player_num = rng.randint(HandManager.MIN_PLAYERS, HandManager.MAX_PLAYERS)
+    balances = [rng.choice((rng.randint(1, 30), rng.randint(1, 2_000), 500)) for _ in range(player_num)]
+    players = [Player(balance) for balance in balances]
+    hand = HandManager(players, rng.randrange(player_num), BLINDS,
+                       deck=random_deck(rng, split_board),
+                       all_in_settlement=SETTLEMENTS[settlement]())
+    state = GameState.from_hand(hand)
+    while not hand.is_complete():
+        curr_round = hand.betting_round()
+        try:
+            options = next(curr_round)["options"]
+            while True:
+                user_option = random_action(rng, options)
+                state = state.apply(user_option["action"], user_option.get("amount", 0))
+                options = curr_round.send(user_option)["options"]
+        except StopIteration:
+            pass
+    final = [player.balance for player in players]
+    if sum(final) != sum(balances):
+        raise AssertionError(f"Chips not conserved: {balances} -> {final} ({sum(final) - sum(balances):+d})")
+    if min(final) < 0:
+        raise AssertionError(f"Negative balance: {balances} -> {final}")
+    if settlement == "runout" and final != state.payoffs():
+        raise AssertionError(f"Settlement differs from GameState: {final} vs {state.payoffs()} "
+                             f"(stacks {balances}, deck {hand.deck})")
+    pots = {winner["pot_count"] for winner in hand.winners}
+    return {
+        "showdown": hand.winners[0]["hand_strength"] is not None,
+        "side_pots": len(pots) - 1,
+        "split": len(hand.winners) > len(pots)
+    }
+
+def fuzz(seed: int, hands: int, split_board: float, settlement: str) -> dict:
+    rng = random.Random(seed)
+    totals = {"hands": 0, "showdowns": 0, "side_pots": 0, "splits": 0}
+    for _ in range(hands):
+        result = play_hand(rng, split_board, settlement)
+        totals["hands"] += 1
+        totals["showdowns"] += result["showdown"]
+        totals["side_pots"] += result["side_pots"]
+        totals["splits"] += result["split"]
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--hands", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk", type=int, default=10_000, help="hands per seeded chunk")
+    parser.add_argument("--split-board", type=float, default=0.1,
+                        help="share of hands dealt a broadway board")
+    parser.add_argument("--evaluator", choices=evaluate_hand.EVALUATORS, default="table")
+    parser.add_argument("--settlement", choices=SETTLEMENTS, default="runout")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    evaluate_hand.set_evaluator(args.evaluator)
+    chunks = [(derive_seed(args.seed, i), min(args.chunk, args.hands - start), args.split_board,
+               args.settlement)
+              for i, start in enumerate(range(0, args.hands, args.chunk))]
+    start = time.perf_counter()
+    totals = {"hands": 0, "showdowns": 0, "side_pots": 0, "splits": 0}
+    with ProcessPoolExecutor(args.workers, initializer=evaluate_hand.set_evaluator,
+                             initargs=(args.evaluator,)) as executor:
+        for result in executor.map(fuzz, *zip(*chunks)):
+            for key, value in result.items():
+                totals[key] += value
+    elapsed = time.perf_counter() - start
+    checked = "conserved chips" + (" and matched GameState" if args.settlement == "runout" else "")
+    print(f"{totals['hands']:,} hands {checked} in {elapsed:.1f}s "
+          f"({totals['hands'] / elapsed:,.0f} hands/s): {totals['showdowns']:,} showdowns, "
+          f"{totals['side_pots']:,} side pots won, {totals['splits']:,} split pots")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Run PYTHONPATH=. python benchmarks/evaluate_hand_benchmark.py from root directory
+
+Cross-checks the lookup-table evaluator against the algorithmic one, then reports
+evaluations per second for both backends.
+- By default a random sample of 7-card hands is verified, pass --exhaustive to walk
+  all 133,784,560 combinations (hours in pure Python)
+- board_evaluator of both backends is checked on the same hands, the last two
+  cards being the hole cards
+- If phevaluator is installed, the ordering of the sampled hands is also checked
+  against it as an independent reference
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from itertools import combinations
+from poker_engine.cards import Card
+from poker_engine.card_mask import CardMask
+from poker_engine.players import Player
+from poker_engine import evaluate_hand, table_evaluator
+
+def algorithmic_evaluate(card_ids) -> tuple:
+    suite_map, rank_map = defaultdict(set), defaultdict(int)
+    for card_id in card_ids:
+        card = Card.get_card(card_id)
+        suite_map[card.suite].add(card.val)
+        rank_map[card.val] += 1
+    return evaluate_hand._get_hand_strength(suite_map, rank_map)
+
+def verify(hands) -> int:
+    checked = 0
+    for card_ids in hands:
+        expected, actual = algorithmic_evaluate(card_ids), table_evaluator.evaluate_ids(card_ids)
+        if expected != actual:
+            raise AssertionError(f"{card_ids}: algorithmic {expected}, table {actual}")
+        if (from_mask := table_evaluator.evaluate_mask(CardMask.from_ids(card_ids))) != expected:
+            raise AssertionError(f"{card_ids}: algorithmic {expected}, table (mask) {from_mask}")
+        # the last two cards as hole cards on a board of the others
+        board, hole = CardMask.from_ids(card_ids[:-2]), CardMask.from_ids(card_ids[-2:])
+        for evaluator in evaluate_hand.EVALUATORS:
+            if (on_board := evaluate_hand.board_evaluator(board, evaluator)(hole)) != expected:
+                raise AssertionError(f"{card_ids}: algorithmic {expected}, {evaluator} board_evaluator {on_board}")
+        checked += 1
+    return checked
+
+def verify_against_phevaluator(hands):
+    try:
+        from phevaluator import evaluate_cards
+    except ImportError:
+        print("phevaluator not installed, skipping reference ordering check")
+        return
+    # phevaluator ranks 1 as the best hand, so the orders must be reversed
+    ours = sorted(hands, key=table_evaluator.evaluate_ids)
+    for prev, curr in zip(ours, ours[1:]):
+        ours_cmp = table_evaluator.evaluate_ids(prev) < table_evaluator.evaluate_ids(curr)
+        theirs_cmp = evaluate_cards(*prev) > evaluate_cards(*curr)
+        if ours_cmp != theirs_cmp:
+            raise AssertionError(f"Ordering differs from phevaluator for {prev} and {curr}")
+    print(f"Ordering of {len(hands)} hands matches phevaluator")
+
+def time_it(label: str, fn, count: int):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {count / elapsed:>14,.0f} /s")
+
+def benchmark(hands, showdowns: int, players_per_showdown: int):
+    time_it("algorithmic evaluations",
+            lambda: [algorithmic_evaluate(hand) for hand in hands], len(hands))
+    time_it("table evaluations",
+            lambda: [table_evaluator.evaluate_ids(hand) for hand in hands], len(hands))
+    masks = [int(CardMask.from_ids(hand)) for hand in hands]
+    time_it("table evaluations (CardMask)",
+            lambda: [table_evaluator.evaluate_mask(mask) for mask in masks], len(masks))
+
+    tables = []
+    for _ in range(showdowns):
+        card_ids = random.sample(Card.ALL_CARDS_ID, 5 + 2 * players_per_showdown)
+        players = [Player(1) for _ in range(players_per_showdown)]
+        for player in players:
+            player.hands = (Card.get_card(card_ids.pop()), Card.get_card(card_ids.pop()))
+        tables.append(([Card.get_card(card_id) for card_id in card_ids], players))
+    for evaluator in evaluate_hand.EVALUATORS:
+        time_it(
+            f"{evaluator} showdowns ({players_per_showdown} players)",
+            lambda: [evaluate_hand.get_players_strength(comm, players, evaluator)
+                     for comm, players in tables],
+            showdowns
+        )
+    # CardMask showdowns as HandManager runs them: every hand on its own vs the board work shared
+    mask_tables = [(int(CardMask.from_cards(comm)), [int(CardMask.from_cards(player.hands)) for player in players])
+                   for comm, players in tables]
+    time_it("table showdowns, evaluate_mask per player",
+            lambda: [[table_evaluator.evaluate_mask(board | hand) for hand in hands]
+                     for board, hands in mask_tables],
+            showdowns)
+    time_it("table showdowns, board_evaluator",
+            lambda: [table_evaluator.get_masks_strength(board, hands) for board, hands in mask_tables],
+            showdowns)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--exhaustive", action="store_true")
+    parser.add_argument("--showdowns", type=int, default=20_000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    hands = [tuple(random.sample(Card.ALL_CARDS_ID, 7)) for _ in range(args.samples)]
+    if args.exhaustive:
+        checked = verify(combinations(Card.ALL_CARDS_ID, 7))
+    else:
+        checked = verify(hands)
+        for card_num in (5, 6):
+            checked += verify(random.sample(Card.ALL_CARDS_ID, card_num)
+                              for _ in range(args.samples // 10))
+    print(f"Table evaluator agrees with the algorithmic evaluator on {checked:,} hands")
+    verify_against_phevaluator(hands[:50_000])
+    benchmark(hands, args.showdowns, args.players)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Run PYTHONPATH=. python benchmarks/game_state_benchmark.py from root directory
+
+Cross-checks GameState against HandManager on random hands (2 to 9 players,
+random stacks, folds, calls, raises and all ins): at every decision the state
+replayed with apply() must equal GameState.from_hand of the live hand and offer
+the same options, and the finished hand must fork into a terminal state paying
+out the final balances. Then times apply() on check-down hands.
+"""
+import argparse
+import random
+import time
+from poker_engine import evaluate_hand, table_evaluator # builds the tables up front
+from poker_engine.action_type import ActionType
+from poker_engine.game_state import GameState
+from poker_engine.hand_manager import HandManager
+from poker_engine.players import Player
+
+BLINDS = [5, 10]
+
+def _fields(state: GameState) -> tuple:
+    # the balance heap may hold the same entries in another order
+    return tuple(sorted(state._balance_heap) if slot == "_balance_heap" else getattr(state, slot)
+                 for slot in GameState.__slots__)
+
+def _random_action(rng: random.Random, options: dict) -> tuple[ActionType, int]:
+    choices = [action for action, allowed in options.items() if allowed]
+    action = rng.choice(choices)
+    return action, rng.randint(*options[action]) if action == ActionType.RAISE else 0
+
+def check_hand(rng: random.Random) -> int:
+    player_num = rng.randint(HandManager.MIN_PLAYERS, HandManager.MAX_PLAYERS)
+    players = [Player(rng.choice((5, 30, 100, 250, 1000))) for _ in range(player_num)]
+    hand = HandManager(players, rng.randrange(player_num), BLINDS, rng=rng)
+    state = GameState.from_hand(hand)
+    decisions = 0
+    while not hand.is_complete():
+        curr_round = hand.betting_round()
+        try:
+            options = next(curr_round)["options"]
+            while True:
+                fork = GameState.from_hand(hand)
+                if _fields(fork) != _fields(state):
+                    raise AssertionError(f"Fork differs from the replayed state at decision {decisions}")
+                if state.legal_actions() != options:
+                    raise AssertionError(f"Options differ: {state.legal_actions()} vs {options}")
+                action, amount = _random_action(rng, options)
+                state = state.apply(action, amount)
+                decisions += 1
+                options = curr_round.send({"action": action, "amount": amount})["options"]
+        except StopIteration:
+            pass
+    final = GameState.from_hand(hand).copy()
+    if not state.is_terminal or not final.is_terminal:
+        raise AssertionError("Finished hand is not terminal")
+    balances = [player.balance for player in players]
+    if state.payoffs() != balances or final.payoffs() != balances:
+        raise AssertionError(f"Payoffs differ: {state.payoffs()} vs {balances}")
+    return decisions
+
+def verify(hands: int, seed: int):
+    rng = random.Random(seed)
+    decisions = sum(check_hand(rng) for _ in range(hands))
+    print(f"GameState matches HandManager on {hands:,} hands ({decisions:,} decisions)")
+
+def benchmark(seconds: float, seed: int):
+    hand = HandManager([Player(1000) for _ in range(6)], 0, BLINDS, rng=random.Random(seed))
+    root = GameState.from_hand(hand)
+    transitions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        state = root
+        while not state.is_terminal:
+            state = state.apply(ActionType.CALL)
+            transitions += 1
+    elapsed = time.perf_counter() - start
+    print(f"apply: {transitions:,} transitions in {elapsed:.2f}s ({transitions / elapsed:,.0f} /s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--hands", type=int, default=3_000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    verify(args.hands, args.seed)
+    benchmark(args.seconds, args.seed)
+
+if __name__ == "__main__":
+    main()
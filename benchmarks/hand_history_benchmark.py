@@ -0,0 +1,51 @@
+"""
+Run PYTHONPATH=. python benchmarks/hand_history_benchmark.py from root directory
+
+Records a seeded bot-vs-bot game to a temporary hand history file, then streams
+it back, replays every hand through HandManager to check the logged balances are
+reproduced and reports bytes per hand and read/replay throughput.
+"""
+import argparse
+import os
+import tempfile
+import time
+from poker_engine import PokerManagerBuilder
+from poker_engine.hand_history import HandHistoryReader, HandHistoryWriter, replay
+from poker_engine.rng import derive_seed
+from poker_engine.simulation import SimulationRunner
+from poker_bot.simple_bots import RandomBot
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--hands", type=int, default=20_000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "hands.bin")
+        with HandHistoryWriter.open(path) as writer:
+            game = PokerManagerBuilder().with_blinds(5, 10).with_seed(args.seed) \
+                .with_recorder(writer).add_players(
+                    RandomBot(10 ** 6, seed=derive_seed(args.seed, "bot", seat))
+                    for seat in range(args.players)
+                ).build()
+            result = SimulationRunner(game).run(args.hands)
+        size = os.path.getsize(path)
+        print(f"Recorded {result.hands_played:,} hands at {result.hands_per_second:,.0f} hands/s, "
+              f"{size / result.hands_played:.0f} bytes/hand")
+
+        with HandHistoryReader(path) as reader:
+            start = time.perf_counter()
+            read = sum(1 for _ in reader)
+            read_speed = read / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for record in reader:
+                if replay(record) != record.final_balances:
+                    raise AssertionError(f"Replay of hand {record.hand_num} differs")
+            replay_speed = read / (time.perf_counter() - start)
+        print(f"Read {read_speed:,.0f} hands/s, replayed {read:,} hands at {replay_speed:,.0f} hands/s "
+              "with identical balances")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Run PYTHONPATH=. python benchmarks/range_equity_benchmark.py from root directory
+
+Cross-checks the exact heads-up enumeration of range_equity against its sampled
+path on spots where combos collide with the runouts (known hands preflop, a
+range sharing ranks with the board), then times both paths.
+"""
+import argparse
+import time
+from poker_engine.cards import Card
+from poker_bot.range_equity import range_equity
+
+SPOTS = (
+    (["AcAd", "KhKs"], None),
+    (["AcAd", "KK"], [Card(50), Card(0), Card(21)]),
+    (["QQ+,AKs", "JJ-66,AQs-ATs,KQs"], [Card(0), Card(21), Card(38)]),
+)
+
+def _label(spot: list[str], board) -> str:
+    return " vs ".join(spot) + (f" on {', '.join(map(str, board))}" if board else " preflop")
+
+def verify(samples: int, seed: int, tolerance: float):
+    for spot, board in SPOTS:
+        exact = range_equity(spot, board)
+        sampled = range_equity(spot, board, samples=samples, exact_budget=0, seed=seed)
+        assert exact.exact and not sampled.exact
+        # the weighted sample error is at most about 0.5 / sqrt(samples)
+        error = abs(exact.equities[0] - sampled.equities[0])
+        if error > tolerance * 0.5 / samples ** 0.5:
+            raise AssertionError(f"{_label(spot, board)}: exact {exact.equities[0]:.4f}, "
+                                 f"sampled {sampled.equities[0]:.4f}")
+    print(f"Exact and sampled range equity agree on {len(SPOTS)} spots")
+
+def benchmark(samples: int, seed: int):
+    for spot, board in SPOTS:
+        times = []
+        for exact_budget in (5_000_000, 0):
+            start = time.perf_counter()
+            range_equity(spot, board, samples=samples, exact_budget=exact_budget, seed=seed)
+            times.append(time.perf_counter() - start)
+        print(f"{_label(spot, board)}: exact {times[0]:.3f}s, {samples:,} samples {times[1]:.3f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=4.0, help="allowed error in standard errors")
+    args = parser.parse_args()
+    verify(args.samples, args.seed, args.tolerance)
+    benchmark(args.samples, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Run PYTHONPATH=. python benchmarks/simulation_benchmark.py from root directory
+
+Plays the same seeded bot-vs-bot game through GameRunner.play_game and through the
+headless SimulationRunner, checks that both end with identical balances and
+reports hands per second for each.
+"""
+import argparse
+import time
+from poker_engine import PokerManagerBuilder, evaluate_hand, table_evaluator # builds the tables up front
+from poker_engine.game_runner import GameRunner
+from poker_engine.simulation import SimulationRunner
+from poker_engine.rng import derive_seed
+from poker_bot.simple_bots import RandomBot
+
+class _StopGame(Exception):
+    pass
+
+def build_game(players: int, balance: int, seed: int):
+    # dealing and bots draw from separate seeded generators
+    return PokerManagerBuilder().with_blinds(5, 10).with_seed(seed) \
+        .add_players(RandomBot(balance, seed=derive_seed(seed, "bot", seat)) for seat in range(players)).build()
+
+def run_callbacks(args) -> tuple[list[int], float]:
+    game = build_game(args.players, args.balance, args.seed)
+    seats, hands_played = list(game.players), 0
+    def on_hand_end(winners, *_):
+        nonlocal hands_played
+        hands_played += 1
+        if hands_played == args.hands:
+            raise _StopGame
+    start = time.perf_counter()
+    try:
+        GameRunner(game).play_game(on_hand_end=on_hand_end)
+    except _StopGame:
+        pass
+    elapsed = time.perf_counter() - start
+    return [player.balance for player in seats], hands_played / elapsed
+
+def run_headless(args) -> tuple[list[int], float]:
+    game = build_game(args.players, args.balance, args.seed)
+    seats = list(game.players)
+    result = SimulationRunner(game).run(args.hands)
+    return [player.balance for player in seats], result.hands_per_second
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--hands", type=int, default=20_000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--balance", type=int, default=10 ** 9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--evaluator", choices=evaluate_hand.EVALUATORS, default="table")
+    args = parser.parse_args()
+
+    evaluate_hand.set_evaluator("algorithmic")
+    callback_balances, callback_speed = run_callbacks(args)
+    evaluate_hand.set_evaluator(args.evaluator)
+    headless_balances, headless_speed = run_headless(args)
+    if callback_balances != headless_balances:
+        raise AssertionError(f"Outcomes differ: {callback_balances} vs {headless_balances}")
+    print(f"Outcomes identical after {args.hands:,} hands ({args.players}-max)")
+    print(f"GameRunner.play_game (algorithmic evaluator) {callback_speed:>12,.0f} hands/s")
+    print(f"SimulationRunner ({args.evaluator} evaluator) {headless_speed:>18,.0f} hands/s")
+    print(f"Speed-up {headless_speed / callback_speed:.1f}x")
+
+if __name__ == "__main__":
+    main()
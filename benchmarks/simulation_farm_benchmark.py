@@ -0,0 +1,43 @@
+"""
+Run PYTHONPATH=. python benchmarks/simulation_farm_benchmark.py from root directory
+
+Runs the same farm (6-max RandomBot vs CallingBot lineup) with an increasing
+number of worker processes, checks that the aggregated results do not depend on
+the number of workers and reports hands per second for each.
+"""
+import argparse
+import os
+from poker_engine.simulation_farm import BotSpec, SimulationFarm
+
+LINEUP = (
+    [BotSpec("poker_bot.simple_bots:RandomBot", 10 ** 9, name="random")] * 3 +
+    [BotSpec("poker_bot.simple_bots:CallingBot", 10 ** 9, name="calling")] * 3
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--tables", type=int, default=16)
+    parser.add_argument("--hands", type=int, default=2_000, help="hands per table")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    reference = None
+    workers = 1
+    while workers <= args.max_workers:
+        report = SimulationFarm(LINEUP, (5, 10), args.tables, args.hands,
+                                seed=args.seed, max_workers=workers).run()
+        summary = report.summary()
+        if reference is None:
+            reference = summary
+            for bot_id, bot_summary in summary.items():
+                low, high = bot_summary["bb_per_100_ci"]
+                print(f"{bot_id:<10} {bot_summary['bb_per_100']:>10.2f} bb/100 "
+                      f"(95% CI {low:.2f} to {high:.2f}) over {bot_summary['hands']:,} hands")
+        elif summary != reference:
+            raise AssertionError(f"Results with {workers} workers differ from 1 worker")
+        print(f"{workers:>3} workers: {report.hands_per_second:>12,.0f} hands/s")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
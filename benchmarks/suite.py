@@ -0,0 +1,244 @@
+"""
+Run PYTHONPATH=. python benchmarks/suite.py from root directory
+
+Seeded benchmark suite of the engine's hot paths: showdown evaluation per
+backend, HandManager construction, full betting rounds with scripted actions,
+side pot distribution, GameRunner with bots and EquityCalculator on every
+street. Each case is repeated and its best time per operation kept (the least
+noisy estimate), results can be written as JSON and compared against a stored
+baseline: a case slower than the baseline by more than the threshold is
+flagged and the exit status is 1.
+
+    PYTHONPATH=. python benchmarks/suite.py --save-baseline   # on a quiet machine
+    PYTHONPATH=. python benchmarks/suite.py --json results.json
+The stored baseline is machine specific, regenerate it where the suite runs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from typing import Optional
+from poker_engine import evaluate_hand, table_evaluator # builds the tables up front
+from poker_engine.action_type import ActionType
+from poker_engine.card_mask import CardMask
+from poker_engine.cards import Card
+from poker_engine.game_runner import GameRunner
+from poker_engine.hand_manager import HandManager
+from poker_engine.players import Player
+from poker_engine.poker_manager_builder import PokerManagerBuilder
+from poker_engine.rng import derive_seed, make_rng
+from poker_bot.equity_calculator import EquityCalculator
+from poker_bot.simple_bots import RandomBot
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SEED = 0
+PLAYERS = 6
+
+# a case takes the number of operations to run and returns the seconds they took
+Case = Callable[[int], float]
+
+def _players(balances: list[int]) -> list[Player]:
+    return [Player(balance) for balance in balances]
+
+def _reset(players: list[Player], balances: list[int]):
+    for player, balance in zip(players, balances):
+        player.balance = balance
+        player.reset_round()
+
+def showdown_strength(evaluator: str) -> Case:
+    def run(ops: int) -> float:
+        rng = make_rng(SEED)
+        showdowns = []
+        for _ in range(ops):
+            ids = rng.sample(Card.ALL_CARDS_ID, 5 + 2 * PLAYERS)
+            players = _players([0] * PLAYERS)
+            for i, player in enumerate(players):
+                player.hands_mask = CardMask.from_ids(ids[5 + 2 * i:7 + 2 * i])
+                player.hands = tuple(Card.get_card(id) for id in ids[5 + 2 * i:7 + 2 * i])
+            showdowns.append((CardMask.from_ids(ids[:5]), players))
+        start = time.perf_counter()
+        for board, players in showdowns:
+            evaluate_hand.get_players_strength(board, players, evaluator)
+        return time.perf_counter() - start
+    return run
+
+def hand_construction(ops: int) -> float:
+    rng, balances = make_rng(SEED), [10 ** 6] * PLAYERS
+    players, elapsed = _players(balances), 0.0
+    for _ in range(ops):
+        _reset(players, balances)
+        start = time.perf_counter()
+        HandManager(players, 0, [5, 10], rng)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def _scripted(state: dict, first: bool) -> dict:
+    # the first player of a round makes a minimum raise, everybody else calls
+    options = state["options"]
+    if first and options[ActionType.RAISE]:
+        return {"action": ActionType.RAISE, "amount": options[ActionType.RAISE][0]}
+    return {"action": ActionType.CALL if options[ActionType.CALL] else ActionType.ALL_IN}
+
+def betting_rounds(ops: int) -> float:
+    '''ops hands of four betting rounds, the settlement is not timed'''
+    rng, balances = make_rng(SEED), [10 ** 6] * PLAYERS
+    players, elapsed = _players(balances), 0.0
+    for _ in range(ops):
+        _reset(players, balances)
+        hand = HandManager(players, 0, [5, 10], rng)
+        while not hand.is_complete():
+            start = time.perf_counter()
+            curr_round = hand.betting_round()
+            state, first = next(curr_round), True
+            try:
+                while True:
+                    state = curr_round.send(_scripted(state, first))
+                    first = False
+            except StopIteration:
+                pass
+            elapsed += time.perf_counter() - start
+    return elapsed
+
+def pot_distribution(ops: int) -> float:
+    '''Everybody all in preflop with different stacks: up to PLAYERS - 1 side pots'''
+    rng, balances = make_rng(SEED), [100 * (i + 1) for i in range(PLAYERS)]
+    players, elapsed = _players(balances), 0.0
+    for _ in range(ops):
+        _reset(players, balances)
+        hand = HandManager(players, 0, [5, 10], rng)
+        curr_round = hand.betting_round()
+        state = next(curr_round)
+        try:
+            while True:
+                options = state["options"]
+                state = curr_round.send(
+                    {"action": ActionType.ALL_IN if options[ActionType.ALL_IN] else ActionType.CALL}
+                )
+        except StopIteration:
+            pass
+        strengths = evaluate_hand.get_players_strength(hand._comm_masks[-1], players)
+        start = time.perf_counter()
+        hand._pot_distribution(strengths)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+class _StopGame(Exception):
+    pass
+
+def game_runner(ops: int) -> float:
+    '''ops hands of 6 RandomBots through GameRunner.play_game'''
+    game = PokerManagerBuilder().with_blinds(5, 10).with_seed(SEED) \
+        .add_players(RandomBot(10 ** 9, seed=derive_seed(SEED, "bot", seat)) for seat in range(PLAYERS)) \
+        .build()
+    hands = 0
+    def on_hand_end(*_):
+        nonlocal hands
+        hands += 1
+        if hands == ops:
+            raise _StopGame
+    start = time.perf_counter()
+    try:
+        GameRunner(game).play_game(on_hand_end=on_hand_end)
+    except _StopGame:
+        pass
+    return time.perf_counter() - start
+
+def equity(board_cards: int, **options) -> Case:
+    '''Heads-up EquityCalculator.equity with board_cards revealed, caching off'''
+    def run(ops: int) -> float:
+        rng = make_rng(SEED)
+        spots = []
+        for _ in range(ops):
+            ids = rng.sample(Card.ALL_CARDS_ID, 2 + board_cards)
+            spots.append((CardMask.from_ids(ids[:2]), CardMask.from_ids(ids[2:])))
+        calculator = EquityCalculator(seed=SEED, cache_size=0, **options)
+        start = time.perf_counter()
+        for hand, board in spots:
+            calculator.equity(hand, 2, board)
+        return time.perf_counter() - start
+    return run
+
+# name -> (case, operation, operations per repeat)
+CASES: dict[str, tuple[Case, str, int]] = {
+    "get_players_strength/algorithmic": (showdown_strength("algorithmic"), "showdown", 2_000),
+    "get_players_strength/table": (showdown_strength("table"), "showdown", 10_000),
+    "hand_manager/construct": (hand_construction, "hand", 10_000),
+    "betting_round/scripted": (betting_rounds, "hand", 2_000),
+    "pot_distribution/side_pots": (pot_distribution, "showdown", 5_000),
+    "game_runner/random_bots": (game_runner, "hand", 2_000),
+    "equity/preflop_table": (equity(0), "spot", 20_000),
+    "equity/preflop_sampled": (equity(0, use_preflop_table=False), "spot", 3),
+    "equity/flop": (equity(3), "spot", 3),
+    "equity/turn": (equity(4), "spot", 5),
+    "equity/river": (equity(5), "spot", 50),
+}
+
+def run_suite(names: list[str], repeat: int, scale: float) -> dict:
+    results = {}
+    for name in names:
+        case, unit, ops = CASES[name]
+        ops = max(1, round(ops * scale))
+        times = [case(ops) / ops * 1e6 for _ in range(repeat)]
+        results[name] = {
+            "unit": unit, "ops": ops, "repeat": repeat,
+            "best_us": min(times), "median_us": statistics.median(times)
+        }
+        print(f"{name:<34} {min(times):>12.2f} us/{unit:<9} (median {statistics.median(times):.2f})",
+              file=sys.stderr)
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    '''Names of the cases slower than their baseline by more than threshold'''
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["best_us"] / baseline[name]["best_us"]
+        flag = "REGRESSION" if ratio > 1 + threshold else "improved" if ratio < 1 - threshold else ""
+        print(f"{name:<34} {ratio:>7.2f}x baseline {flag}", file=sys.stderr)
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--only", nargs="+", default=[], help="run the cases containing any of these")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the operations per repeat")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown, 0.15 is 15%%")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if not args.only or any(part in name for part in args.only)]
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": run_suite(names, args.repeat, args.scale)
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        return
+    regressions: Optional[list[str]] = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f)["results"], args.threshold)
+    if not args.json:
+        print(json.dumps(report))
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}",
+              file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Run PYTHONPATH=. python benchmarks/table_server_benchmark.py from root directory
+
+Load generator for the table server: starts a TableServer in a separate process
+on a Unix socket and connects clients that each play the seats of several
+tables (calling, or going all in when they cannot call). Every client drops its
+connection from time to time and reconnects to its running seats with their
+tokens. Reports messages per second received by the clients and the end-to-end
+action latency p50 / p99 (from sending an action to receiving the state delta
+that follows it).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from poker_engine.table_server import TableServer, encode, read_message
+
+def serve(args, path: str):
+    async def run():
+        server = TableServer(args.tables, args.players, balance=10 ** 6,
+                             action_timeout=args.timeout_ms / 1000, max_hands=args.hands,
+                             seed=args.seed)
+        await server.start(path)
+        await server.wait_finished()
+        while server.connections: # let the clients read the end of their tables
+            await asyncio.sleep(0.01)
+        server.close()
+    asyncio.run(run())
+
+class Client:
+    def __init__(self, path: str, seats: list[tuple[int, int]], reconnect_every: int):
+        self.path = path
+        self.seats = seats
+        self.tokens: dict[tuple[int, int], str] = {}
+        self.reconnect_every = reconnect_every
+        self.messages = 0
+        self.actions = 0
+        self.reconnects = 0
+        self.latencies: list[float] = []
+        self._sent: dict[int, float] = {} # table -> time the last action was sent
+        self._ended: set[int] = set()
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write(b"".join(
+            encode({"t": "join", "table": table, "seat": seat, "token": self.tokens.get((table, seat))})
+            for table, seat in self.seats
+        ))
+        await writer.drain()
+        return reader, writer
+
+    async def run(self):
+        tables = {table for table, _ in self.seats}
+        reader, writer = await self._connect()
+        while self._ended != tables:
+            message = await read_message(reader)
+            if message is None:
+                raise ConnectionError("Server closed the connection")
+            self.messages += 1
+            kind, table = message["t"], message.get("table")
+            if kind == "error":
+                raise RuntimeError(message)
+            if kind == "joined":
+                self.tokens[table, message["seat"]] = message["token"]
+            elif kind == "end":
+                self._ended.add(table)
+            elif kind == "d" and table in self._sent:
+                self.latencies.append(time.perf_counter() - self._sent.pop(table))
+            elif kind == "turn":
+                action = "C" if "C" in message["o"] else "A"
+                writer.write(encode({"t": "act", "table": table, "seat": message["seat"], "a": action}))
+                self._sent[table] = time.perf_counter()
+                self.actions += 1
+                if self.reconnect_every and self.actions % self.reconnect_every == 0:
+                    await writer.drain()
+                    writer.close()
+                    self._sent.clear()
+                    self.reconnects += 1
+                    reader, writer = await self._connect()
+        writer.close()
+
+async def play(args, path: str) -> list[Client]:
+    seats = [(table, seat) for table in range(args.tables) for seat in range(args.players)]
+    clients = [Client(path, seats[i::args.clients], args.reconnect_every) for i in range(args.clients)]
+    await asyncio.gather(*(client.run() for client in clients))
+    return clients
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--hands", type=int, default=20, help="hands per table")
+    parser.add_argument("--clients", type=int, default=50, help="client connections")
+    parser.add_argument("--reconnect-every", type=int, default=500,
+                        help="actions between reconnects of a client, 0 never")
+    parser.add_argument("--timeout-ms", type=float, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "tables.sock")
+    server = multiprocessing.Process(target=serve, args=(args, path))
+    server.start()
+    while not os.path.exists(path):
+        time.sleep(0.01)
+    start = time.perf_counter()
+    clients = asyncio.run(play(args, path))
+    elapsed = time.perf_counter() - start
+    server.join()
+    os.unlink(path)
+
+    messages = sum(client.messages for client in clients)
+    actions = sum(client.actions for client in clients)
+    latencies = [latency * 1000 for client in clients for latency in client.latencies]
+    print(f"{args.tables:,} tables of {args.players}, {args.clients} clients: {messages:,} messages, "
+          f"{actions:,} actions, {sum(client.reconnects for client in clients):,} reconnects "
+          f"in {elapsed:.1f}s ({messages / elapsed:,.0f} messages/s, {actions / elapsed:,.0f} actions/s)")
+    print(f"End-to-end action latency p50 {percentile(latencies, 0.5):.2f}ms, "
+          f"p99 {percentile(latencies, 0.99):.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Run PYTHONPATH=. python benchmarks/variance_reduction_benchmark.py from root directory
+
+Runs the same bot evaluation (PushFoldBot against CallingBot, 10 big blind
+stacks topped up every hand so that all ins are common) plainly, in duplicate
+mode, with all in EV scoring and with both, then reports each bot's bb/100 with its 95%
+confidence interval and the hands, and seconds, needed at that variance to
+bring the interval down to +-1 bb/100.
+"""
+import argparse
+import os
+from poker_engine.simulation_farm import BotSpec, SimulationFarm
+
+BLINDS = (5, 10)
+
+def lineup(seats: int, balance: int) -> list[BotSpec]:
+    bots = (BotSpec("poker_bot.simple_bots:PushFoldBot", balance, name="push_fold"),
+            BotSpec("poker_bot.simple_bots:CallingBot", balance, name="calling"))
+    return [bots[seat % 2] for seat in range(seats)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("--seats", type=int, default=2)
+    parser.add_argument("--balance", type=int, default=100, help="stack topped up every hand")
+    parser.add_argument("--tables", type=int, default=8)
+    parser.add_argument("--hands", type=int, default=2_000, help="hands per table and rotation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    for duplicate, all_in_ev in ((False, False), (True, False), (False, True), (True, True)):
+        mode = " + ".join(name for name, on in (("duplicate", duplicate), ("all in EV", all_in_ev)) if on)
+        report = SimulationFarm(lineup(args.seats, args.balance), BLINDS, args.tables, args.hands,
+                                seed=args.seed, max_workers=args.max_workers, duplicate=duplicate,
+                                all_in_ev=all_in_ev, rebuy=True).run()
+        print(f"{mode or 'plain'}: {report.hands:,} hands in {report.elapsed:.1f}s")
+        for bot_id, summary in report.summary().items():
+            low, high = summary["bb_per_100_ci"]
+            half_width = (high - low) / 2
+            # the interval shrinks with the square root of the hands played
+            needed = report.hands * half_width ** 2
+            print(f"  {bot_id:<10} {summary['bb_per_100']:>+8.2f} bb/100 (95% CI {low:+.2f} to {high:+.2f})"
+                  f"   +-1 bb/100 needs {needed:>13,.0f} hands, {needed / report.hands_per_second:>9,.0f}s")
+
+if __name__ == "__main__":
+    main()
@@ -67,7 +67,7 @@ for hand in game.advance():
                 )
             player: Player = state["player"]
             state.pop("player")
-            print("Your Turn", utils.get_player_status_str(player.public_status, True))
+            print("Your Turn", utils.get_player_status_str(player.private_status, True))
             print("The current bet is", state["current_bet"])
 
             if isinstance(player, AutonomousPlayer):
@@ -0,0 +1,265 @@
+'''
+Run from root PYTHONPATH=. python poker_bot/buckets.py OUTPUT_DIR to build the index
+(requires numpy, offline: tens of minutes spread over all cores)
+
+Card abstraction for CFR-style strategies: every (hole cards, board) situation is
+mapped to a bucket per street.
+- River: hand strength (HS) against one uniformly random hand, exact for every
+  holding of a board from one batch evaluation and sorted counts
+- Flop / turn: histogram of the river HS over every remaining runout (the
+  distribution behind EHS / EHS^2), so hands with the same mean but different
+  potential land in different buckets
+Features are clustered with k-means (fit on a sample of boards), buckets are
+numbered by increasing mean strength. Only suit-isomorphic boards are computed:
+a board's suites are relabelled by sorting their rank masks, and each canonical
+board stores one bucket per hole card combo (in the relabelled suites) in a
+memory-mappable <street>.npy array, with the canonical board masks in
+<street>_boards.npy. Preflop buckets are the 169 preflop_table hand classes.
+'''
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+from typing import Optional, Union
+import numpy as np
+from poker_engine.cards import Card
+from poker_engine.card_mask import CardMask, CARD_BITS, RANK_MASK, SUITE_SHIFT, suite_masks
+from poker_engine.batch_evaluator import evaluate_showdowns
+from poker_bot.preflop_table import hand_class
+
+STREETS = {"flop": 3, "turn": 4, "river": 5}
+DEFAULT_BINS = 10
+NO_BUCKET = 255 # hole cards overlapping the board
+
+_SUITES = len(Card.SUITES)
+COMBOS = Card.DECK_SIZE * (Card.DECK_SIZE - 1) // 2
+# combo index a * (a - 1) / 2 + b of cards a > b -> (a, b)
+_COMBO_CARDS = np.array([(a, b) for a in range(Card.DECK_SIZE) for b in range(a)], dtype=np.intp)
+# combo indices holding each card
+_CARD_COMBOS = np.array([
+    [combo for combo, (a, b) in enumerate(_COMBO_CARDS) if card in (a, b)]
+    for card in range(Card.DECK_SIZE)
+], dtype=np.intp)
+_COMBO_MASK = np.array([1 << a | 1 << b for a, b in _COMBO_CARDS], dtype=np.int64)
+_CARD_MASK_BIT = np.array(CARD_BITS, dtype=np.int64)
+_LANE_SHIFTS = np.arange(_SUITES, dtype=np.int64) * SUITE_SHIFT
+_ROW_STRIDE = 1 << 32 # larger than any strength, keeps rows apart in flattened sorts
+
+def combo_index(card1: int, card2: int) -> int:
+    high, low = (card1, card2) if card1 > card2 else (card2, card1)
+    return high * (high - 1) // 2 + low
+
+def canonical_board(board_mask: int) -> tuple[int, list[int]]:
+    '''
+    (canonical CardMask of the board, new suite of each old suite): suites are
+    relabelled in decreasing order of their rank masks
+    '''
+    lanes = suite_masks(board_mask)
+    order = sorted(range(_SUITES), key=lanes.__getitem__, reverse=True)
+    suite_map = [0] * _SUITES
+    key = 0
+    for new_suite, old_suite in enumerate(order):
+        suite_map[old_suite] = new_suite
+        key |= lanes[old_suite] << (SUITE_SHIFT * new_suite)
+    return key, suite_map
+
+def canonical_boards(size: int) -> np.ndarray:
+    '''Sorted canonical board masks (int64) of every board of size cards'''
+    boards = np.array(list(combinations(range(Card.DECK_SIZE), size)), dtype=np.intp)
+    lanes = (_CARD_MASK_BIT[boards].sum(axis=1)[:, None] >> _LANE_SHIFTS) & RANK_MASK
+    lanes = -np.sort(-lanes, axis=1)
+    return np.unique((lanes << _LANE_SHIFTS).sum(axis=1))
+
+def _board_ids(keys: np.ndarray, size: int) -> np.ndarray:
+    return np.array([CardMask(int(key)).ids() for key in keys], dtype=np.intp).reshape(-1, size)
+
+def river_strengths(boards: np.ndarray) -> np.ndarray:
+    '''
+    boards - (B, 5) card ids
+    Returns (B, COMBOS) float32 hand strength of every hole card combo against a
+    uniformly random other hand (ties counting half), NaN for combos using a board card
+    '''
+    n = len(boards)
+    board_bits = (1 << boards.astype(np.int64)).sum(axis=1)
+    invalid = (_COMBO_MASK[None, :] & board_bits[:, None]) != 0
+    # evaluate conflicting combos as some valid combo, they are masked out below
+    free = np.argmax(~invalid, axis=1)
+    holes = np.where(invalid[:, :, None], _COMBO_CARDS[free][:, None, :], _COMBO_CARDS[None, :, :])
+    strengths = np.where(invalid, -1, evaluate_showdowns(boards, holes)).astype(np.int64)
+    rows = np.arange(n, dtype=np.int64)[:, None]
+
+    def counts(groups: np.ndarray, queries: np.ndarray, query_rows: np.ndarray):
+        # (less than, equal to) counts of each query within its sorted groups row
+        width = groups.shape[1]
+        flat = (np.sort(groups, axis=1)
+                + _ROW_STRIDE * np.arange(len(groups), dtype=np.int64)[:, None]).ravel()
+        targets = queries + _ROW_STRIDE * query_rows
+        left = np.searchsorted(flat, targets, side="left")
+        right = np.searchsorted(flat, targets, side="right")
+        return left - query_rows * width, right - left
+
+    below_all, equal_all = counts(strengths, strengths, rows)
+    by_card = strengths[:, _CARD_COMBOS].reshape(n * Card.DECK_SIZE, -1) # (B * 52, 51)
+    card_rows = rows * Card.DECK_SIZE
+    below_a, equal_a = counts(by_card, strengths, card_rows + _COMBO_CARDS[None, :, 0])
+    below_b, equal_b = counts(by_card, strengths, card_rows + _COMBO_CARDS[None, :, 1])
+    # opponents are the valid combos sharing no card with the holding; invalid
+    # combos (strength -1) are below every valid one: 5 per card, all board pairs overall
+    board_size = boards.shape[1]
+    invalid_all = COMBOS - comb(Card.DECK_SIZE - board_size, 2)
+    below = (below_all - invalid_all) - (below_a - board_size) - (below_b - board_size)
+    equal = equal_all - equal_a - equal_b + 1
+    opponents = comb(Card.DECK_SIZE - board_size - 2, 2)
+    result = ((below + equal / 2) / opponents).astype(np.float32)
+    result[invalid] = np.nan
+    return result
+
+def board_features(board: np.ndarray, bins: int = DEFAULT_BINS) -> np.ndarray:
+    '''
+    (COMBOS, d) features of every combo on a 3 to 5 card board (NaN rows for
+    combos using a board card): river HS (d = 1), else the normalised histogram
+    of river HS over the runouts (d = bins)
+    '''
+    if len(board) == 5:
+        return river_strengths(board[None, :])[0][:, None]
+    used = set(board.tolist())
+    runouts = np.array(list(combinations([card for card in range(Card.DECK_SIZE) if card not in used],
+                                         5 - len(board))), dtype=np.intp)
+    boards = np.concatenate([np.broadcast_to(board, (len(runouts), len(board))), runouts], axis=1)
+    strengths = river_strengths(boards)
+    histogram = np.zeros((COMBOS, bins), dtype=np.float32)
+    valid = ~np.isnan(strengths)
+    bin_of = np.minimum((np.where(valid, strengths, 0) * bins).astype(np.int64), bins - 1)
+    for bin_index in range(bins):
+        histogram[:, bin_index] = ((bin_of == bin_index) & valid).sum(axis=0)
+    totals = histogram.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore"):
+        histogram /= totals
+    histogram[(_COMBO_MASK & int((1 << board.astype(np.int64)).sum())) != 0] = np.nan
+    return histogram
+
+def kmeans(features: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 50) -> np.ndarray:
+    '''Lloyd's k-means with k-means++ seeding, returns (k, d) centroids'''
+    centroids = [features[rng.integers(len(features))]]
+    distances = ((features - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distances.sum()
+        index = rng.choice(len(features), p=distances / total) if total > 0 \
+            else rng.integers(len(features))
+        centroids.append(features[index])
+        distances = np.minimum(distances, ((features - features[index]) ** 2).sum(axis=1))
+    centroids = np.array(centroids)
+    for _ in range(iterations):
+        labels = assign(features, centroids)
+        updated = centroids.copy()
+        for cluster in range(k):
+            members = features[labels == cluster]
+            if len(members):
+                updated[cluster] = members.mean(axis=0)
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+    return centroids
+
+def assign(features: np.ndarray, centroids: np.ndarray, chunk: int = 1 << 16) -> np.ndarray:
+    labels = np.empty(len(features), dtype=np.intp)
+    for start in range(0, len(features), chunk):
+        block = features[start:start + chunk]
+        labels[start:start + chunk] = (
+            (block[:, None, :] - centroids[None, :, :]) ** 2
+        ).sum(axis=2).argmin(axis=1)
+    return labels
+
+def _strength_order(centroids: np.ndarray) -> np.ndarray:
+    if centroids.shape[1] == 1:
+        means = centroids[:, 0]
+    else:
+        centres = (np.arange(centroids.shape[1]) + 0.5) / centroids.shape[1]
+        means = centroids @ centres
+    return np.argsort(np.argsort(means))
+
+def _bucket_boards(boards: np.ndarray, bins: int, centroids: np.ndarray) -> np.ndarray:
+    '''Worker entry point, (B, COMBOS) uint8 buckets of the given boards'''
+    order = _strength_order(centroids)
+    result = np.full((len(boards), COMBOS), NO_BUCKET, dtype=np.uint8)
+    for row, board in enumerate(boards):
+        features = board_features(board, bins)
+        valid = ~np.isnan(features[:, 0])
+        result[row, valid] = order[assign(features[valid], centroids)]
+    return result
+
+def build_street(path: str, street: str, buckets: int = 50, bins: int = DEFAULT_BINS,
+                 sample_boards: int = 200, seed: int = 0, max_workers: Optional[int] = None,
+                 chunk: int = 16, limit: Optional[int] = None):
+    '''
+    Fits the street's clusters on sample_boards random canonical boards, then
+    buckets every canonical board (the first limit ones if given) over
+    max_workers processes into path/<street>.npy
+    '''
+    assert buckets < NO_BUCKET
+    size = STREETS[street]
+    keys = canonical_boards(size)
+    if limit is not None:
+        keys = keys[:limit]
+    boards = _board_ids(keys, size)
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(boards), min(sample_boards, len(boards)), replace=False)
+    features = np.concatenate([board_features(boards[i], bins) for i in sample])
+    features = features[~np.isnan(features[:, 0])]
+    centroids = kmeans(features, buckets, rng)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, f"{street}_boards.npy"), keys)
+    table = np.lib.format.open_memmap(os.path.join(path, f"{street}.npy"), mode="w+",
+                                      dtype=np.uint8, shape=(len(keys), COMBOS))
+    starts = range(0, len(boards), chunk)
+    with ProcessPoolExecutor(max_workers) as executor:
+        results = executor.map(_bucket_boards, [boards[start:start + chunk] for start in starts],
+                               [bins] * len(starts), [centroids] * len(starts))
+        for start, block in zip(starts, results):
+            table[start:start + len(block)] = block
+    table.flush()
+
+class BucketIndex:
+    '''O(1) bucket lookups from an index directory built by build_street'''
+    def __init__(self, path: str):
+        self.path = path
+        self._tables: dict[int, tuple[dict[int, int], np.ndarray]] = {}
+
+    def _table(self, board_size: int) -> tuple[dict[int, int], np.ndarray]:
+        table = self._tables.get(board_size)
+        if table is None:
+            street = next(name for name, size in STREETS.items() if size == board_size)
+            keys = np.load(os.path.join(self.path, f"{street}_boards.npy"))
+            buckets = np.load(os.path.join(self.path, f"{street}.npy"), mmap_mode="r")
+            table = self._tables[board_size] = ({int(key): row for row, key in enumerate(keys)},
+                                                buckets)
+        return table
+
+    def bucket(self, hole: Union[tuple[Card, Card], CardMask],
+               board: Union[list[Card], CardMask, None] = None) -> int:
+        '''Bucket of the hole cards on the board (preflop hand class without a board)'''
+        hole_ids = hole.ids() if isinstance(hole, CardMask) else [card.id for card in hole]
+        board_mask = board if isinstance(board, CardMask) else CardMask.from_cards(board or ())
+        if not board_mask:
+            return hand_class(*hole_ids)
+        rows, buckets = self._table(len(board_mask))
+        key, suite_map = canonical_board(board_mask)
+        card1, card2 = (card - card % _SUITES + suite_map[card % _SUITES] for card in hole_ids)
+        return int(buckets[rows[key], combo_index(card1, card2)])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument("path", help="output directory")
+    parser.add_argument("--streets", nargs="+", default=list(STREETS), choices=list(STREETS))
+    parser.add_argument("--buckets", type=int, default=50, help="buckets per street")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS)
+    parser.add_argument("--sample-boards", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--limit", type=int, default=None, help="only the first LIMIT boards (testing)")
+    args = parser.parse_args()
+    for street in args.streets:
+        build_street(args.path, street, args.buckets, args.bins, args.sample_boards, args.seed,
+                     args.max_workers, limit=args.limit)
+        print(f"{street} done")
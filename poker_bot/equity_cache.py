@@ -0,0 +1,95 @@
+'''
+Bounded LRU cache of EquityResults keyed on the suit-isomorphic situation.
+
+Equity does not change when suits are permuted or cards reordered, so
+(hole cards, board, player count) is reduced to a canonical form: each suit
+lane of the CardMasks becomes a (board ranks, hole ranks) pair, and sorting the
+four pairs gives the same key for every isomorphic situation. Keys are single
+ints, and the cache can be saved to and warm-loaded from a compact binary file.
+'''
+import struct
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
+from poker_engine.cards import Card
+from poker_engine.card_mask import suite_masks
+from poker_engine import instrumentation
+
+if TYPE_CHECKING:
+    from poker_bot.equity_calculator import EquityResult
+
+_MAGIC = b"WSEC\x01"
+# key, wins, ties, losses, samples, equity, exact
+_RECORD = struct.Struct("<16sQQQQd?")
+_LANE_BITS = len(Card.RANKS) # 8 lanes and 4 bits of players fit in the 16 byte key
+
+def canonical_key(hand_mask: int, board_mask: int, players: int) -> int:
+    '''Same int for every suit permutation of the hand and board masks'''
+    lanes = sorted(zip(suite_masks(board_mask), suite_masks(hand_mask)), reverse=True)
+    key = 0
+    for board_lane, hand_lane in lanes:
+        key = (key << _LANE_BITS | board_lane) << _LANE_BITS | hand_lane
+    return key << 4 | players
+
+class EquityCache:
+    '''
+    Results are only valid for calculators with the same settings (iterations,
+    exact_budget), so share a cache between such calculators only
+    '''
+    def __init__(self, maxsize: int = 5000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, "EquityResult"] = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key: int) -> Optional["EquityResult"]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: int, result: "EquityResult"):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def save(self, path: str):
+        '''Writes entries from least to most recently used'''
+        with open(path, "wb") as file:
+            file.write(_MAGIC)
+            for key, result in self._entries.items():
+                file.write(_RECORD.pack(
+                    key.to_bytes(16, "little"), result.wins, result.ties, result.losses,
+                    result.samples, result.equity, result.exact
+                ))
+
+    def load(self, path: str):
+        '''Warm-loads saved entries (keeping the most recent if over maxsize)'''
+        from poker_bot.equity_calculator import EquityResult # equity_calculator imports this module
+        with open(path, "rb") as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not an equity cache file")
+            data = file.read()
+        for fields in _RECORD.iter_unpack(data[:len(data) - len(data) % _RECORD.size]):
+            key, wins, ties, losses, samples, equity, exact = fields
+            self.put(int.from_bytes(key, "little"),
+                     EquityResult(wins, ties, losses, equity, samples, exact))
+
+instrumentation.register(EquityCache, "get", counters={
+    "equity_cache_hits": lambda result, *_: result is not None,
+    "equity_cache_misses": lambda result, *_: result is None
+})
@@ -1,52 +1,375 @@
 '''
 Run from root PYTHONPATH=. python poker_bot/equity_calculator.py
 
-Can be improved upon (potentially to be done later, not significant right now)
-- Pre-computed preflop tables
-- Smart early termination for obvious hands
-- Use ProcessPoolExecutor for parallel execution
+Equity of a known hand against uniformly random opponent hands. Preflop spots
+are looked up in the precomputed preflop_table, other results are kept in an
+EquityCache keyed on the suit-isomorphic situation. Otherwise, when the number of
+possible outcomes (remaining boards x opponent holdings) fits in exact_budget,
+every outcome is enumerated, else Monte Carlo sampling is used.
+
+estimate() is the time-budgeted variant for bots: it samples in vectorised
+batches (requires numpy), optionally spread over an executor's processes, and
+stops once the standard error is below a tolerance or the time limit is hit.
+batch_equity() samples many unrelated spots in one vectorised pass, for bots
+deciding for many tables at once (see BatchGameRunner).
 '''
 from phevaluator import evaluate_cards
 from poker_engine.cards import Card
-from typing import Optional
+from poker_engine.card_mask import CardMask, FULL_DECK
+from poker_engine import instrumentation
+from poker_bot import preflop_table
+from poker_bot.equity_cache import EquityCache, canonical_key
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from itertools import combinations
+from math import comb, factorial, sqrt
+from typing import Optional, Union
 import random
-import functools
+import sys
+import time
+
+@dataclass
+class EquityResult:
+    wins: int
+    ties: int # outcomes where the hand shares the best hand with at least one opponent
+    losses: int
+    equity: float # share of the pot won on average, ties paying their split share
+    samples: int # outcomes evaluated
+    exact: bool # True if all outcomes were enumerated
+    std_error: float = 0.0 # standard error of equity, 0 when exact or not tracked
+
+    def confidence_interval(self, z: float = 1.96) -> tuple[float, float]:
+        '''Normal approximation interval of equity (95% by default)'''
+        return (max(self.equity - z * self.std_error, 0.0),
+                min(self.equity + z * self.std_error, 1.0))
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.samples
+
+    @property
+    def tie_rate(self) -> float:
+        return self.ties / self.samples
+
+    @property
+    def loss_rate(self) -> float:
+        return self.losses / self.samples
+
+def _sample_batch(hand_ids: tuple[int, int], board_ids: tuple[int, ...], opponents: int,
+                  samples: int, seed: int) -> tuple[int, int, float, float]:
+    '''
+    Vectorised Monte Carlo batch, returns (wins, ties, sum of pot shares,
+    sum of squared pot shares). Module level so executors can pickle it.
+    '''
+    import numpy as np
+    from poker_engine.batch_evaluator import evaluate_showdowns
+    rng = np.random.default_rng(seed)
+    used = set(hand_ids) | set(board_ids)
+    deck = np.array([card for card in Card.ALL_CARDS_ID if card not in used])
+    board_needed = 5 - len(board_ids)
+    drawn = board_needed + 2 * opponents
+    keys = rng.random((samples, len(deck)))
+    order = keys.argsort(axis=1) if drawn == len(deck) else keys.argpartition(drawn, axis=1)
+    deals = deck[order[:, :drawn]]
+    boards = np.concatenate(
+        [np.broadcast_to(np.array(board_ids, dtype=deck.dtype), (samples, len(board_ids))),
+         deals[:, :board_needed]],
+        axis=1
+    )
+    holes = np.concatenate(
+        [np.broadcast_to(np.array(hand_ids), (samples, 1, 2)),
+         deals[:, board_needed:].reshape(samples, opponents, 2)],
+        axis=1
+    )
+    strengths = evaluate_showdowns(boards, holes)
+    hero, opp = strengths[:, 0], strengths[:, 1:]
+    best = opp.max(axis=1)
+    win, tie = hero > best, hero == best
+    share = win + tie / (1 + (opp == hero[:, None]).sum(axis=1))
+    return int(win.sum()), int(tie.sum()), float(share.sum()), float((share * share).sum())
+
+_BATCH_ROWS = 1 << 14 # spots x samples per vectorised chunk of batch_equity
+
+def batch_equity(hands: list[tuple[int, int]], boards: list[tuple[int, ...]],
+                 opponents: list[int], samples: int = 500, rng=None):
+    '''
+    Monte Carlo pot share equity of hands[k] (two card ids) against opponents[k]
+    random hands on boards[k] (0 to 5 card ids), for all spots at once. rng is a
+    numpy Generator or seed shared by all spots, or a list of Generators drawing
+    spot k from rng[k] (the same numbers as spot k sampled on its own). Returns
+    a float array with one equity per spot.
+    '''
+    import numpy as np
+    from poker_engine.batch_evaluator import evaluate_showdowns
+    spot_rngs = rng if isinstance(rng, list) else None
+    rng = None if spot_rngs is not None else np.random.default_rng(rng)
+    spots = len(hands)
+    known = np.full((spots, 7), -1, dtype=np.intp)
+    for k, (hand, board) in enumerate(zip(hands, boards)):
+        known[k, :2] = hand
+        known[k, 2:2 + len(board)] = board
+    board_len = np.array([len(board) for board in boards])
+    opponents = np.asarray(opponents)
+    max_opponents = int(opponents.max()) if spots else 0
+    drawn = 5 + 2 * max_opponents
+    equities = np.empty(spots)
+    step = max(1, _BATCH_ROWS // samples)
+    for start in range(0, spots, step):
+        rows = slice(start, start + step)
+        chunk = known[rows]
+        n = len(chunk)
+        # known cards get keys in [1, 2), so the drawn smallest keys are never dead cards
+        dead = np.zeros((n, len(Card.ALL_CARDS_ID)), dtype=np.float32)
+        hit = chunk >= 0
+        dead[np.nonzero(hit)[0], chunk[hit]] = 1
+        if spot_rngs is None:
+            keys = rng.random((n, samples, len(Card.ALL_CARDS_ID)), dtype=np.float32)
+        else:
+            keys = np.stack([spot_rng.random((samples, len(Card.ALL_CARDS_ID)), dtype=np.float32)
+                             for spot_rng in spot_rngs[rows]])
+        keys += dead[:, None, :]
+        deals = keys.argpartition(drawn, axis=2)[:, :, :drawn]
+        # board slot j is known below the board length, else the j-th drawn card
+        full_boards = np.where(np.arange(5) < board_len[rows, None, None],
+                               chunk[:, None, 2:], deals[:, :, :5])
+        holes = np.concatenate(
+            [np.broadcast_to(chunk[:, None, None, :2], (n, samples, 1, 2)),
+             deals[:, :, 5:].reshape(n, samples, max_opponents, 2)],
+            axis=2
+        )
+        strengths = evaluate_showdowns(
+            full_boards.reshape(-1, 5), holes.reshape(-1, 1 + max_opponents, 2)
+        ).reshape(n, samples, 1 + max_opponents)
+        hero = strengths[:, :, 0]
+        opp = np.where(np.arange(max_opponents) < opponents[rows, None, None], strengths[:, :, 1:], -1)
+        best = opp.max(axis=2)
+        share = (hero > best) + (hero == best) / (1 + (opp == hero[:, :, None]).sum(axis=2))
+        equities[rows] = share.mean(axis=1)
+    return equities
+
+def outcome_count(unseen_cards: int, board_needed: int, opponents: int) -> int:
+    '''Number of distinct (remaining board, unordered opponent holdings) outcomes'''
+    pairings = factorial(2 * opponents) // (2 ** opponents * factorial(opponents))
+    return comb(unseen_cards, board_needed) * comb(unseen_cards - board_needed, 2 * opponents) \
+        * pairings
+
+def _check_players(players: int):
+    if players < 2:
+        raise ValueError(f"At least two players are needed, got {players}")
 
 class EquityCalculator:
-    def __init__(self, iterations: int = 10000):
+    def __init__(self, iterations: int = 10000, rng: Optional[random.Random] = None,
+                 seed: Optional[int] = None, exact_budget: int = 200_000,
+                 use_preflop_table: bool = True, cache_size: int = 5000,
+                 cache: Optional[EquityCache] = None):
+        '''
+        Sampling uses rng, or a private random.Random(seed) so that instances never
+        share state (seed=None seeds from the OS)
+        exact_budget - enumerate exactly when there are at most this many outcomes
+        (0 to always sample)
+        use_preflop_table - answer preflop spots from preflop_table when it covers
+        the player count
+        cache - EquityCache to use (eg warm-loaded or shared), otherwise a private
+        one holding cache_size results (0 disables caching)
+        '''
         self.iterations = iterations
+        self.rng: random.Random = rng if rng is not None else random.Random(seed)
+        self.exact_budget = exact_budget
+        self.use_preflop_table = use_preflop_table
+        if cache is None and cache_size > 0:
+            cache = EquityCache(cache_size)
+        self.cache: Optional[EquityCache] = cache
+
+    @staticmethod
+    def _to_masks(cards: Union[tuple[Card, Card], CardMask],
+                  board: Optional[Union[list[Card], CardMask]]) -> tuple[CardMask, CardMask]:
+        hand_mask = cards if isinstance(cards, CardMask) else CardMask.from_cards(cards)
+        board_mask = board if isinstance(board, CardMask) else CardMask.from_cards(board or ())
+        assert len(hand_mask) == 2
+        assert not board_mask or 3 <= len(board_mask) <= 5
+        return hand_mask, board_mask
 
-    @functools.lru_cache(maxsize=5000)
-    def _evaluate_hand_strength(self, cards: tuple[Card, Card], players: int, 
-                                board: Optional[list[Card]] = None) -> float:
+    def equity(self, cards: Union[tuple[Card, Card], CardMask], players: int,
+               board: Optional[Union[list[Card], CardMask]] = None) -> EquityResult:
         '''
-        Calculates equity using monte carlo
-        Use external library for evaluate_cards for speed purposes (as need to run many iterations)
+        Equity of cards against players - 1 random hands, exact if the outcomes fit
+        in exact_budget, otherwise over self.iterations Monte Carlo samples
+        cards and board may be given as CardMask
         '''
-        assert len(cards) == 2
-        assert not board or 3 <= len(board) <= 5
-        card1, card2 = cards
-        used_cards: set[int] = {card1.id, card2.id}
-        board_used: list[int] = [] if not board else [card.id for card in board]
-        wins = 0
-        if len(board_used) == 5: 
+        _check_players(players)
+        hand_mask, board_mask = self._to_masks(cards, board)
+        if not board_mask and self.use_preflop_table \
+          and preflop_table.MIN_PLAYERS <= players <= preflop_table.MAX_PLAYERS:
+            return self._preflop_lookup(hand_mask, players)
+        if self.cache is not None:
+            key = canonical_key(hand_mask, board_mask, players)
+            result = self.cache.get(key)
+            if result is None:
+                result = self._compute(hand_mask, board_mask, players)
+                self.cache.put(key, result)
+            return result
+        return self._compute(hand_mask, board_mask, players)
+
+    def _compute(self, hand_mask: CardMask, board_mask: CardMask, players: int) -> EquityResult:
+        unseen = Card.DECK_SIZE - 2 - len(board_mask)
+        if outcome_count(unseen, 5 - len(board_mask), players - 1) <= self.exact_budget:
+            return self._enumerate(hand_mask, board_mask, players - 1)
+        return self._sample(hand_mask, board_mask, players - 1)
+
+    @staticmethod
+    def _preflop_lookup(hand_mask: CardMask, players: int) -> EquityResult:
+        table = preflop_table.default_table()
+        win_rate, tie_rate, equity = table.lookup(*hand_mask.ids(), players)
+        wins, ties = round(win_rate * table.samples), round(tie_rate * table.samples)
+        return EquityResult(wins, ties, table.samples - wins - ties, equity, table.samples, False)
+
+    def _enumerate(self, hand_mask: CardMask, board_mask: CardMask, opponents: int) -> EquityResult:
+        card1, card2 = hand_mask.ids()
+        board_used: list[int] = board_mask.ids()
+        unused_cards: list[int] = (FULL_DECK - hand_mask - board_mask).ids()
+        wins = ties = losses = 0
+        share = 0.0
+        for runout in combinations(unused_cards, 5 - len(board_used)):
+            board_ids = (*board_used, *runout)
+            player_rank = evaluate_cards(card1, card2, *board_ids)
+            # every opponent holding is evaluated once per board, then combined
+            runout_set = set(runout)
+            remaining = [card for card in unused_cards if card not in runout_set]
+            holdings = [
+                (1 << a | 1 << b, evaluate_cards(a, b, *board_ids))
+                for a, b in combinations(remaining, 2)
+            ]
+            for holding_set in combinations(holdings, opponents):
+                used = 0
+                for card_bits, _ in holding_set:
+                    if used & card_bits:
+                        break
+                    used |= card_bits
+                else:
+                    opponent_ranks = [rank for _, rank in holding_set]
+                    best = min(opponent_ranks)
+                    # lower phevaluator rank is the better hand
+                    if player_rank < best:
+                        wins += 1
+                        share += 1
+                    elif player_rank == best:
+                        ties += 1
+                        share += 1 / (1 + opponent_ranks.count(best))
+                    else:
+                        losses += 1
+        samples = wins + ties + losses
+        return EquityResult(wins, ties, losses, share / samples, samples, True)
+
+    def _sample(self, hand_mask: CardMask, board_mask: CardMask, opponents: int) -> EquityResult:
+        card1, card2 = hand_mask.ids()
+        board_used: list[int] = board_mask.ids()
+        wins = ties = losses = 0
+        share = 0.0
+        if len(board_used) == 5:
             # evaluate player hand outside of loop if board complete
-            used_cards.update(board_used)
-            player_hand_rank = evaluate_cards(card1.id, card2.id, *board_used)
-        unused_cards: list[int] = list(filter(lambda x: x not in used_cards, Card.ALL_CARDS_ID))
-        new_cards_per_it: int = 5 - len(board_used) + (players - 1) * 2
+            player_hand_rank = evaluate_cards(card1, card2, *board_used)
+        unused_cards: list[int] = (FULL_DECK - hand_mask - board_mask).ids()
+        new_cards_per_it: int = 5 - len(board_used) + opponents * 2
         for _ in range(self.iterations):
-            new_cards: list[int] = random.sample(unused_cards, new_cards_per_it)
+            new_cards: list[int] = self.rng.sample(unused_cards, new_cards_per_it)
             new_comm_cards = []
             if len(board_used) != 5:
                 new_comm_cards = new_cards[len(board_used)-5:]
-                player_hand_rank = evaluate_cards(card1.id, card2.id, *board_used, *new_comm_cards)
-            if all(
-                evaluate_cards(
-                    new_cards[2*i], new_cards[2*i+1], *board_used, *new_comm_cards
-                ) > player_hand_rank for i in range(players - 1)
-                    ):
+                player_hand_rank = evaluate_cards(card1, card2, *board_used, *new_comm_cards)
+            opponent_ranks = [
+                evaluate_cards(new_cards[2*i], new_cards[2*i+1], *board_used, *new_comm_cards)
+                for i in range(opponents)
+            ]
+            best = min(opponent_ranks)
+            if player_hand_rank < best:
                 wins += 1
-        return wins / self.iterations
+                share += 1
+            elif player_hand_rank == best:
+                ties += 1
+                share += 1 / (1 + opponent_ranks.count(best))
+            else:
+                losses += 1
+        return EquityResult(wins, ties, losses, share / self.iterations, self.iterations, False)
+
+    def estimate(self, cards: Union[tuple[Card, Card], CardMask], players: int,
+                 board: Optional[Union[list[Card], CardMask]] = None,
+                 tolerance: Optional[float] = 0.005, time_limit: Optional[float] = None,
+                 max_samples: int = 1_000_000, batch_size: int = 2048,
+                 executor: Optional[Executor] = None, workers: int = 1) -> EquityResult:
+        '''
+        Monte Carlo equity in batches of batch_size samples, stopping as soon as
+        - the standard error of equity is at most tolerance (None to ignore), or
+        - time_limit seconds have passed since the call (checked between batches), or
+        - max_samples have been drawn
+        Returns the samples actually used and std_error (see confidence_interval).
+        With an executor (eg a long lived ProcessPoolExecutor) workers batches are
+        run in parallel per round (serially without one). Batches are seeded from self.rng,
+        so with the same workers results are reproducible whatever the executor
+        (a different workers changes the batches drawn per round and where it stops).
+        '''
+        _check_players(players)
+        if max_samples < 1:
+            raise ValueError(f"max_samples must be positive, got {max_samples}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if workers < 1:
+            raise ValueError(f"workers must be positive, got {workers}")
+        start = time.perf_counter()
+        hand_mask, board_mask = self._to_masks(cards, board)
+        hand_ids, board_ids = tuple(hand_mask.ids()), tuple(board_mask.ids())
+        wins = ties = samples = 0
+        share = share_sq = 0.0
+        std_error = float("inf")
+        while samples < max_samples:
+            batches = [min(batch_size, max_samples - samples - i * batch_size)
+                       for i in range(workers)]
+            args = [(hand_ids, board_ids, players - 1, n, self.rng.getrandbits(64))
+                    for n in batches if n > 0]
+            if executor is None:
+                results = [_sample_batch(*arg) for arg in args]
+            else:
+                results = [future.result() for future in
+                           [executor.submit(_sample_batch, *arg) for arg in args]]
+            for (batch_wins, batch_ties, batch_share, batch_share_sq), arg in zip(results, args):
+                wins += batch_wins
+                ties += batch_ties
+                share += batch_share
+                share_sq += batch_share_sq
+                samples += arg[3]
+            if samples > 1:
+                variance = max(share_sq - share * share / samples, 0.0) / (samples - 1)
+                std_error = sqrt(variance / samples)
+            if tolerance is not None and std_error <= tolerance:
+                break
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+        return EquityResult(wins, ties, samples - wins - ties, share / samples, samples, False,
+                            std_error)
+
+    def _evaluate_hand_strength(self, cards: Union[tuple[Card, Card], CardMask], players: int,
+                                board: Optional[Union[list[Card], CardMask]] = None) -> float:
+        '''
+        Equity (ties paying their split share), see equity
+        Use external library for evaluate_cards for speed purposes (as need to run many iterations)
+        cards and board may be given as CardMask, results are cached by equity
+        '''
+        return self.equity(cards, players, board).equity
+
+def _result_samples(result: EquityResult, *_, **__) -> int:
+    return result.samples
+
+def _batch_samples(result, hands, boards, opponents, samples: int = 500, rng=None) -> int:
+    return len(hands) * samples
+
+instrumentation.register(EquityCalculator, "equity", "equity")
+instrumentation.register(EquityCalculator, "_compute", counters={"equity_samples": _result_samples})
+instrumentation.register(EquityCalculator, "estimate", "equity",
+                         counters={"equity_samples": _result_samples})
+instrumentation.register(sys.modules[__name__], "batch_equity", "equity",
+                         counters={"equity_samples": _batch_samples})
 
-print(EquityCalculator()._evaluate_hand_strength((Card(50), Card(51)), 5))
\ No newline at end of file
+if __name__ == "__main__":
+    print(EquityCalculator()._evaluate_hand_strength((Card(50), Card(51)), 5))
+    result = EquityCalculator(seed=0).estimate((Card(50), Card(51)), 5, tolerance=0.002,
+                                               time_limit=0.05)
+    print(result.equity, result.confidence_interval(), result.samples)
@@ -0,0 +1,125 @@
+'''
+Weighted hand ranges in standard notation, eg HandRange.parse("QQ+,AKs,A5s-A2s:0.5,AhKh")
+
+Comma separated terms, each optionally followed by ":weight" (default 1):
+- pairs "QQ", "QQ+" (QQ to AA), "99-QQ"
+- unpaired hands "AK" (all 16 combos), "AKs" / "AKo", "A2s+" (A2s to AKs),
+  "A5s-A2s" (same high card, range of kickers)
+- specific combos "AhKh" (ranks 23456789TJQKA, suites cdhs)
+Later terms override the weight of combos already in the range.
+'''
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Union
+from poker_engine.cards import Card
+from poker_engine.card_mask import CardMask
+
+RANK_CHARS = "23456789TJQKA"
+SUITE_CHARS = "cdhs" # same order as Card.SUITES
+_SUITES = len(Card.SUITES)
+
+def _rank(char: str, term: str) -> int:
+    rank = RANK_CHARS.find(char.upper())
+    if rank < 0:
+        raise ValueError(f"Invalid rank {char!r} in range term {term!r}")
+    return rank
+
+def _card_id(text: str, term: str) -> int:
+    suite = SUITE_CHARS.find(text[1].lower())
+    if suite < 0:
+        raise ValueError(f"Invalid suite {text[1]!r} in range term {term!r}")
+    return _rank(text[0], term) * _SUITES + suite
+
+def _combo(card1: int, card2: int) -> tuple[int, int]:
+    return (card1, card2) if card1 > card2 else (card2, card1)
+
+def _rank_combos(high: int, low: int, kind: str) -> list[tuple[int, int]]:
+    '''kind is 's' (suited), 'o' (offsuit) or '' (both), ignored for pairs'''
+    if high == low:
+        return [_combo(*cards) for cards in combinations(range(high * _SUITES, (high + 1) * _SUITES), 2)]
+    return [
+        _combo(high * _SUITES + suite1, low * _SUITES + suite2)
+        for suite1 in range(_SUITES) for suite2 in range(_SUITES)
+        if kind == '' or (kind == 's') == (suite1 == suite2)
+    ]
+
+def _hand(text: str, term: str) -> tuple[int, int, str]:
+    if len(text) not in (2, 3) or (len(text) == 3 and text[2] not in "so"):
+        raise ValueError(f"Invalid hand {text!r} in range term {term!r}")
+    rank1, rank2 = _rank(text[0], term), _rank(text[1], term)
+    kind = text[2] if len(text) == 3 else ''
+    if rank1 == rank2 and kind:
+        raise ValueError(f"Pairs cannot be suited or offsuit in range term {term!r}")
+    return max(rank1, rank2), min(rank1, rank2), kind
+
+def _term_combos(term: str) -> list[tuple[int, int]]:
+    if len(term) == 4 and term[1].lower() in SUITE_CHARS and term[3].lower() in SUITE_CHARS:
+        card1, card2 = _card_id(term[:2], term), _card_id(term[2:], term)
+        if card1 == card2:
+            raise ValueError(f"Duplicate card in range term {term!r}")
+        return [_combo(card1, card2)]
+    if term.endswith('+'):
+        high, low, kind = _hand(term[:-1], term)
+        if high == low:
+            return [combo for rank in range(low, len(RANK_CHARS)) for combo in _rank_combos(rank, rank, kind)]
+        return [combo for rank in range(low, high) for combo in _rank_combos(high, rank, kind)]
+    if '-' in term:
+        first, _, last = term.partition('-')
+        high1, low1, kind1 = _hand(first, term)
+        high2, low2, kind2 = _hand(last, term)
+        if kind1 != kind2 or (high1 == low1) != (high2 == low2) or (high1 != low1 and high1 != high2):
+            raise ValueError(f"Invalid span {term!r}")
+        if high1 == low1:
+            return [combo for rank in range(min(low1, low2), max(low1, low2) + 1)
+                    for combo in _rank_combos(rank, rank, kind1)]
+        return [combo for rank in range(min(low1, low2), max(low1, low2) + 1)
+                for combo in _rank_combos(high1, rank, kind1)]
+    return _rank_combos(*_hand(term, term))
+
+@dataclass
+class HandRange:
+    '''Combos as (higher card id, lower card id) with their weights'''
+    weights: dict[tuple[int, int], float]
+
+    @classmethod
+    def parse(cls, text: str) -> "HandRange":
+        weights: dict[tuple[int, int], float] = {}
+        for term in text.replace(' ', '').split(','):
+            if not term:
+                continue
+            term, _, weight = term.partition(':')
+            weight = float(weight) if weight else 1.0
+            for combo in _term_combos(term):
+                weights[combo] = weight
+        if not weights:
+            raise ValueError(f"Empty range {text!r}")
+        return cls(weights)
+
+    @classmethod
+    def from_hand(cls, cards: Union[tuple[Card, Card], CardMask]) -> "HandRange":
+        '''Range of a single known hand'''
+        ids = cards.ids() if isinstance(cards, CardMask) else [card.id for card in cards]
+        assert len(ids) == 2
+        return cls({_combo(*ids): 1.0})
+
+    @classmethod
+    def of(cls, value: Union[str, "HandRange", tuple[Card, Card], CardMask]) -> "HandRange":
+        if isinstance(value, HandRange):
+            return value
+        if isinstance(value, str):
+            return cls.parse(value)
+        return cls.from_hand(value)
+
+    def without(self, dead: int) -> "HandRange":
+        '''Range without combos using a card of the dead CardMask, or zero weight combos'''
+        return HandRange({
+            combo: weight for combo, weight in self.weights.items()
+            if weight > 0 and not dead & CardMask.from_ids(combo)
+        })
+
+    @property
+    def combos(self) -> list[tuple[int, int]]:
+        return list(self.weights)
+
+    def __len__(self) -> int:
+        return len(self.weights)
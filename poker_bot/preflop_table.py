@@ -0,0 +1,150 @@
+'''
+Run from root PYTHONPATH=. python poker_bot/preflop_table.py to regenerate the table
+(requires numpy, a few minutes on one core)
+
+Precomputed preflop equity of the 169 canonical starting hands against 1 to 8
+random opponents (2 to 9 players, HandManager's range), stored in
+data/preflop_equity.bin and loaded lazily on first lookup.
+Each cell holds the win rate, tie rate and equity (ties paying their split share)
+estimated from SAMPLES Monte Carlo deals, so the standard error of every value is
+at most 0.5 / sqrt(SAMPLES) (~0.0016), quantised to 1/65535.
+'''
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+from poker_engine.cards import Card
+
+HAND_CLASSES = 169
+MIN_PLAYERS, MAX_PLAYERS = 2, 9
+SAMPLES = 100_000
+TABLE_PATH = os.path.join(os.path.dirname(__file__), "data", "preflop_equity.bin")
+
+_MAGIC = b"WSPF\x01"
+_HEADER = struct.Struct("<5sIBB") # magic, samples, min players, max players
+_FIELDS = 3 # win rate, tie rate, equity
+_SCALE = 65535
+_RANKS = len(Card.RANKS)
+_SUITES = len(Card.SUITES)
+
+def hand_class(card1: int, card2: int) -> int:
+    '''
+    Index (0-168) of the canonical starting hand of two card ids: 13 pairs, then
+    78 suited and 78 offsuit hands ordered by (high rank, low rank)
+    '''
+    rank1, rank2 = card1 // _SUITES, card2 // _SUITES
+    high, low = max(rank1, rank2), min(rank1, rank2)
+    if high == low:
+        return high
+    unpaired = high * (high - 1) // 2 + low # 0-77
+    return _RANKS + unpaired + (0 if card1 % _SUITES == card2 % _SUITES else 78)
+
+def hand_class_name(index: int) -> str:
+    high, low, suited = _class_ranks(index)
+    name = Card.RANKS[high].replace('10', 'T') + Card.RANKS[low].replace('10', 'T')
+    return name if high == low else name + ('s' if suited else 'o')
+
+def _class_ranks(index: int) -> tuple[int, int, bool]:
+    if index < _RANKS:
+        return index, index, False
+    unpaired, offsuit = (index - _RANKS) % 78, index - _RANKS >= 78
+    high = 1
+    while (high + 1) * high // 2 <= unpaired:
+        high += 1
+    return high, unpaired - high * (high - 1) // 2, not offsuit
+
+def representative(index: int) -> tuple[int, int]:
+    '''Two card ids of the given hand class'''
+    high, low, suited = _class_ranks(index)
+    return high * _SUITES, low * _SUITES + (0 if suited else 1)
+
+class PreflopTable:
+    def __init__(self, path: str = TABLE_PATH):
+        self.path = path
+        self._values: Optional[array] = None
+        self.samples = 0
+
+    def _load(self):
+        with open(self.path, "rb") as file:
+            magic, samples, min_players, max_players = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != _MAGIC or (min_players, max_players) != (MIN_PLAYERS, MAX_PLAYERS):
+                raise ValueError(f"{self.path} is not a compatible preflop table")
+            values = array('H')
+            values.frombytes(file.read())
+        if sys.byteorder == "big": # stored little-endian
+            values.byteswap()
+        if values.itemsize != 2 or \
+          len(values) != HAND_CLASSES * (MAX_PLAYERS - MIN_PLAYERS + 1) * _FIELDS:
+            raise ValueError(f"{self.path} has an unexpected size")
+        self.samples, self._values = samples, values
+
+    def lookup(self, card1: int, card2: int, players: int) -> tuple[float, float, float]:
+        '''(win rate, tie rate, equity) of two card ids against players - 1 random hands'''
+        if not MIN_PLAYERS <= players <= MAX_PLAYERS:
+            raise ValueError(f"Preflop table covers {MIN_PLAYERS} to {MAX_PLAYERS} players")
+        if self._values is None:
+            self._load()
+        offset = (hand_class(card1, card2) * (MAX_PLAYERS - MIN_PLAYERS + 1)
+                  + players - MIN_PLAYERS) * _FIELDS
+        win, tie, equity = self._values[offset:offset + _FIELDS]
+        return win / _SCALE, tie / _SCALE, equity / _SCALE
+
+_default_table: Optional[PreflopTable] = None
+
+def default_table() -> PreflopTable:
+    '''Shared table, its file is only read on the first lookup'''
+    global _default_table
+    if _default_table is None:
+        _default_table = PreflopTable()
+    return _default_table
+
+def build_table(samples: int = SAMPLES, seed: int = 0, chunk: int = 20_000) -> array:
+    '''
+    Monte Carlo estimate of every cell. For each hand class the same deals are
+    shared by all player counts (the first players - 1 opponents are used).
+    '''
+    import numpy as np
+    from poker_engine.batch_evaluator import evaluate_showdowns
+    rng = np.random.default_rng(seed)
+    opponents = MAX_PLAYERS - 1
+    values = array('H')
+    for index in range(HAND_CLASSES):
+        hero = representative(index)
+        deck = np.array([card for card in Card.ALL_CARDS_ID if card not in hero])
+        totals = np.zeros((opponents, _FIELDS))
+        for start in range(0, samples, chunk):
+            n = min(chunk, samples - start)
+            deals = deck[np.argsort(rng.random((n, len(deck))), axis=1)[:, :5 + 2 * opponents]]
+            holes = np.concatenate(
+                [np.broadcast_to(np.array(hero), (n, 1, 2)), deals[:, 5:].reshape(n, opponents, 2)],
+                axis=1
+            )
+            strengths = evaluate_showdowns(deals[:, :5], holes)
+            hero_strength = strengths[:, :1]
+            for k in range(1, opponents + 1):
+                opp = strengths[:, 1:k + 1]
+                best = opp.max(axis=1, keepdims=True)
+                win = (hero_strength > best)[:, 0]
+                tie = (hero_strength == best)[:, 0]
+                tied_with = (opp == hero_strength).sum(axis=1)
+                totals[k - 1] += (win.sum(), tie.sum(), win.sum() + (tie / (1 + tied_with)).sum())
+        for k in range(opponents):
+            values.extend(int(round(value / samples * _SCALE)) for value in totals[k])
+    return values
+
+def write_table(values: array, samples: int, path: str = TABLE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, samples, MIN_PLAYERS, MAX_PLAYERS))
+        if sys.byteorder == "big":
+            values = array('H', values)
+            values.byteswap()
+        file.write(values.tobytes())
+
+if __name__ == "__main__":
+    write_table(build_table(), SAMPLES)
+    table = PreflopTable()
+    for name, cards in (("AA", (48, 49)), ("72o", (20, 1))):
+        print(name, [round(table.lookup(*cards, players)[2], 4)
+                     for players in range(MIN_PLAYERS, MAX_PLAYERS + 1)])
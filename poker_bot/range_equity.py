@@ -0,0 +1,199 @@
+'''
+Run from root PYTHONPATH=. python poker_bot/range_equity.py
+
+Equity of weighted hand ranges (or known hands) against each other (requires numpy).
+Ranges are HandRange objects, range strings like "QQ+,AKs" or hole card tuples.
+
+- Heads-up spots whose (runouts x combos x combos) fit in exact_budget are
+  enumerated exactly: each combo is evaluated once per runout with the batch
+  evaluator and all combo pairs are compared as a matrix, card conflicts masked out
+- Everything else is sampled in vectorised batches. Instead of rejecting deals
+  with conflicting combos, each player's combo is drawn among those compatible
+  with the cards already taken, and the deal is weighted by the product of the
+  compatible weight totals (sequential importance sampling, the totals found by
+  inclusion-exclusion over the taken cards), which keeps the estimate unbiased
+  for the weighted ranges
+'''
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import combinations
+from math import comb
+from typing import Optional, Union
+import numpy as np
+from poker_engine.cards import Card
+from poker_engine.card_mask import CardMask, FULL_DECK
+from poker_engine.batch_evaluator import evaluate_showdowns
+from poker_bot.hand_range import HandRange
+
+RangeLike = Union[str, HandRange, tuple[Card, Card], CardMask]
+
+_CARD_BIT = np.array([1 << card for card in Card.ALL_CARDS_ID], dtype=np.int64)
+
+@dataclass
+class RangeEquityResult:
+    equities: list[float] # share of the pot won on average by each range, in order
+    samples: int # runouts x combo pairs enumerated, or deals sampled and kept
+    exact: bool
+
+class _RangeArrays:
+    def __init__(self, hand_range: HandRange):
+        self.cards = np.array(hand_range.combos, dtype=np.intp).reshape(-1, 2)
+        self.bits = _CARD_BIT[self.cards].sum(axis=1)
+        self.weights = np.array(list(hand_range.weights.values()), dtype=np.float64)
+        self.cumulative = self.weights.cumsum()
+        self.total = float(self.cumulative[-1])
+        # total weight of the combos holding each card, and of each exact combo
+        self.card_weights = np.zeros(Card.DECK_SIZE)
+        np.add.at(self.card_weights, self.cards.reshape(-1), np.repeat(self.weights, 2))
+        self.pair_weights = np.zeros((Card.DECK_SIZE, Card.DECK_SIZE))
+        self.pair_weights[self.cards[:, 0], self.cards[:, 1]] = self.weights
+        self.pair_weights[self.cards[:, 1], self.cards[:, 0]] = self.weights
+
+    def compatible_totals(self, held: np.ndarray) -> np.ndarray:
+        '''Weight of the combos not using any of held (N, k) distinct cards, by inclusion-exclusion'''
+        pairs = self.pair_weights[held[:, :, None], held[:, None, :]].sum(axis=(1, 2)) / 2
+        return self.total - self.card_weights[held].sum(axis=1) + pairs
+
+    def draw(self, used: np.ndarray, rng: np.random.Generator, attempts: int = 8) -> np.ndarray:
+        '''
+        Combo index per row drawn by weight among the combos compatible with used
+        card bits: redraws conflicting rows a few times, then masks the stragglers
+        '''
+        picks = np.searchsorted(self.cumulative, rng.random(len(used)) * self.total, side="right")
+        picks = np.minimum(picks, len(self.weights) - 1)
+        conflict = np.flatnonzero(self.bits[picks] & used)
+        for _ in range(attempts):
+            if not len(conflict):
+                return picks
+            redraw = np.searchsorted(self.cumulative, rng.random(len(conflict)) * self.total,
+                                     side="right")
+            picks[conflict] = np.minimum(redraw, len(self.weights) - 1)
+            conflict = conflict[(self.bits[picks[conflict]] & used[conflict]) != 0]
+        if len(conflict):
+            weights = self.weights[None, :] * ((self.bits[None, :] & used[conflict, None]) == 0)
+            cumulative = weights.cumsum(axis=1)
+            targets = rng.random(len(conflict)) * cumulative[:, -1]
+            picks[conflict] = np.minimum((cumulative <= targets[:, None]).sum(axis=1),
+                                         len(self.weights) - 1)
+        return picks
+
+def _masks(cards: Optional[Union[list[Card], CardMask]]) -> CardMask:
+    return cards if isinstance(cards, CardMask) else CardMask.from_cards(cards or ())
+
+def range_equity(ranges: Sequence[RangeLike], board: Optional[Union[list[Card], CardMask]] = None,
+                 dead: Optional[Union[list[Card], CardMask]] = None, samples: int = 20_000,
+                 exact_budget: int = 5_000_000, rng: Optional[np.random.Generator] = None,
+                 seed: Optional[int] = None, batch_size: int = 4096) -> RangeEquityResult:
+    '''
+    Equity of each range against the others on board (0, 3, 4 or 5 cards) with
+    dead cards removed from the deck and from the ranges
+    '''
+    board_mask, dead_mask = _masks(board), _masks(dead)
+    assert not board_mask or 3 <= len(board_mask) <= 5
+    assert not board_mask & dead_mask
+    hand_ranges = [HandRange.of(value).without(board_mask | dead_mask) for value in ranges]
+    if len(hand_ranges) < 2:
+        raise ValueError("At least two ranges are needed")
+    for i, hand_range in enumerate(hand_ranges):
+        if not len(hand_range):
+            raise ValueError(f"Range {i} has no combos left after removing board and dead cards")
+    arrays = [_RangeArrays(hand_range) for hand_range in hand_ranges]
+    unseen = (FULL_DECK - board_mask - dead_mask).ids()
+    board_needed = 5 - len(board_mask)
+    if len(arrays) == 2 and \
+      comb(len(unseen), board_needed) * len(arrays[0].weights) * len(arrays[1].weights) <= exact_budget:
+        return _enumerate_heads_up(arrays, board_mask.ids(), unseen, board_needed)
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    return _sample(arrays, board_mask.ids(), board_mask | dead_mask, board_needed,
+                   samples, rng, batch_size)
+
+def _enumerate_heads_up(arrays: list[_RangeArrays], board_ids: list[int], unseen: list[int],
+                        board_needed: int) -> RangeEquityResult:
+    first, second = arrays
+    compatible = (first.bits[:, None] & second.bits[None, :]) == 0
+    pair_weights = first.weights[:, None] * second.weights[None, :] * compatible
+    runouts = np.array(list(combinations(unseen, board_needed)), dtype=np.intp) \
+        .reshape(comb(len(unseen), board_needed), board_needed)
+    boards = np.concatenate([np.broadcast_to(np.array(board_ids, dtype=np.intp),
+                                             (len(runouts), len(board_ids))), runouts], axis=1)
+    runout_bits = _CARD_BIT[runouts].sum(axis=1)
+    # two cards off each board: the stand-in hole for combos using a runout card
+    on_board = (boards[:, :, None] == np.arange(7)).any(axis=1)
+    placeholders = np.argsort(on_board, axis=1, kind="stable")[:, :2]
+    share = total = 0.0
+    # bound the (runouts, combos, combos) temporaries to a few million cells
+    chunk = max(1, 4_000_000 // pair_weights.size)
+    for start in range(0, len(boards), chunk):
+        chunk_boards, bits = boards[start:start + chunk], runout_bits[start:start + chunk]
+        free = [(arr.bits[None, :] & bits[:, None]) == 0 for arr in arrays]
+        # evaluate conflicting combos as the placeholder hole, they are masked out below
+        strengths = [
+            evaluate_showdowns(chunk_boards, np.where(
+                arr_free[:, :, None], arr.cards[None, :, :],
+                placeholders[start:start + chunk, None, :]))
+            for arr, arr_free in zip(arrays, free)
+        ]
+        weights = pair_weights[None, :, :] * free[0][:, :, None] * free[1][:, None, :]
+        outcome = np.sign(strengths[0][:, :, None] - strengths[1][:, None, :]) # 1 win, 0 tie, -1 loss
+        share += float((weights * (outcome + 1)).sum()) / 2
+        total += float(weights.sum())
+    if not total:
+        raise ValueError("The ranges have no compatible combos")
+    return RangeEquityResult([share / total, 1 - share / total],
+                             int(np.count_nonzero(pair_weights)) * len(boards), True)
+
+def _sample(arrays: list[_RangeArrays], board_ids: list[int], taken: CardMask, board_needed: int,
+            samples: int, rng: np.random.Generator, batch_size: int) -> RangeEquityResult:
+    player_num = len(arrays)
+    taken_ids = taken.ids()
+    # card id bits like _RangeArrays.bits, not the suit lanes of CardMask
+    taken_bits = int(_CARD_BIT[taken_ids].sum()) if taken_ids else 0
+    shares = np.zeros(player_num)
+    total = 0.0
+    kept = 0
+    for start in range(0, samples, batch_size):
+        n = min(batch_size, samples - start)
+        used = np.full(n, taken_bits, dtype=np.int64)
+        held = np.empty((n, len(taken_ids) + 2 * player_num), dtype=np.intp)
+        held[:, :len(taken_ids)] = taken_ids
+        deal_weights = np.ones(n)
+        for player, arr in enumerate(arrays):
+            held_num = len(taken_ids) + 2 * player
+            deal_weights *= arr.compatible_totals(held[:, :held_num])
+            picks = arr.draw(used, rng)
+            held[:, held_num:held_num + 2] = arr.cards[picks]
+            used |= arr.bits[picks]
+        # deals where some range had nothing left carry no weight (and may hold duplicates)
+        valid = deal_weights > 1e-9 * np.prod([arr.total for arr in arrays])
+        if not valid.all():
+            n, used, held, deal_weights = \
+                int(valid.sum()), used[valid], held[valid], deal_weights[valid]
+        # the runout is uniform over the cards nobody holds
+        keys = rng.random((n, Card.DECK_SIZE))
+        keys[((used[:, None] >> np.arange(Card.DECK_SIZE)) & 1).astype(bool)] = 2.0
+        runouts = keys.argpartition(board_needed, axis=1)[:, :board_needed] if board_needed \
+            else np.empty((n, 0), dtype=np.intp)
+        boards = np.concatenate([np.broadcast_to(np.array(board_ids, dtype=np.intp),
+                                                 (n, len(board_ids))), runouts], axis=1)
+        dealt = np.sort(np.concatenate([held, runouts], axis=1), axis=1)
+        assert not (dealt[:, 1:] == dealt[:, :-1]).any(), "a sampled deal reuses a card"
+        kept += n
+        strengths = evaluate_showdowns(boards, held[:, len(taken_ids):].reshape(n, player_num, 2))
+        winners = strengths == strengths.max(axis=1, keepdims=True)
+        shares += (deal_weights[:, None] * winners / winners.sum(axis=1, keepdims=True)).sum(axis=0)
+        total += float(deal_weights.sum())
+    if not total:
+        raise ValueError("The ranges have no compatible combos")
+    return RangeEquityResult((shares / total).tolist(), kept, False)
+
+if __name__ == "__main__":
+    import time
+    for spot, board in (
+        (["AhKh", "QQ+,AKs,A5s-A2s"], None),
+        (["QQ+,AKs", "JJ-66,AQs-ATs,KQs"], [Card(0), Card(21), Card(38)]),
+        (["AK", "22+", "T9s,98s,87s", "A2s+"], None),
+    ):
+        start = time.perf_counter()
+        result = range_equity(spot, board, seed=0)
+        print(spot, [round(equity, 4) for equity in result.equities],
+              "exact" if result.exact else "sampled", f"{time.perf_counter() - start:.3f}s")
@@ -0,0 +1,105 @@
+'''
+Simple reference bots, mainly for simulations and benchmarks.
+'''
+import random
+from typing import Optional
+from poker_engine.players import AutonomousPlayer, BatchedPlayer
+from poker_engine.action_type import ActionType
+
+class CallingBot(AutonomousPlayer):
+    '''Always checks/calls, goes all in only when it cannot call'''
+    def make_decision(self, state, hand_status, game_status) -> dict:
+        if state["options"][ActionType.CALL]:
+            return {"action": ActionType.CALL}
+        return {"action": ActionType.ALL_IN}
+
+class RandomBot(AutonomousPlayer):
+    '''
+    Folds with fold_prob, makes a minimum raise with raise_prob, otherwise calls
+    (all in if it cannot call). Draws from rng, a random.Random(seed) if seed is
+    given, otherwise the global random module.
+    '''
+    def __init__(self, initial_balance: int, fold_prob: float = 0.2, raise_prob: float = 0.1,
+                 rng: Optional[random.Random] = None, seed: Optional[int] = None):
+        super().__init__(initial_balance)
+        self.fold_prob = fold_prob
+        self.raise_prob = raise_prob
+        self.rng = rng or (random if seed is None else random.Random(seed))
+
+    def make_decision(self, state, hand_status, game_status) -> dict:
+        options = state["options"]
+        roll = self.rng.random()
+        if roll < self.fold_prob:
+            return {"action": ActionType.FOLD}
+        if roll < self.fold_prob + self.raise_prob and options[ActionType.RAISE]:
+            return {"action": ActionType.RAISE, "amount": options[ActionType.RAISE][0]}
+        if options[ActionType.CALL]:
+            return {"action": ActionType.CALL}
+        return {"action": ActionType.ALL_IN}
+
+class PushFoldBot(AutonomousPlayer):
+    '''
+    Short stack push/fold: goes all in (or calls one) with a pair or two cards
+    whose ranks (2 = 0 up to ace = 12) add up to at least min_rank_sum, otherwise
+    checks or folds
+    '''
+    def __init__(self, initial_balance: int, min_rank_sum: int = 17):
+        super().__init__(initial_balance)
+        self.min_rank_sum = min_rank_sum
+
+    def make_decision(self, state, hand_status, game_status) -> dict:
+        options = state["options"]
+        card1, card2 = self.hands
+        if card1.val == card2.val or card1.val + card2.val >= self.min_rank_sum:
+            if options[ActionType.ALL_IN]:
+                return {"action": ActionType.ALL_IN}
+            if options[ActionType.RAISE]: # the only richest player, raising is going all in
+                return {"action": ActionType.RAISE, "amount": options[ActionType.RAISE][1]}
+            return {"action": ActionType.CALL}
+        if state["current_bet"] == self.money_in and options[ActionType.CALL]:
+            return {"action": ActionType.CALL}
+        return {"action": ActionType.FOLD}
+
+class EquityBot(BatchedPlayer):
+    '''
+    Calls when its sampled equity against the players still in beats the pot
+    odds, makes a minimum raise when nothing is to call and the equity is at
+    least raise_factor times an equal share of the pot, otherwise checks or folds. Equities of all seats
+    decided together are sampled in one batch_equity pass (requires numpy), each
+    from its own player's rng, so a seed gives the same decisions batched or not.
+    '''
+    def __init__(self, initial_balance: int, samples: int = 300, raise_factor: float = 1.5,
+                 seed: Optional[int] = None):
+        super().__init__(initial_balance)
+        import numpy as np
+        self.samples = samples
+        self.raise_factor = raise_factor
+        self.rng = np.random.default_rng(seed)
+
+    def batch_key(self):
+        # batch_equity draws the same number of samples for every spot
+        return type(self), self.samples
+
+    def make_decisions(self, decisions) -> list[dict]:
+        from poker_bot.equity_calculator import batch_equity
+        equities = batch_equity(
+            [tuple(card.id for card in player.hands) for player, *_ in decisions],
+            [tuple(card.id for card in hand_status["revealed_comm_cards"])
+             for _, _, hand_status, _ in decisions],
+            [hand_status["players_in"] - 1 for _, _, hand_status, _ in decisions],
+            self.samples, [player.rng for player, *_ in decisions]
+        )
+        return [player._decide(state, hand_status, equity)
+                for (player, state, hand_status, _), equity in zip(decisions, equities)]
+
+    def _decide(self, state: dict, hand_status, equity: float) -> dict:
+        options = state["options"]
+        to_call = state["current_bet"] - self.money_in
+        if not to_call and options[ActionType.RAISE] \
+          and equity * hand_status["players_in"] >= self.raise_factor:
+            return {"action": ActionType.RAISE, "amount": options[ActionType.RAISE][0]}
+        if to_call and equity < to_call / (hand_status["pot_size"] + to_call):
+            return {"action": ActionType.FOLD}
+        if options[ActionType.CALL]:
+            return {"action": ActionType.CALL}
+        return {"action": ActionType.ALL_IN if options[ActionType.ALL_IN] else ActionType.FOLD}
@@ -4,10 +4,12 @@ from .poker_manager import PokerManager
 from .hand_manager import HandManager
 from .players import Player
 from .cards import Card
+from .card_mask import CardMask
+from .game_state import GameState
 from .evaluate_hand import HandRank
 from .action_type import ActionType
 from .poker_manager_builder import PokerManagerBuilder
 
 __version__ = "0.1.0"
-__all__ = ["PokerManager", "HandManager", "Player", "Card", "HandRank", 
+__all__ = ["PokerManager", "HandManager", "Player", "Card", "CardMask", "GameState", "HandRank", 
            "ActionType", "PokerManagerBuilder"]
\ No newline at end of file
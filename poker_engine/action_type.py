@@ -7,4 +7,6 @@ class ActionType(Enum):
     FOLD = "F"
     CALL = "C"
     RAISE = "R"
-    ALL_IN = "A"
\ No newline at end of file
+    ALL_IN = "A"
+    # members are singletons, identity hashing avoids Enum.__hash__ on every options lookup
+    __hash__ = object.__hash__
\ No newline at end of file
@@ -0,0 +1,134 @@
+'''
+Settlement of hands that end with board cards still to come (every player
+still in but at most one is all in, so no more betting can happen).
+
+By default HandManager deals the rest of the board once and pays the pots on it.
+Pass an AllInSettlement (HandManager, PokerManager or
+PokerManagerBuilder.with_all_in_settlement) to pay them differently:
+- RunItTimes(n) deals n boards from the unseen cards, the first one being the
+  dealt board, and splits every pot evenly between them
+- EquityChop() pays every pot by expected value: each player gets the pot times
+  their share of it over every possible rest of the board (sampled when there
+  are more than exact_budget of them)
+Both pay the same on average as a single runout, with far less variance, which
+cuts the hands needed to compare bots. Chips stay integers: odd chips go to the
+winners nearest the small blind, equity chops round by largest remainder.
+Sampling draws from a random.Random seeded with the hand's dealt cards, so
+replaying a hand with the same settlement reproduces its balances.
+'''
+import random
+from abc import ABC, abstractmethod
+from itertools import combinations
+from math import comb
+from typing import Optional
+from .card_mask import CARD_BITS, FULL_DECK, CardMask
+# held directly, every runout evaluated is not a showdown for instrumentation
+from .evaluate_hand import get_masks_strength
+
+# divisible by any number of winners up to HandManager.MAX_PLAYERS
+_SHARE_UNITS = 2520
+
+class AllInSettlement(ABC):
+    @abstractmethod
+    def settle(self, pots: list[tuple[int, list[int]]], hands: list[Optional[int]], dead: int,
+               board: list[int], known: int, small_blind_pos: int, rng: random.Random
+               ) -> list[tuple[int, int, int]]:
+        '''
+        pots - (chips, contending positions) per pot, main pot first (PotLedger.pots)
+        hands - hole cards CardMask per position, None for folded players
+        dead - CardMask of the folded players' hole cards
+        board - the 5 dealt board card ids, of which the first known were revealed
+        Returns (pot index, position, chips won) like PotLedger.settle, one
+        entry per player and pot won.
+        '''
+
+def _unseen(board: list[int], known: int, hands: list[Optional[int]], dead: int) -> list[int]:
+    # cards the rest of the board can come from: not dealt to anyone nor revealed
+    used = CardMask.from_ids(board[:known]) | dead
+    for hand in hands:
+        if hand is not None:
+            used |= hand
+    return (FULL_DECK - used).ids()
+
+def _order(small_blind_pos: int, player_num: int):
+    return lambda pos: (pos - small_blind_pos) % player_num
+
+class RunItTimes(AllInSettlement):
+    '''Every pot split evenly over runs boards, fewer if the unseen cards run out'''
+    def __init__(self, runs: int = 2):
+        if runs < 1:
+            raise ValueError("runs must be positive")
+        self.runs = runs
+
+    def settle(self, pots, hands, dead, board, known, small_blind_pos, rng):
+        needed = len(board) - known
+        # the dealt board is the first run, the others are drawn from the cards left
+        unseen = [card for card in _unseen(board, known, hands, dead) if card not in board[known:]]
+        runs = min(self.runs, 1 + len(unseen) // needed) if needed else 1
+        drawn = rng.sample(unseen, needed * (runs - 1))
+        boards = [board] + [board[:known] + drawn[i * needed:(i + 1) * needed] for i in range(runs - 1)]
+        order = _order(small_blind_pos, len(hands))
+        won: dict[tuple[int, int], int] = {}
+        for run, run_board in enumerate(boards):
+            strengths = get_masks_strength(CardMask.from_ids(run_board), hands)
+            for pot, (amount, contenders) in enumerate(pots):
+                chips = amount // runs + (run < amount % runs)
+                best = max(strengths[pos] for pos in contenders)
+                winners = sorted((pos for pos in contenders if strengths[pos] == best), key=order)
+                share, odd = divmod(chips, len(winners))
+                for i, pos in enumerate(winners):
+                    won[pot, pos] = won.get((pot, pos), 0) + share + (i < odd)
+        return sorted((pot, pos, chips) for (pot, pos), chips in won.items() if chips)
+
+def _sampled_runouts(unseen: list[int], needed: int, count: int, rng: random.Random):
+    # disjoint slices of one shuffle are each a uniform runout, far cheaper than a sample per board
+    deck, per_shuffle = list(unseen), len(unseen) // needed
+    for i in range(count):
+        if i % per_shuffle == 0:
+            rng.shuffle(deck)
+        start = i % per_shuffle * needed
+        yield deck[start:start + needed]
+
+class EquityChop(AllInSettlement):
+    '''
+    Every pot paid by expected value over the rest of the board, enumerated
+    exactly when there are at most exact_budget boards, else over exact_budget
+    random ones
+    '''
+    def __init__(self, exact_budget: int = 2_000):
+        self.exact_budget = exact_budget
+
+    def settle(self, pots, hands, dead, board, known, small_blind_pos, rng):
+        needed = len(board) - known
+        unseen = _unseen(board, known, hands, dead)
+        known_mask = int(CardMask.from_ids(board[:known]))
+        if comb(len(unseen), needed) <= self.exact_budget:
+            runouts = combinations(unseen, needed)
+        else:
+            runouts = _sampled_runouts(unseen, needed, self.exact_budget, rng)
+        # units[pot][pos] - share of the pot over all boards, in 1 / _SHARE_UNITS of a board
+        units = [dict.fromkeys(contenders, 0) for _, contenders in pots]
+        boards = 0
+        for runout in runouts:
+            mask = known_mask
+            for card in runout:
+                mask |= CARD_BITS[card]
+            strengths = get_masks_strength(mask, hands)
+            for (_, contenders), pot_units in zip(pots, units):
+                best = max(strengths[pos] for pos in contenders)
+                winners = [pos for pos in contenders if strengths[pos] == best]
+                unit = _SHARE_UNITS // len(winners)
+                for pos in winners:
+                    pot_units[pos] += unit
+            boards += 1
+        order = _order(small_blind_pos, len(hands))
+        payouts = []
+        total = _SHARE_UNITS * boards
+        for pot, ((amount, _), pot_units) in enumerate(zip(pots, units)):
+            chips = {pos: amount * share // total for pos, share in pot_units.items()}
+            # the chips lost rounding down go to the largest remainders
+            left = amount - sum(chips.values())
+            for pos in sorted(pot_units, key=lambda pos: (-(amount * pot_units[pos] % total), order(pos)))[:left]:
+                chips[pos] += 1
+            payouts += [(pot, pos, won) for pos, won in sorted(chips.items()) if won]
+        return payouts
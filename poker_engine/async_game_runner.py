@@ -0,0 +1,105 @@
+'''
+asyncio counterpart of GameRunner for hosting many tables in one process.
+
+Every callback and AutonomousPlayer.make_decision may be a plain function or a
+coroutine function (anything returning an awaitable is awaited), so a table
+waiting on a remote player only holds a suspended coroutine, not a thread.
+With action_timeout set, a decision that is not back in time is replaced by a
+check when the player can check for free, otherwise a fold.
+Run tables concurrently with asyncio.gather(*(runner.play_game(...) for runner in runners)).
+'''
+import asyncio
+import inspect
+from collections.abc import Callable
+from typing import Any, Optional
+from .action_type import ActionType
+from .poker_manager import PokerManager
+from .players import AutonomousPlayer, Player
+
+# asyncio.timeout (3.11+) cancels in place, wait_for wraps every decision in a new task
+_timeout = getattr(asyncio, "timeout", None)
+
+def timeout_action(state: dict, player: Player) -> dict:
+    '''Check if it costs nothing, otherwise fold'''
+    if state["options"][ActionType.CALL] and state["current_bet"] == player.money_in:
+        return {"action": ActionType.CALL}
+    return {"action": ActionType.FOLD}
+
+async def _resolve(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+class AsyncGameRunner:
+    def __init__(self, poker_manager: PokerManager, action_timeout: Optional[float] = None):
+        '''action_timeout - seconds a player (or bot) has per decision, None to wait forever'''
+        self.game: PokerManager = poker_manager
+        self.action_timeout = action_timeout
+        self.timeouts = 0 # decisions replaced by timeout_action
+
+    async def _decide(self, decision: Any, state: dict, player: Player) -> dict:
+        if not inspect.isawaitable(decision):
+            return decision
+        if self.action_timeout is None:
+            return await decision
+        try:
+            if _timeout is not None:
+                async with _timeout(self.action_timeout):
+                    return await decision
+            return await asyncio.wait_for(decision, self.action_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return timeout_action(state, player)
+
+    async def play_game(
+        self,
+        on_player_turn: Optional[Callable[[dict, dict, dict], Any]] = None,
+        on_player_turn_start: Optional[Callable[[dict, dict, dict], Any]] = None,
+        on_new_hand: Optional[Callable[[dict, dict], Any]] = None,
+        on_round_start: Optional[Callable[[dict, dict], Any]] = None,
+        on_round_end: Optional[Callable[[dict, dict, dict], Any]] = None,
+        on_hand_end: Optional[Callable[[dict, dict, dict], Any]] = None,
+        max_hands: Optional[int] = None
+    ) -> int:
+        '''
+        Same callbacks as GameRunner.play_game, returns the number of hands played
+        (until max_hands or a single player is left). Yields to the event loop
+        after every hand, so bot-only tables do not starve the others.
+        '''
+        game_status = self.game.status_view
+        hands_played = 0
+        if max_hands == 0:
+            return hands_played
+        for hand in self.game.advance():
+            hand_status = hand.status_view
+            if on_new_hand:
+                await _resolve(on_new_hand(hand_status, game_status))
+            while not hand.is_complete():
+                if on_round_start:
+                    await _resolve(on_round_start(hand_status, game_status))
+                curr_round = hand.betting_round()
+                state = next(curr_round)
+                while True:
+                    player: Player = state.pop("player")
+                    state["player_status"] = player.private_status
+                    if on_player_turn_start:
+                        await _resolve(on_player_turn_start(state, hand_status, game_status))
+                    if isinstance(player, AutonomousPlayer):
+                        state.pop("player_status")
+                        decision = player.make_decision(state, hand_status, game_status)
+                    elif on_player_turn is not None:
+                        decision = on_player_turn(state, hand_status, game_status)
+                    else:
+                        raise ValueError(f"Player {player.id} has no make_decision method and no callback provided")
+                    user_dict = await self._decide(decision, state, player)
+                    try:
+                        state = curr_round.send(user_dict)
+                    except StopIteration as e:
+                        if on_round_end:
+                            await _resolve(on_round_end(e.value, hand_status, game_status))
+                        break
+            if on_hand_end:
+                await _resolve(on_hand_end(hand.winners, hand_status, game_status))
+            hands_played += 1
+            if hands_played == max_hands:
+                break
+            await asyncio.sleep(0)
+        return hands_played
@@ -0,0 +1,105 @@
+"""
+NumPy-vectorised batch hand evaluation for offline analytics (requires numpy).
+
+Strengths are returned as evaluate_hand.strength_to_int ints, so they compare
+exactly like the (HandRank, value) tuples of the scalar evaluators; the HandRank
+category of a strength is strength // VALUE_SPAN (see hand_ranks).
+The lookups mirror table_evaluator: non-flush hands are found by binary searching
+the sorted base-5 rank keys, flushes by indexing the 13-bit flush rank mask.
+"""
+import numpy as np
+from .cards import Card
+from .card_mask import CARD_BITS, SUITE_SHIFT, RANK_MASK
+from .evaluate_hand import VALUE_SPAN, strength_to_int
+from . import table_evaluator
+
+_SUITES = len(Card.SUITES)
+DEFAULT_CHUNK_SIZE = 1 << 20 # hands per vectorised chunk, bounds temporary memory
+
+_CARD_RANK_KEY = np.array(table_evaluator._CARD_RANK_KEY, dtype=np.int64)
+_CARD_MASK_BIT = np.array(CARD_BITS, dtype=np.int64)
+_LANE_SHIFTS = np.arange(_SUITES, dtype=np.int64) * SUITE_SHIFT
+
+_rank_items = sorted(table_evaluator._RANK_TABLE.items())
+_RANK_KEYS = np.array([key for key, _ in _rank_items], dtype=np.int64)
+_RANK_STRENGTHS = np.array([strength_to_int(strength) for _, strength in _rank_items],
+                           dtype=np.int32)
+del _rank_items
+_FLUSH_STRENGTHS = np.array(
+    [-1 if strength is None else strength_to_int(strength)
+     for strength in table_evaluator._FLUSH_TABLE],
+    dtype=np.int32
+)
+_POPCOUNT = np.array([mask.bit_count() for mask in range(1 << len(Card.RANKS))], dtype=np.int8)
+
+def _strengths(rank_keys: np.ndarray, suite_masks: np.ndarray, card_num: int) -> np.ndarray:
+    # rank_keys (N,), suite_masks (N, 4) of card_num cards each -> strengths (N,)
+    counts = _POPCOUNT[suite_masks]
+    # a repeated card carries into another bit when summed (or vanishes when or-ed),
+    # so the masks hold fewer cards, and its rank key may be missing from the table
+    if (counts.sum(axis=1) != card_num).any():
+        raise ValueError("Every hand must hold distinct cards")
+    strengths = _RANK_STRENGTHS[np.searchsorted(_RANK_KEYS, rank_keys)]
+    flush = counts >= 5
+    has_flush = flush.any(axis=1)
+    if has_flush.any():
+        # at most one suite can hold 5 of 7 cards
+        flush_rows = suite_masks[has_flush]
+        flush_masks = flush_rows[np.arange(len(flush_rows)), flush[has_flush].argmax(axis=1)]
+        strengths[has_flush] = _FLUSH_STRENGTHS[flush_masks]
+    return strengths
+
+def _suite_masks(card_ids: np.ndarray) -> np.ndarray:
+    # card_ids (N, k) -> per suite 13-bit rank masks (N, 4)
+    # cards are distinct so summing their CardMask bits is the same as or-ing them
+    masks = _CARD_MASK_BIT[card_ids].sum(axis=1)
+    return (masks[:, None] >> _LANE_SHIFTS) & RANK_MASK
+
+def evaluate_batch(card_ids, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    '''
+    card_ids - (N, k) int array of distinct card ids per row, 5 <= k <= 7
+    Returns (N,) int32 strengths, raises ValueError if a row repeats a card
+    '''
+    card_ids = np.asarray(card_ids, dtype=np.intp)
+    if card_ids.ndim != 2 or not 5 <= card_ids.shape[1] <= 7:
+        raise ValueError(f"Expected an (N, 5..7) array of card ids, got shape {card_ids.shape}")
+    result = np.empty(len(card_ids), dtype=np.int32)
+    for start in range(0, len(card_ids), chunk_size):
+        chunk = card_ids[start:start + chunk_size]
+        result[start:start + chunk_size] = _strengths(
+            _CARD_RANK_KEY[chunk].sum(axis=1), _suite_masks(chunk), card_ids.shape[1]
+        )
+    return result
+
+def evaluate_showdowns(boards, hole_cards, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    '''
+    boards - (N, 5) int array of community card ids
+    hole_cards - (N, P, 2) int array of each player's hole card ids
+    Returns (N, P) int32 strengths. Board keys and masks are computed once per board
+    and only the hole cards are added per player. Raises ValueError if a player's
+    hole cards repeat each other or a board card (players may share cards).
+    '''
+    boards = np.asarray(boards, dtype=np.intp)
+    hole_cards = np.asarray(hole_cards, dtype=np.intp)
+    if boards.ndim != 2 or hole_cards.ndim != 3 or hole_cards.shape[2] != 2 \
+      or len(boards) != len(hole_cards):
+        raise ValueError(
+            f"Expected (N, k) boards and (N, P, 2) hole cards, got {boards.shape} and {hole_cards.shape}"
+        )
+    n, player_num = hole_cards.shape[:2]
+    result = np.empty((n, player_num), dtype=np.int32)
+    chunk_size = max(1, chunk_size // player_num)
+    for start in range(0, n, chunk_size):
+        board, holes = boards[start:start + chunk_size], hole_cards[start:start + chunk_size]
+        rank_keys = _CARD_RANK_KEY[board].sum(axis=1)[:, None] + _CARD_RANK_KEY[holes].sum(axis=2)
+        suite_masks = _suite_masks(board)[:, None, :] | _suite_masks(
+            holes.reshape(-1, 2)
+        ).reshape(len(holes), player_num, _SUITES)
+        result[start:start + chunk_size] = _strengths(
+            rank_keys.reshape(-1), suite_masks.reshape(-1, _SUITES), boards.shape[1] + 2
+        ).reshape(len(holes), player_num)
+    return result
+
+def hand_ranks(strengths: np.ndarray) -> np.ndarray:
+    '''HandRank category (as int) of each strength'''
+    return np.asarray(strengths) // VALUE_SPAN
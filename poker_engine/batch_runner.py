@@ -0,0 +1,119 @@
+'''
+Plays many tables side by side, batching the decisions of BatchedPlayer bots.
+
+Each table runs as a generator that stops whenever a BatchedPlayer is in turn.
+Once every table is waiting, the pending decisions are grouped by batch_key(),
+handed to make_decisions in batches of at most max_batch, and each table's
+betting_round is resumed with its result. Other players decide inline as in
+GameRunner (AutonomousPlayer.make_decision or the on_player_turn callback).
+Callbacks are the GameRunner ones; tell tables apart through game_status or
+the PokerManager the views belong to.
+'''
+from collections import defaultdict
+from collections.abc import Callable, Generator
+from typing import Optional
+from .poker_manager import PokerManager
+from .players import AutonomousPlayer, BatchedPlayer, Player
+
+# (player, state, hand_status, game_status) waiting on make_decisions
+_Request = tuple[BatchedPlayer, dict, dict, dict]
+
+class BatchGameRunner:
+    def __init__(self, poker_managers: list[PokerManager], max_batch: Optional[int] = None):
+        '''max_batch - most decisions per make_decisions call, None for all pending ones'''
+        self.games = list(poker_managers)
+        self.max_batch = max_batch
+        self.batches = 0 # make_decisions calls
+        self.decisions = 0 # decisions made in batches
+
+    def _play(self, game: PokerManager, on_player_turn, on_player_turn_start, on_new_hand,
+              on_round_start, on_round_end, on_hand_end,
+              max_hands: Optional[int]) -> Generator[_Request, dict, int]:
+        game_status = game.status_view
+        hands_played = 0
+        if max_hands == 0:
+            return hands_played
+        for hand in game.advance():
+            hand_status = hand.status_view
+            if on_new_hand:
+                on_new_hand(hand_status, game_status)
+            while not hand.is_complete():
+                if on_round_start:
+                    on_round_start(hand_status, game_status)
+                curr_round = hand.betting_round()
+                state = next(curr_round)
+                while True:
+                    player: Player = state.pop("player")
+                    state["player_status"] = player.private_status
+                    if on_player_turn_start:
+                        on_player_turn_start(state, hand_status, game_status)
+                    if isinstance(player, BatchedPlayer):
+                        state.pop("player_status")
+                        user_dict = yield player, state, hand_status, game_status
+                    elif isinstance(player, AutonomousPlayer):
+                        state.pop("player_status")
+                        user_dict = player.make_decision(state, hand_status, game_status)
+                    elif on_player_turn is not None:
+                        user_dict = on_player_turn(state, hand_status, game_status)
+                    else:
+                        raise ValueError(f"Player {player.id} has no make_decision method and no callback provided")
+                    try:
+                        state = curr_round.send(user_dict)
+                    except StopIteration as e:
+                        if on_round_end:
+                            on_round_end(e.value, hand_status, game_status)
+                        break
+            if on_hand_end:
+                on_hand_end(hand.winners, hand_status, game_status)
+            hands_played += 1
+            if hands_played == max_hands:
+                break
+        return hands_played
+
+    def play_games(
+        self,
+        on_player_turn: Optional[Callable[[dict, dict, dict], dict]] = None,
+        on_player_turn_start: Optional[Callable[[dict, dict, dict], None]] = None,
+        on_new_hand: Optional[Callable[[dict, dict], None]] = None,
+        on_round_start: Optional[Callable[[dict, dict], None]] = None,
+        on_round_end: Optional[Callable[[dict, dict, dict], None]] = None,
+        on_hand_end: Optional[Callable[[dict, dict, dict], None]] = None,
+        max_hands: Optional[int] = None
+    ) -> list[int]:
+        '''
+        Plays every table until max_hands or a single player is left, returns the
+        number of hands played per table
+        '''
+        tables = [
+            self._play(game, on_player_turn, on_player_turn_start, on_new_hand,
+                       on_round_start, on_round_end, on_hand_end, max_hands)
+            for game in self.games
+        ]
+        hands_played = [0] * len(tables)
+        pending: dict[int, _Request] = {}
+
+        def resume(i: int, user_dict: Optional[dict]):
+            try:
+                pending[i] = tables[i].send(user_dict)
+            except StopIteration as e:
+                hands_played[i] = e.value
+
+        for i in range(len(tables)):
+            resume(i, None)
+        while pending:
+            groups: defaultdict[object, list[int]] = defaultdict(list)
+            for i, request in pending.items():
+                groups[request[0].batch_key()].append(i)
+            for waiting in groups.values():
+                step = self.max_batch or len(waiting)
+                for start in range(0, len(waiting), step):
+                    batch = waiting[start:start + step]
+                    requests = [pending.pop(i) for i in batch]
+                    user_dicts = requests[0][0].make_decisions(requests)
+                    if len(user_dicts) != len(requests):
+                        raise ValueError(f"make_decisions returned {len(user_dicts)} decisions for {len(requests)}")
+                    self.batches += 1
+                    self.decisions += len(requests)
+                    for i, user_dict in zip(batch, user_dicts):
+                        resume(i, user_dict)
+        return hands_played
@@ -0,0 +1,97 @@
+"""
+Bitmask representation of a set of cards (hand, board or dead cards).
+
+A CardMask is a 64-bit int split into four 16-bit suite lanes (same suite order as
+Card.SUITES), bit r of a lane being the card of rank r in that suite. Unions,
+dead-card removal and flush/straight detection are plain integer operations, and
+the mask converts back to card ids or Card objects for display.
+"""
+from typing import Iterable, Union
+from .cards import Card
+
+SUITE_SHIFT = 16
+RANK_MASK = (1 << len(Card.RANKS)) - 1
+# card id -> its bit in a CardMask
+CARD_BITS: list[int] = [
+    1 << (SUITE_SHIFT * (i % len(Card.SUITES)) + i // len(Card.SUITES))
+    for i in Card.ALL_CARDS_ID
+]
+_BIT_TO_ID: dict[int, int] = {bit.bit_length() - 1: i for i, bit in enumerate(CARD_BITS)}
+
+def suite_masks(mask: int) -> tuple[int, int, int, int]:
+    '''13-bit rank masks of each suite, works on plain ints too'''
+    mask = int(mask)
+    return (mask & RANK_MASK, (mask >> SUITE_SHIFT) & RANK_MASK,
+            (mask >> 2 * SUITE_SHIFT) & RANK_MASK, (mask >> 3 * SUITE_SHIFT) & RANK_MASK)
+
+class CardMask(int):
+    __slots__ = ()
+
+    @classmethod
+    def from_ids(cls, card_ids: Iterable[int]) -> "CardMask":
+        mask = 0
+        for card_id in card_ids:
+            mask |= CARD_BITS[card_id]
+        return cls(mask)
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Card]) -> "CardMask":
+        return cls.from_ids(card.id for card in cards)
+
+    def ids(self) -> list[int]:
+        # ordered by suite then rank
+        ids, mask = [], int(self)
+        while mask:
+            low_bit = mask & -mask
+            ids.append(_BIT_TO_ID[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return ids
+
+    def cards(self) -> list[Card]:
+        return [Card.get_card(card_id) for card_id in self.ids()]
+
+    def suite_mask(self, suite: int) -> int:
+        '''13-bit rank mask of the given suite (index into Card.SUITES)'''
+        return (int(self) >> (SUITE_SHIFT * suite)) & RANK_MASK
+
+    def suite_masks(self) -> tuple[int, int, int, int]:
+        return suite_masks(self)
+
+    def rank_mask(self) -> int:
+        '''13-bit mask of the ranks present in any suite'''
+        c, d, h, s = self.suite_masks()
+        return c | d | h | s
+
+    def __or__(self, other: int) -> "CardMask":
+        return CardMask(int(self) | other)
+
+    def __and__(self, other: int) -> "CardMask":
+        return CardMask(int(self) & other)
+
+    def __sub__(self, other: int) -> "CardMask":
+        # set difference, eg removing dead cards from a deck
+        return CardMask(int(self) & ~other)
+
+    def __xor__(self, other: int) -> "CardMask":
+        return CardMask(int(self) ^ other)
+
+    __ror__, __rand__, __rxor__ = __or__, __and__, __xor__
+
+    def __contains__(self, card: Union[Card, int]) -> bool:
+        card_id = card.id if isinstance(card, Card) else card
+        return bool(self & CARD_BITS[card_id])
+
+    def __len__(self) -> int:
+        return self.bit_count()
+
+    def __iter__(self):
+        return iter(self.cards())
+
+    def __str__(self):
+        return ', '.join(map(str, self.cards()))
+
+    def __repr__(self):
+        return f"CardMask({self.ids()})"
+
+EMPTY = CardMask(0)
+FULL_DECK = CardMask.from_ids(Card.ALL_CARDS_ID)
@@ -5,16 +5,29 @@ class Card:
     RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
     DECK_SIZE = 52
     ALL_CARDS_ID = [i for i in range(DECK_SIZE)]
-    ALL_CARDS = None
-    def __init__(self, id):
+    # the 52 cards, built once below; Card(id) returns these shared immutable instances
+    ALL_CARDS: tuple["Card", ...] = ()
+    __slots__ = ("id", "val", "rank", "suite")
+
+    def __new__(cls, id: int) -> "Card":
+        if cls.ALL_CARDS:
+            return cls.ALL_CARDS[id]
+        card = super().__new__(cls)
         q, r = divmod(id, 4)
-        self.id = id
-        self.val = q
-        self.rank, self.suite = self.RANKS[q], self.SUITES[r]
+        for name, value in (("id", id), ("val", q), ("rank", cls.RANKS[q]), ("suite", cls.SUITES[r])):
+            object.__setattr__(card, name, value)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards are immutable")
+
+    def __reduce__(self):
+        return Card, (self.id,)
+
     @classmethod
     def get_card(cls, card_id: int) -> "Card":
-        if cls.ALL_CARDS is None:
-            cls.ALL_CARDS = [Card(i) for i in range(cls.DECK_SIZE)]
         return cls.ALL_CARDS[card_id]
     def __str__(self):
-        return f"{self.rank} of {self.SUITE_TO_LONG_FORM[self.suite]}"
\ No newline at end of file
+        return f"{self.rank} of {self.SUITE_TO_LONG_FORM[self.suite]}"
+
+Card.ALL_CARDS = tuple(Card(i) for i in range(Card.DECK_SIZE))
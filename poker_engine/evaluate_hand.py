@@ -1,16 +1,21 @@
 import heapq
 from collections import defaultdict
+from collections.abc import Callable
 from enum import IntEnum
 from .players import Player
 from .cards import Card
-from typing import Optional
+from .card_mask import CardMask, suite_masks
+from typing import Optional, Union
 import random
 """
 Hand evaluation implementation prioritizing correctness and code clarity.
 Uses pure algorithmic approach without pre-computed lookup tables or external storage.
-For high-frequency applications, consider specialized libraries like 
- TwoPlusTwo evaluator with pre-computed tables.
+For high-frequency applications, select the lookup-table backend in
+table_evaluator with set_evaluator("table").
 """
+EVALUATORS = ("algorithmic", "table")
+_evaluator = "algorithmic"
+
 _true_rank_convert = {
     'A': 12, '2': 0, '3': 1, '4': 2, '5': 3, '6': 4, '7': 5, 
     '8': 6, '9': 7, '10': 8, 'J': 9, 'Q': 10, 'K': 11
@@ -29,6 +34,18 @@ class HandRank(IntEnum):
     def __str__(self):
         return self.name
 
+# every value returned alongside a HandRank is below this, see strength_to_int
+VALUE_SPAN = 13 ** 5
+
+def strength_to_int(strength: tuple[HandRank, int]) -> int:
+    '''Single comparable int with the same ordering as the (HandRank, value) tuple'''
+    hand_rank, value = strength
+    return hand_rank * VALUE_SPAN + value
+
+def int_to_strength(strength: int) -> tuple[HandRank, int]:
+    hand_rank, value = divmod(int(strength), VALUE_SPAN)
+    return (HandRank(hand_rank), value)
+
 def _check_straight(ranks: list[int]) -> int | None:
     # Pre: ranks is sorted in descending order, len(ranks) >= 5
     for i in range(len(ranks) - 4):  # Need at least 5 cards for a straight
@@ -62,7 +79,7 @@ def _get_hand_strength(suite_map: dict[str, list[int]],
 
     if flush is not None:
         # check straight/royal flush
-        if lowest_card := _check_straight(flush_ranks) is not None:
+        if (lowest_card := _check_straight(flush_ranks)) is not None:
             return (HandRank.STRAIGHT_FLUSH, lowest_card)
     
     count_rank_max = count_rank_max2 = None
@@ -87,13 +104,13 @@ def _get_hand_strength(suite_map: dict[str, list[int]],
     
     count2, rank2 = count_rank_max2
 
-    if count1 == 3 and count2 == 2:
+    if count1 == 3 and count2 >= 2: # two trips also make a full house
         return (HandRank.FULL_HOUSE, 13 * rank1 + rank2)
 
     if flush is not None:
         return (HandRank.FLUSH, _get_hand_value(flush_ranks[:5]))
 
-    if lowest_card := _check_straight(sorted(rank_map.keys(), reverse=True)) is not None:
+    if (lowest_card := _check_straight(sorted(rank_map.keys(), reverse=True))) is not None:
         return (HandRank.STRAIGHT, lowest_card)
 
     if count1 == 3:
@@ -113,8 +130,80 @@ def _get_hand_strength(suite_map: dict[str, list[int]],
     
     return (HandRank.HIGH_CARD, _get_hand_value([-heapq.heappop(rank_heap) for _ in range(5)]))
 
-def get_players_strength(comm_cards: list[Card], 
-                         players: list[Player]) -> list[Optional[tuple[HandRank, int]]]:
+def set_evaluator(name: str):
+    '''Select the backend used by get_players_strength (one of EVALUATORS)'''
+    global _evaluator
+    if name not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator {name}, expected one of {EVALUATORS}")
+    _evaluator = name
+
+def get_evaluator() -> str:
+    return _evaluator
+
+def _get_mask_strength(mask: int) -> tuple[HandRank, int]:
+    suite_map: dict[str, list[int]] = {}
+    rank_map: dict[int, int] = defaultdict(int)
+    for suite, lane in zip(Card.SUITES, suite_masks(mask)):
+        ranks = [rank for rank in range(len(Card.RANKS)) if lane >> rank & 1]
+        suite_map[suite] = ranks
+        for rank in ranks:
+            rank_map[rank] += 1
+    return _get_hand_strength(suite_map, rank_map)
+
+def _board_evaluator(board: int) -> Callable[[int], tuple[HandRank, int]]:
+    # the board's suite and rank maps are built once, each hand adds and removes its cards
+    suite_map: dict[str, set[int]] = defaultdict(set)
+    rank_map: dict[int, int] = defaultdict(int)
+    for card in CardMask(board).cards():
+        suite_map[card.suite].add(card.val)
+        rank_map[card.val] += 1
+
+    def evaluate(hand: int) -> tuple[HandRank, int]:
+        cards = CardMask(hand).cards()
+        for card in cards:
+            suite_map[card.suite].add(card.val)
+            rank_map[card.val] += 1
+        strength = _get_hand_strength(suite_map, rank_map)
+        for card in cards:
+            suite_map[card.suite].remove(card.val)
+            rank_map[card.val] -= 1
+            if rank_map[card.val] == 0:
+                rank_map.pop(card.val)
+        return strength
+    return evaluate
+
+def board_evaluator(board: int, evaluator: Optional[str] = None
+                    ) -> Callable[[int], tuple[HandRank, int]]:
+    '''
+    Strength of hole card masks on a fixed board, the work depending on the board
+    alone being done once for every hand evaluated on it (eg the players of a
+    showdown)
+    '''
+    if (evaluator or _evaluator) == "table":
+        from . import table_evaluator
+        return table_evaluator.board_evaluator(board)
+    elif evaluator is not None and evaluator not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator {evaluator}, expected one of {EVALUATORS}")
+    return _board_evaluator(board)
+
+def get_masks_strength(board: int, hands: list[Optional[int]],
+                       evaluator: Optional[str] = None
+                       ) -> list[Optional[tuple[HandRank, int]]]:
+    '''
+    get_players_strength on CardMask board and hole cards (None for folded players)
+    '''
+    if (evaluator or _evaluator) == "table":
+        from . import table_evaluator
+        return table_evaluator.get_masks_strength(board, hands)
+    elif evaluator is not None and evaluator not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator {evaluator}, expected one of {EVALUATORS}")
+    evaluate = _board_evaluator(board)
+    return [None if hand is None else evaluate(hand) for hand in hands]
+
+def get_players_strength(comm_cards: Union[list[Card], CardMask], 
+                         players: list[Player],
+                         evaluator: Optional[str] = None
+                         ) -> list[Optional[tuple[HandRank, int]]]:
     '''
     Hand Rankings (best to worst) and Determining Tie Breaker within the same ranking 
     Royal Flush - always tie
@@ -128,7 +217,20 @@ def get_players_strength(comm_cards: list[Card],
     One Pair - determine by rank of the pair then the rest lexicographically
     High Card - determine by rank of the cards lexicographically
     NOTE - suites do not affect the ranking of hands in Texas Holdem
+    evaluator overrides the backend selected by set_evaluator for this call only
+    If comm_cards is a CardMask, the table backend uses players' hands_mask instead of hands
     '''
+    if (evaluator or _evaluator) == "table":
+        from . import table_evaluator
+        if isinstance(comm_cards, CardMask):
+            return table_evaluator.get_masks_strength(
+                comm_cards, [None if player.folded else player.hands_mask for player in players]
+            )
+        return table_evaluator.get_players_strength(comm_cards, players)
+    elif evaluator is not None and evaluator not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator {evaluator}, expected one of {EVALUATORS}")
+    if isinstance(comm_cards, CardMask):
+        comm_cards = comm_cards.cards()
     suite_map = defaultdict(set)
     rank_map = defaultdict(int)
 
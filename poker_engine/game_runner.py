@@ -15,13 +15,19 @@ class GameRunner:
     ):
         '''
         Convenience wrapper (limited control)
+        Callbacks and bots receive the live HandManager.status_view and
+        PokerManager.status_view (and the player's private_status view): nothing is
+        copied per decision, fields are read on access. Call snapshot() on a view
+        to keep a frozen dict copy.
         '''
+        game_status = self.game.status_view
         for hand in self.game.advance():
+            hand_status = hand.status_view
             if on_new_hand:
-                on_new_hand(hand.status, self.game.status)
+                on_new_hand(hand_status, game_status)
             while not hand.is_complete():
                 if on_round_start:
-                    on_round_start(hand.status, self.game.status)
+                    on_round_start(hand_status, game_status)
                 curr_round = hand.betting_round()
                 state = next(curr_round)
                 while True:
@@ -33,15 +39,14 @@ class GameRunner:
                     '''
                     player: Player = state["player"]
                     state.pop("player")
-                    state["player_status"] = player.public_status
-                    state["player_status"]["hands"] = player.hands
+                    state["player_status"] = player.private_status
                     if on_player_turn_start:
-                        on_player_turn_start(state, hand.status, self.game.status)
+                        on_player_turn_start(state, hand_status, game_status)
                     if isinstance(player, AutonomousPlayer):
                         state.pop("player_status")
-                        user_dict = player.make_decision(state, hand.status, self.game.status)
+                        user_dict = player.make_decision(state, hand_status, game_status)
                     elif on_player_turn is not None:
-                        user_dict = on_player_turn(state, hand.status, self.game.status)
+                        user_dict = on_player_turn(state, hand_status, game_status)
                     else:
                         raise ValueError(f"Player {player.id} has no make_decision method and no callback provided")
                     try:
@@ -49,7 +54,7 @@ class GameRunner:
                     except StopIteration as e:
                         last_action = e.value
                         if on_round_end:
-                            on_round_end(last_action, hand.status, self.game.status)
+                            on_round_end(last_action, hand_status, game_status)
                         break
             if on_hand_end:
-                on_hand_end(hand.winners, hand.status, self.game.status)
\ No newline at end of file
+                on_hand_end(hand.winners, hand_status, game_status)
\ No newline at end of file
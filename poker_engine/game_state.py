@@ -0,0 +1,267 @@
+'''
+Compact, immutable-by-convention hand state for search (MCTS / CFR bots).
+
+GameState follows exactly the betting rules of HandManager (options, raise
+limits, who is in turn and when rounds and the hand end) but holds only ints,
+bitsets and tuples shared between states: apply() returns a new state and never
+touches the original, so a hand can be forked at any decision point.
+Rounds in which nobody can act are skipped, so a non-terminal state is always
+waiting on current_player.
+
+GameState.from_hand(hand) forks a live HandManager, either between rounds,
+while its betting_round generator is waiting on a player or once it is complete
+(a terminal state whose payoffs() are the hand's final balances).
+'''
+import heapq
+from typing import Optional
+from .action_type import ActionType
+from .card_mask import CardMask
+from . import evaluate_hand
+
+_ROUNDS = 4
+_ROUND_TO_COMM_CARDS = (0, 3, 4, 5, 5, 5)
+
+class GameState:
+    __slots__ = (
+        "totals", "money_in", "folded", "gone_max", "folded_num", "gone_max_num", "pot",
+        "current_bet", "round_num", "current_player", "_ending_player", "last_full_raise",
+        "_highest_balance", "_snd_highest_balance", "_balance_heap", "big_blind",
+        "small_blind_pos", "comm_masks", "hand_masks"
+    )
+    totals: tuple[int, ...] # balance + money in of every player, constant over a hand
+    money_in: tuple[int, ...]
+    folded: int # bit i set if player i folded
+    gone_max: int # bit i set if player i cannot put in more chips
+
+    @classmethod
+    def from_hand(cls, hand) -> "GameState":
+        '''Fork of a HandManager (hole cards and board included, for showdowns)'''
+        players = hand.players
+        state = object.__new__(cls)
+        state.totals = tuple(player.initial_balance for player in players) # balance + money_in until paid
+        state.money_in = tuple(player.money_in for player in players)
+        state.folded = sum(1 << i for i, player in enumerate(players) if player.folded)
+        state.gone_max = sum(1 << i for i, player in enumerate(players) if player.gone_max)
+        state.folded_num = hand._num_players_folded
+        state.gone_max_num = hand._num_players_gone_max
+        state.pot = hand.pot
+        state.current_bet = hand._curr_bet
+        state.round_num = hand._round_num
+        state.current_player = hand._current_player_pos
+        state.last_full_raise = hand._last_full_raise
+        state._highest_balance = hand._highest_balance
+        state._snd_highest_balance = hand._snd_highest_balance
+        state._balance_heap = tuple(hand._balance_heap)
+        state.big_blind = hand.big_blind
+        state.small_blind_pos = hand.small_blind_player_pos
+        state.comm_masks = tuple(hand._comm_masks)
+        state.hand_masks = tuple(player.hands_mask for player in players)
+        state._ending_player = hand._ending_player_pos
+        if state._ending_player is None and state.round_num <= _ROUNDS:
+            if not state._check_complete():
+                state._start_round(hand._start_player_pos)
+        return state
+
+    def copy(self) -> "GameState":
+        # spelled out, a loop over __slots__ is several times slower
+        state = object.__new__(GameState)
+        state.totals, state.money_in, state.folded, state.gone_max = \
+            self.totals, self.money_in, self.folded, self.gone_max
+        state.folded_num, state.gone_max_num, state.pot, state.current_bet = \
+            self.folded_num, self.gone_max_num, self.pot, self.current_bet
+        state.round_num, state.current_player, state._ending_player, state.last_full_raise = \
+            self.round_num, self.current_player, self._ending_player, self.last_full_raise
+        state._highest_balance, state._snd_highest_balance, state._balance_heap = \
+            self._highest_balance, self._snd_highest_balance, self._balance_heap
+        state.big_blind, state.small_blind_pos, state.comm_masks, state.hand_masks = \
+            self.big_blind, self.small_blind_pos, self.comm_masks, self.hand_masks
+        return state
+
+    @property
+    def player_num(self) -> int:
+        return len(self.totals)
+
+    @property
+    def stacks(self) -> tuple[int, ...]:
+        return tuple(total - money_in for total, money_in in zip(self.totals, self.money_in))
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.round_num > _ROUNDS
+
+    @property
+    def board(self) -> CardMask:
+        '''Community cards revealed so far'''
+        return self.comm_masks[_ROUND_TO_COMM_CARDS[self.round_num]]
+
+    def _can_act(self, pos: int) -> bool:
+        return not (self.folded | self.gone_max) >> pos & 1
+
+    def _only_richest(self, pos: int) -> bool:
+        return self._highest_balance == self.totals[pos] \
+            and self._highest_balance != self._snd_highest_balance
+
+    def legal_actions(self) -> dict:
+        '''Options of current_player, same format as HandManager's betting_round'''
+        if self.is_terminal:
+            raise ValueError("Game has ended")
+        pos = self.current_player
+        balance = self.totals[pos] - self.money_in[pos]
+        remaining_to_call = self.current_bet - self.money_in[pos]
+        only_richest = self._only_richest(pos)
+        options = {
+            ActionType.FOLD: True,
+            ActionType.ALL_IN: not only_richest,
+            ActionType.CALL: False,
+            ActionType.RAISE: None
+        }
+        if balance > remaining_to_call:
+            options[ActionType.CALL] = True
+            if self.last_full_raise + remaining_to_call < balance and not only_richest or \
+                only_richest and self.current_bet < self._snd_highest_balance:
+                raise_min, raise_max = self.last_full_raise, balance - remaining_to_call
+                if only_richest:
+                    raise_min = min(self.last_full_raise, self._snd_highest_balance - self.current_bet)
+                    raise_max = self._snd_highest_balance - self.current_bet
+                options[ActionType.RAISE] = (raise_min, raise_max)
+        return options
+
+    def apply(self, action: ActionType, amount: int = 0) -> "GameState":
+        '''New state after current_player takes action (amount is the raise size for RAISE)'''
+        if self.round_num > _ROUNDS:
+            raise ValueError("Game has ended")
+        pos = self.current_player
+        money_in = list(self.money_in)
+        balance = self.totals[pos] - money_in[pos]
+        remaining_to_call = self.current_bet - money_in[pos]
+        # legality checks of legal_actions, without building the options dict
+        if action == ActionType.CALL and balance <= remaining_to_call \
+          or action == ActionType.ALL_IN and self._only_richest(pos):
+            raise ValueError
+        state = self.copy()
+        bit = 1 << pos
+        raised = False
+        if action == ActionType.FOLD:
+            state.folded |= bit
+            state.folded_num += 1
+            if state.folded_num == state.player_num - 1:
+                state._end_round()
+                return state
+            total = state.totals[pos]
+            if total == state._highest_balance:
+                state._highest_balance = state._snd_highest_balance
+            if total >= state._snd_highest_balance:
+                heap = list(state._balance_heap)
+                state._snd_highest_balance = -heapq.heappop(heap)
+                state._balance_heap = tuple(heap)
+        elif action == ActionType.ALL_IN:
+            money_in[pos] += balance
+            state.pot += balance
+            if money_in[pos] > state.current_bet:
+                state.current_bet = money_in[pos]
+                raised = True
+            state.last_full_raise = max(state.last_full_raise, balance)
+            state.gone_max |= bit
+            state.gone_max_num += 1
+        elif action == ActionType.CALL:
+            money_in[pos] += remaining_to_call
+            state.pot += remaining_to_call
+            if state.current_bet == state._snd_highest_balance:
+                state.gone_max |= bit
+                state.gone_max_num += 1
+        else:
+            raise_range = self.legal_actions()[ActionType.RAISE]
+            if raise_range is None or raise_range[0] > amount or amount > raise_range[1]:
+                raise ValueError
+            only_richest = self._only_richest(pos)
+            state.last_full_raise = amount
+            new_in = amount + remaining_to_call
+            money_in[pos] += new_in
+            state.pot += new_in
+            state.current_bet += amount
+            if only_richest and amount + state.current_bet == state._snd_highest_balance \
+              or money_in[pos] == state.totals[pos]:
+                state.gone_max |= bit
+                state.gone_max_num += 1
+            raised = True
+        state.money_in = tuple(money_in)
+        if raised:
+            state._ending_player = pos
+        state._next_player((pos + 1) % state.player_num)
+        return state
+
+    def _next_player(self, pos: int):
+        # the player in turn from pos on, ending the round on reaching the ending player
+        while pos != self._ending_player:
+            if self._can_act(pos):
+                self.current_player = pos
+                return
+            pos = (pos + 1) % self.player_num
+        self._end_round()
+
+    def _start_round(self, start: int):
+        self.last_full_raise = self.big_blind
+        self._ending_player = start
+        if self._can_act(start):
+            self.current_player = start
+        else:
+            self._next_player((start + 1) % self.player_num)
+
+    def _end_round(self):
+        self.round_num += 1
+        self.current_player = self.small_blind_pos
+        self._ending_player = None
+        if not self._check_complete():
+            self._start_round(self.small_blind_pos)
+
+    def _check_complete(self) -> bool:
+        # HandManager.is_complete, without settling
+        if self.folded_num == self.player_num - 1 \
+          or self.folded_num + self.gone_max_num >= self.player_num - 1 \
+          or self.round_num == _ROUNDS:
+            self.round_num = _ROUNDS + 1
+            return True
+        return False
+
+    def payoffs(self, strengths: Optional[list] = None) -> list[int]:
+        '''
+        Final balances of a terminal state. Showdowns use strengths (comparable
+        per player, None for folded players) or else evaluate the dealt cards.
+        Each side pot is split in integer chips, odd chips going to the winners
+        nearest the small blind.
+        '''
+        if not self.is_terminal:
+            raise ValueError("Game has not ended yet")
+        balances = list(self.stacks)
+        player_num = self.player_num
+        if self.folded_num == player_num - 1:
+            balances[next(i for i in range(player_num) if not self.folded >> i & 1)] += self.pot
+            return balances
+        if strengths is None:
+            strengths = evaluate_hand.get_masks_strength(self.comm_masks[-1], [
+                None if self.folded >> i & 1 else mask for i, mask in enumerate(self.hand_masks)
+            ])
+        order = [(self.small_blind_pos + i) % player_num for i in range(player_num)]
+        # side pots are cut at the all-in levels of the players still in
+        levels = sorted({money_in for i, money_in in enumerate(self.money_in)
+                         if strengths[i] is not None and money_in == self.totals[i]}
+                        | {max(self.money_in)})
+        pots: list[list] = [] # [chips, winners]
+        previous = 0
+        for level in levels:
+            layer = sum(min(money_in, level) - min(money_in, previous) for money_in in self.money_in)
+            contenders = [i for i in order
+                          if self.money_in[i] > previous and strengths[i] is not None]
+            previous = level
+            if not layer:
+                continue
+            if not contenders: # only folded players put in this much, goes to the pot below
+                pots[-1][0] += layer
+                continue
+            best = max(strengths[i] for i in contenders)
+            pots.append([layer, [i for i in contenders if strengths[i] == best]])
+        for chips, winners in pots:
+            share, odd = divmod(chips, len(winners))
+            for n, i in enumerate(winners):
+                balances[i] += share + (n < odd)
+        return balances
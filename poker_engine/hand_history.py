@@ -0,0 +1,212 @@
+'''
+Compact binary hand history.
+
+HandHistoryWriter is a HandRecorder (pass it to PokerManagerBuilder.with_recorder)
+that appends struct-packed, fixed-width records to a file:
+- one HAND_START record per hand: seats, blinds, the dealt deck and starting balances
+- one ACTION record per player action
+- one HAND_END record per hand with the settled balances
+HandHistoryWriter.open numbers hands on from those already in the file.
+HandHistoryReader memory-maps the file and lazily yields one HandRecord per hand,
+and replay() plays a record back through HandManager to reproduce its balances.
+'''
+import mmap
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import BinaryIO, Optional
+from .action_type import ActionType
+from .all_in_settlement import AllInSettlement
+from .hand_manager import HandManager
+from .hand_recorder import HandRecorder
+from .players import Player
+
+MAGIC = b"WSHH\x01" # file signature and format version
+_MAX_SEATS = HandManager.MAX_PLAYERS
+_MAX_DEALT = HandManager.COMM_CARDS + HandManager.PLAYER_CARDS * _MAX_SEATS
+
+_HAND_START, _ACTION, _HAND_END = b'H', b'A', b'E'
+# type, hand number, seats, small blind seat, blinds, dealt card ids, player ids, balances
+_HAND_START_STRUCT = struct.Struct(f"<cQBBqq{_MAX_DEALT}s{_MAX_SEATS}I{_MAX_SEATS}q")
+# type, round, seat, action, raise amount
+_ACTION_STRUCT = struct.Struct("<cBBBq")
+# type, balances
+_HAND_END_STRUCT = struct.Struct(f"<c{_MAX_SEATS}q")
+_RECORD_STRUCTS = {
+    _HAND_START: _HAND_START_STRUCT, _ACTION: _ACTION_STRUCT, _HAND_END: _HAND_END_STRUCT
+}
+
+_ACTIONS: list[ActionType] = list(ActionType)
+_ACTION_CODES: dict[ActionType, int] = {action: i for i, action in enumerate(_ACTIONS)}
+
+@dataclass
+class ActionRecord:
+    round_num: int
+    seat: int
+    action: ActionType
+    amount: int = 0 # raise amount, 0 for other actions
+
+    @property
+    def user_option(self) -> dict:
+        if self.action == ActionType.RAISE:
+            return {"action": self.action, "amount": self.amount}
+        return {"action": self.action}
+
+@dataclass
+class HandRecord:
+    hand_num: int
+    small_blind_pos: int
+    blinds: list[int]
+    deck: list[int]
+    player_ids: list[int]
+    initial_balances: list[int]
+    actions: list[ActionRecord] = field(default_factory=list)
+    final_balances: Optional[list[int]] = None # None if the hand was never settled
+
+class HandHistoryWriter(HandRecorder):
+    def __init__(self, file: BinaryIO, first_hand_num: int = 0):
+        '''
+        file - binary file opened for appending, see open()
+        first_hand_num - number of the first hand written, hand numbers are only
+        unique within a file if it continues those already there
+        '''
+        self._file = file
+        self._hand_num = first_hand_num
+        if file.tell() == 0:
+            file.write(MAGIC)
+
+    @classmethod
+    def open(cls, path: str) -> "HandHistoryWriter":
+        '''Appends to path, numbering hands on from the last one already in it'''
+        file = open(path, "ab")
+        try:
+            return cls(file, _next_hand_num(path) if file.tell() else 0)
+        except Exception:
+            file.close()
+            raise
+
+    def start_hand(self, hand: HandManager):
+        players = hand.players
+        self._file.write(_HAND_START_STRUCT.pack(
+            _HAND_START, self._hand_num, len(players), hand.small_blind_player_pos,
+            *hand.blinds, bytes(hand.deck),
+            *_padded([player.id for player in players]),
+            *_padded([player.initial_balance for player in players])
+        ))
+        self._hand_num += 1
+
+    def record_action(self, hand: HandManager, seat: int, user_option: dict):
+        action = user_option["action"]
+        self._file.write(_ACTION_STRUCT.pack(
+            _ACTION, hand.status_view["round_num"], seat, _ACTION_CODES[action],
+            user_option["amount"] if action == ActionType.RAISE else 0
+        ))
+
+    def end_hand(self, hand: HandManager):
+        self._file.write(_HAND_END_STRUCT.pack(_HAND_END, *_padded(hand.players_balance)))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+def _padded(values: list[int]) -> list[int]:
+    return values + [0] * (_MAX_SEATS - len(values))
+
+class HandHistoryReader:
+    '''Streams HandRecords from a memory-mapped hand history file'''
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a hand history file")
+
+    def _records(self) -> Iterator[tuple[int, bytes, tuple]]:
+        # (offset, type, fields) of every complete record
+        data, offset = self._map, len(MAGIC)
+        while offset < len(data):
+            record_type = data[offset:offset + 1]
+            record_struct = _RECORD_STRUCTS.get(record_type)
+            if record_struct is None:
+                raise ValueError(f"Corrupt record at offset {offset}")
+            if offset + record_struct.size > len(data):
+                break # truncated trailing record, eg the writer is still running
+            yield offset, record_type, record_struct.unpack_from(data, offset)
+            offset += record_struct.size
+
+    def __iter__(self) -> Iterator[HandRecord]:
+        record = None
+        for offset, record_type, fields in self._records():
+            if record_type != _HAND_START and record is None:
+                raise ValueError(f"Record at offset {offset} does not follow the start of a hand")
+            if record_type == _HAND_START:
+                if record is not None:
+                    yield record
+                hand_num, seats, small_blind_pos, small_blind, big_blind, deck = fields[1:7]
+                ids = fields[7:7 + _MAX_SEATS]
+                balances = fields[7 + _MAX_SEATS:]
+                dealt = HandManager.COMM_CARDS + HandManager.PLAYER_CARDS * seats
+                record = HandRecord(
+                    hand_num, small_blind_pos, [small_blind, big_blind], list(deck[:dealt]),
+                    list(ids[:seats]), list(balances[:seats])
+                )
+            elif record_type == _ACTION:
+                round_num, seat, action_code, amount = fields[1:]
+                record.actions.append(ActionRecord(round_num, seat, _ACTIONS[action_code], amount))
+            else:
+                record.final_balances = list(fields[1:1 + len(record.player_ids)])
+                yield record
+                record = None
+        if record is not None:
+            yield record
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+def _next_hand_num(path: str) -> int:
+    # one past the last hand number in the hand history file at path
+    with HandHistoryReader(path) as reader:
+        hand_num = -1
+        for _, record_type, fields in reader._records():
+            if record_type == _HAND_START:
+                hand_num = fields[1]
+    return hand_num + 1
+
+def replay(record: HandRecord, all_in_settlement: Optional[AllInSettlement] = None) -> list[int]:
+    '''
+    Plays the recorded hand again and returns the resulting balances, hands
+    recorded with an all_in_settlement must be replayed with the same one
+    '''
+    players = [Player(balance) for balance in record.initial_balances]
+    hand = HandManager(players, record.small_blind_pos, record.blinds, deck=record.deck,
+                       all_in_settlement=all_in_settlement)
+    actions = iter(record.actions)
+    while not hand.is_complete():
+        curr_round = hand.betting_round()
+        state = next(curr_round)
+        while True:
+            action = next(actions, None)
+            if action is None:
+                raise ValueError(f"Hand {record.hand_num}: recorded actions end mid-hand")
+            if state["player"] is not players[action.seat]:
+                raise ValueError(f"Hand {record.hand_num}: action out of turn for seat {action.seat}")
+            try:
+                state = curr_round.send(action.user_option)
+            except StopIteration:
+                break
+    return hand.players_balance
@@ -1,8 +1,14 @@
-import random
-from collections.abc import Iterable, Generator
+from collections.abc import Iterable, Generator, Sequence
 import heapq
+import random
 from .cards import Card
+from .card_mask import CardMask, CARD_BITS, EMPTY
 from .players import Player
+from .status_view import StatusView
+from .rng import RNG, deal_ids
+from .hand_recorder import HandRecorder
+from .pot_ledger import PotLedger
+from .all_in_settlement import AllInSettlement, EquityChop
 from . import evaluate_hand
 from .action_type import *
 from typing import Optional
@@ -19,24 +25,46 @@ class HandManager:
     # The current implementation is for the TexasHoldem Variant, but more to be potentially implemented
     def __init__(
         self, players: list[Player], 
-        small_blind_player_pos: int, blinds: list[int]
+        small_blind_player_pos: int, blinds: list[int],
+        rng: Optional[RNG] = None, deck: Optional[Sequence[int]] = None,
+        recorder: Optional[HandRecorder] = None,
+        all_in_settlement: Optional[AllInSettlement] = None
     ):
+        '''
+        rng - random.Random or numpy Generator used for dealing (global random module if None)
+        deck - pre-shuffled card ids to deal from instead of drawing from rng
+        recorder - notified of the deal, every action and the settlement (eg hand history)
+        all_in_settlement - pays hands ending before the river is bet (everybody
+        but at most one player all in) instead of the single dealt runout, eg
+        all_in_settlement.EquityChop()
+        '''
         assert HandManager.MIN_PLAYERS <= len(players) <= HandManager.MAX_PLAYERS
         self._players: list[Player] = players
         self._player_num = len(players)
         self._num_players_gone_max = self._num_players_folded = 0
 
-        cards_id: list[Card] = random.sample(
-            Card.ALL_CARDS_ID, 
-            HandManager.COMM_CARDS + HandManager.PLAYER_CARDS * self._player_num
-        )
+        cards_needed = HandManager.COMM_CARDS + HandManager.PLAYER_CARDS * self._player_num
+        if deck is None:
+            cards_id: list[int] = deal_ids(rng, cards_needed)
+        else:
+            cards_id = list(deck[:cards_needed])
+        # the dealt cards in deck order, dealing from this deck again reproduces the hand
+        self.deck: tuple[int, ...] = tuple(cards_id)
         for player in players:
-            player.hands = (
-                    Card.get_card(cards_id.pop()),
-                    Card.get_card(cards_id.pop())
-                )
+            id1, id2 = cards_id.pop(), cards_id.pop()
+            player.hands = (Card.get_card(id1), Card.get_card(id2))
+            player.hands_mask = CardMask.from_ids((id1, id2))
         self._comm_cards: list[Card] = [Card.get_card(id) for id in cards_id]
+        # revealed community cards by round, shared by every status read
+        self._revealed_comm_cards: tuple[tuple[Card, ...], ...] = tuple(
+            tuple(self._comm_cards[:count]) for count in self._round_to_comm_cards
+        )
+        # revealed community cards as a CardMask, indexed by number of cards revealed
+        self._comm_masks: list[CardMask] = [EMPTY]
+        for id in cards_id:
+            self._comm_masks.append(self._comm_masks[-1] | CARD_BITS[id])
         self._curr_bet = self._round_num = self.pot = 0
+        self._ledger = PotLedger(self._player_num)
         self._start_player_pos = self._setup_blinds(small_blind_player_pos, blinds)
         # Note current player pos will always return the position of the small blind player
         # BETWEEN ROUNDS or after final round, otherwise the current player in turn
@@ -49,7 +77,18 @@ class HandManager:
         self._snd_highest_balance = -heapq.heappop(self._balance_heap)
         self._small_blind_player_pos = small_blind_player_pos
         self.big_blind = blinds[1]
+        self._blinds = blinds
+        # betting round progress, kept on the instance so GameState can fork mid-round
+        self._last_full_raise = self.big_blind
+        self._ending_player_pos: Optional[int] = None # None between rounds
         self._winners = []
+        self._status_view = StatusView(self, HandManager._STATUS_FIELDS)
+        self._recorder = recorder
+        self._all_in_settlement = all_in_settlement
+        # board cards revealed when a hand ended all in before the river
+        self._all_in_known: Optional[int] = None
+        if recorder is not None:
+            recorder.start_hand(self)
     
     def _setup_blinds(self, small_blind_i: int, blinds: list[int]) -> int:
         '''
@@ -67,26 +106,43 @@ class HandManager:
         )):
             player: Player = self._players[player_id]
             blind_actual = blinds[blind_index]
-            if player.balance < blind_actual:
+            if player.balance <= blind_actual: # an exact stack blind is all in too
                 blind_actual = player.balance
                 player.gone_max = True
             player.money_in += blind_actual
             self.pot += blind_actual
             player.balance -= blind_actual
+            self._ledger.add(player_id, blind_actual)
+            if player.balance == 0:
+                self._ledger.cap(player.money_in)
             if blind_index == 1: # big blind
                 self._curr_bet = blind_actual
         return (small_blind_i + 2) % self._player_num
     
+    _STATUS_FIELDS = {
+        "round_num": lambda hand: hand._round_num,
+        "revealed_comm_cards": lambda hand: hand._revealed_comm_cards[min(3, hand._round_num)],
+        "pot_size": lambda hand: hand.pot,
+        "players_in": lambda hand: hand._player_num - hand._num_players_folded,
+        "current_player_pos": lambda hand: hand._current_player_pos
+    }
+
     @property
     def status(self) -> dict:
-        return {
-            "round_num": self._round_num,
-            "revealed_comm_cards": self._comm_cards[:self._round_to_comm_cards[min(3, self._round_num)]],
-            "pot_size": self.pot,
-            "players_in": self._player_num - self._num_players_folded,
-            "current_player_pos": self._current_player_pos
-        }
+        # a plain dict as before status views, revealed_comm_cards as a fresh list
+        status = self._status_view.snapshot()
+        status["revealed_comm_cards"] = list(status["revealed_comm_cards"])
+        return status
+
+    @property
+    def status_view(self) -> StatusView:
+        '''Live read-only view of status, fields computed on access'''
+        return self._status_view
     
+    @property
+    def revealed_comm_mask(self) -> CardMask:
+        return self._comm_masks[self._round_to_comm_cards[min(3, self._round_num)]]
+
     def _get_available_options(self, curr_player: Player, last_full_raise: int, 
                                 remaining_to_call: int, only_richest: bool
                                 ) -> dict:
@@ -138,6 +194,7 @@ class HandManager:
         player_raised = False
         if user_option["action"] == ActionType.FOLD:
             player.folded = True
+            self._ledger.fold(self._current_player_pos)
             self._num_players_folded += 1
             if self._num_players_folded == self._player_num - 1:
                 return player_raised, last_full_raise, True
@@ -151,6 +208,8 @@ class HandManager:
         elif user_option["action"] == ActionType.ALL_IN:
             player.money_in += player.balance
             self.pot += player.balance
+            self._ledger.add(self._current_player_pos, player.balance)
+            self._ledger.cap(player.money_in)
             if player.money_in > self._curr_bet:
                 self._curr_bet = player.money_in
                 player_raised = True
@@ -162,6 +221,7 @@ class HandManager:
             player.balance -= remaining_to_call
             player.money_in += remaining_to_call
             self.pot += remaining_to_call
+            self._ledger.add(self._current_player_pos, remaining_to_call)
             assert player.money_in == self._curr_bet
             if self._curr_bet == self._snd_highest_balance:
                 player.gone_max = True
@@ -181,6 +241,9 @@ class HandManager:
             player.balance -= new_in
             player.money_in += new_in
             self.pot += new_in
+            self._ledger.add(self._current_player_pos, new_in)
+            if player.balance == 0:
+                self._ledger.cap(player.money_in)
             self._curr_bet += new_raised
             if only_richest and new_raised + self._curr_bet == self._snd_highest_balance \
                 or player.balance == 0:
@@ -223,6 +286,7 @@ class HandManager:
                 "amount": int # required if action is ActionType.RAISE (ignore otherwise)
                 }
                 '''
+                self._last_full_raise, self._ending_player_pos = last_full_raise, ending_player_i
                 user_option = yield {
                     "player": player,
                     "current_bet": self._curr_bet,
@@ -234,6 +298,8 @@ class HandManager:
                     options, user_option, player, last_full_raise, 
                     remaining_to_call, only_richest
                 )
+                if self._recorder is not None:
+                    self._recorder.record_action(self, self._current_player_pos, user_option)
                 if player_raised:
                     ending_player_i = self._current_player_pos
 
@@ -246,70 +312,78 @@ class HandManager:
                     break
             self._current_player_pos = (self._current_player_pos + 1) % self._player_num
         self._current_player_pos = self._start_player_pos = self._small_blind_player_pos
+        self._ending_player_pos = None
         self._round_num += 1
         return last_action_result
 
-    def _pot_distribution(self, players: list[Player], 
-                          players_hand_strength: 
+    def _pay(self, payouts: list[tuple[int, int, int]],
+             players_hand_strength: list[Optional[tuple[evaluate_hand.HandRank, int]]]
+             ) -> tuple[dict, ...]:
+        winners = []
+        for pot_count, pos, chips in payouts:
+            player = self._players[pos]
+            player.balance += chips
+            winners.append({
+                "id": player.id,
+                "pot_count": pot_count, # 0 for main pot
+                "new_balance": player.balance,
+                "initial_balance": player.initial_balance,
+                "hand_strength": players_hand_strength[pos][0]
+            })
+        return tuple(winners)
+
+    def _pot_distribution(self, players_hand_strength:
                             list[Optional[tuple[evaluate_hand.HandRank, int]]]
-                          ) -> Generator[dict, None, None]:
-        # yields winners
-        # PRE - players sorted by the money they put into the game
-        assert len(players) == len(players_hand_strength)
-        winner_rank = []
-        for i in range(len(players)):
-            id, strength = players[i].id, players_hand_strength[i]
-            if strength is None: # or players[i].folded
-                continue
-            while winner_rank and winner_rank[-1][0] < strength:
-                winner_rank.pop()
-            if not winner_rank or strength < winner_rank[-1][0]:
-                winner_rank.append((strength, {id}))
-            else: # strength == winner_rank[-1][0]
-                winner_rank[-1][1].add(id)
+                          ) -> tuple[dict, ...]:
+        '''
+        Pays out the side pots of the ledger (see PotLedger.settle), one winner
+        dict per player and pot won, main pot first. players_hand_strength is
+        in seat order, None for folded players
+        '''
+        return self._pay(self._ledger.settle(players_hand_strength, self._small_blind_player_pos),
+                         players_hand_strength)
 
-        # initialise and begin pot distribution
-        winners_i, winners = 0, winner_rank[0][1]
-        player_num = len(players)
-        winner_cumm = money_checked = pot_count = 0
-        for i, player in enumerate(players):
-            if player.id in winners:
-                winner_cumm += (player.money_in - money_checked) * (player_num - i) / len(winners)
-                if winner_cumm > 0:
-                    '''
-                    If two players put in the same amount into the game, and the
-                    one with better hand happened to be in front of the one with
-                    worse hand in the players list, they will still appear in the
-                    winner_rank but winner_cumm == 0 so it shouldn't yield
-                    '''
-                    player.balance += int(winner_cumm)
-                    
-                    yield {
-                        "id": player.id,
-                        "pot_count": pot_count, # 0 for main pot
-                        "new_balance": player.balance,
-                        "initial_balance": player.initial_balance,
-                        "hand_strength": players_hand_strength[i][0]
-                    }
-                money_checked = player.money_in
-                winners.remove(player.id)
-                if len(winners) == 0:
-                    winners_i += 1
-                    pot_count += 1
-                    if winners_i == len(winner_rank):
-                        break
-                    winners = winner_rank[winners_i][1]
-                    winner_cumm = 0
-            else:
-                winner_cumm += (player.money_in - money_checked) / len(winners)
-            
-    def _showdown(self) -> Generator[dict, None, None]:
-        players_by_money_in = sorted(self._players, key=lambda player: player.money_in)
-        players_hand_strength: list[tuple[evaluate_hand.HandRank, int]] = \
-          evaluate_hand.get_players_strength(
-            self._comm_cards, players_by_money_in
+    def _showdown(self) -> tuple[dict, ...]:
+        return self._pot_distribution(evaluate_hand.get_players_strength(
+            self._comm_masks[HandManager.COMM_CARDS], self._players
+        ))
+
+    def _all_in_payouts(self, settlement: AllInSettlement, known: int) -> list[tuple[int, int, int]]:
+        hands = [None if player.folded else player.hands_mask for player in self._players]
+        dead = EMPTY
+        for player in self._players:
+            if player.folded:
+                dead |= player.hands_mask
+        return settlement.settle(
+            self._ledger.pots([hand is not None for hand in hands]), hands, dead,
+            list(self.deck[:HandManager.COMM_CARDS]), known, self._small_blind_player_pos,
+            random.Random(bytes(self.deck)) # reproducible from the dealt cards alone
         )
-        return self._pot_distribution(players_by_money_in, players_hand_strength)
+
+    def _all_in_distribution(self, known: int, players_hand_strength:
+                               list[Optional[tuple[evaluate_hand.HandRank, int]]]
+                             ) -> tuple[dict, ...]:
+        # settled by self._all_in_settlement, hand_strength is still that on the dealt board
+        return self._pay(self._all_in_payouts(self._all_in_settlement, known), players_hand_strength)
+
+    def _all_in_showdown(self, known: int) -> tuple[dict, ...]:
+        return self._all_in_distribution(known, evaluate_hand.get_players_strength(
+            self._comm_masks[HandManager.COMM_CARDS], self._players
+        ))
+
+    def all_in_ev(self, settlement: Optional[AllInSettlement] = None) -> Optional[list[int]]:
+        '''
+        Chips each seat would have been paid by settlement (EquityChop() by
+        default) if the hand ended all in with board cards to come, else None.
+        Minus the seat's money_in this is its result without the runout luck,
+        whose mean is the same (see simulation_farm all_in_ev).
+        '''
+        if self._all_in_known is None:
+            return None
+        payouts = [0] * self._player_num
+        for _, pos, chips in self._all_in_payouts(settlement or EquityChop(), self._all_in_known):
+            payouts[pos] += chips
+        return payouts
 
     def is_complete(self) -> bool:
         """
@@ -332,10 +406,19 @@ class HandManager:
             },) 
         elif self._num_players_folded + self._num_players_gone_max >= self._player_num - 1 \
           or self._round_num == HandManager.ROUNDS:
+            # board cards revealed when the betting stopped
+            known = self._round_to_comm_cards[max(0, self._round_num - 1)]
             self._round_num = HandManager.ROUNDS + 1
-            self._winners = self._showdown()
+            if known < HandManager.COMM_CARDS:
+                self._all_in_known = known
+            if self._all_in_known is not None and self._all_in_settlement is not None:
+                self._winners = self._all_in_showdown(known)
+            else:
+                self._winners = self._showdown()
         else:
             return False
+        if self._recorder is not None:
+            self._recorder.end_hand(self)
         return True
 
     @property
@@ -344,6 +427,18 @@ class HandManager:
             raise ValueError("Game has not ended yet")
         return self._winners
 
+    @property
+    def players(self) -> list[Player]:
+        return self._players
+
+    @property
+    def small_blind_player_pos(self) -> int:
+        return self._small_blind_player_pos
+
+    @property
+    def blinds(self) -> list[int]:
+        return self._blinds
+
     @property
     def players_balance(self) -> list[int]:
         return [player.balance for player in self._players]
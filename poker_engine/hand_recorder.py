@@ -0,0 +1,18 @@
+from abc import ABC
+
+class HandRecorder(ABC):
+    '''
+    Observer notified by HandManager as a hand is played, see
+    hand_history.HandHistoryWriter. Methods default to no-ops.
+    '''
+    def start_hand(self, hand: "HandManager"):
+        '''Called once the cards are dealt and the blinds posted'''
+        pass
+
+    def record_action(self, hand: "HandManager", seat: int, user_option: dict):
+        '''Called after a player's action has been applied'''
+        pass
+
+    def end_hand(self, hand: "HandManager"):
+        '''Called once the hand is settled'''
+        pass
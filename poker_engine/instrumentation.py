@@ -0,0 +1,259 @@
+'''
+Opt-in profiling of the engine's hot paths.
+
+enable() swaps the registered functions for timing and counting wrappers and
+disable() puts the originals back, so nothing is measured, and nothing is paid,
+unless profiling is on. Code holding its own reference to a function (eg
+from module import function) is not instrumented.
+
+Phases (wall time per call): deal (HandManager construction), options,
+action (applying a player's choice), showdown (hand evaluation), pot_distribution
+(including the all_in_settlement of a hand ending all in, whose runouts are not
+counted as showdowns), decision (a betting round waiting on the player, ie the bot or callback) and
+equity (poker_bot equity computations, registered by poker_bot itself).
+Counters: hands, actions, showdowns, evaluator_calls, equity_samples,
+equity_cache_hits and equity_cache_misses.
+
+    instrumentation.enable()
+    ...
+    print(instrumentation.snapshot())
+    with instrumentation.Exporter("tables.prom", interval=10):  # or format="jsonl"
+        ...
+'''
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any, Optional
+from . import evaluate_hand
+from .hand_manager import HandManager
+
+# upper bounds of the latency histogram buckets, in nanoseconds (the last one is +Inf)
+BUCKETS_NS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+FORMATS = ("prometheus", "jsonl")
+
+class _Phase:
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = self.total_ns = self.max_ns = 0
+        self.buckets = [0] * (len(BUCKETS_NS) + 1)
+
+    def record(self, elapsed_ns: int):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[bisect_left(BUCKETS_NS, elapsed_ns)] += 1
+
+_phases: defaultdict[str, _Phase] = defaultdict(_Phase)
+_counters: defaultdict[str, int] = defaultdict(int)
+_targets: list[tuple[Any, str, dict]] = []
+_originals: dict[tuple[int, str], tuple[Any, Any]] = {} # patched (owner, name) -> (owner, original)
+
+def _wrap(function: Callable, phase: Optional[str], suspended_phase: Optional[str],
+          counters: dict[str, Callable]) -> Callable:
+    perf_counter_ns = time.perf_counter_ns
+    def count(result, args, kwargs):
+        for counter, amount in counters.items():
+            _counters[counter] += amount(result, *args, **kwargs)
+
+    if inspect.isgeneratorfunction(function):
+        # phase is the time spent inside the generator, suspended_phase each wait at a yield
+        @functools.wraps(function)
+        def generator_wrapper(*args, **kwargs):
+            inner = function(*args, **kwargs)
+            busy, value = 0, None
+            try:
+                while True:
+                    start = perf_counter_ns()
+                    try:
+                        item = inner.send(value)
+                    except StopIteration as e:
+                        busy += perf_counter_ns() - start
+                        count(e.value, args, kwargs)
+                        return e.value
+                    busy += perf_counter_ns() - start
+                    start = perf_counter_ns()
+                    value = yield item
+                    if suspended_phase is not None:
+                        _phases[suspended_phase].record(perf_counter_ns() - start)
+            finally:
+                inner.close()
+                if phase is not None:
+                    _phases[phase].record(busy)
+        return generator_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        result = function(*args, **kwargs)
+        if phase is not None:
+            _phases[phase].record(perf_counter_ns() - start)
+        count(result, args, kwargs)
+        return result
+    return wrapper
+
+def _patch(owner: Any, name: str, spec: dict):
+    original = inspect.getattr_static(owner, name)
+    if isinstance(original, (staticmethod, classmethod)):
+        wrapped = type(original)(_wrap(original.__func__, **spec))
+    else:
+        wrapped = _wrap(original, **spec)
+    _originals[id(owner), name] = (owner, original)
+    setattr(owner, name, wrapped)
+
+def _once(*_, **__) -> int:
+    return 1
+
+def register(owner: Any, name: str, phase: Optional[str] = None,
+             suspended_phase: Optional[str] = None,
+             counters: Optional[dict[str, Callable[..., int]]] = None):
+    '''
+    Instruments owner.name (a class or module attribute) while profiling is
+    enabled: its calls are timed as phase and each counter is increased by
+    amount(result, *args, **kwargs). For generator functions phase is the time
+    spent inside the generator and suspended_phase every wait at a yield.
+    '''
+    spec = {"phase": phase, "suspended_phase": suspended_phase, "counters": counters or {}}
+    _targets.append((owner, name, spec))
+    if _originals:
+        _patch(owner, name, spec)
+
+def enable():
+    if _originals:
+        return
+    for owner, name, spec in _targets:
+        _patch(owner, name, spec)
+
+def disable():
+    for (_, name), (owner, original) in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+class profiling:
+    '''Context manager enabling profiling for its block (reset first if reset=True)'''
+    def __init__(self, reset: bool = False):
+        self._reset = reset
+
+    def __enter__(self):
+        if self._reset:
+            reset()
+        enable()
+        return self
+
+    def __exit__(self, *_):
+        disable()
+
+def reset():
+    _phases.clear()
+    _counters.clear()
+
+def snapshot() -> dict:
+    '''Counters and per phase timings recorded so far, as a plain dict'''
+    return {
+        "timestamp": time.time(),
+        "counters": dict(_counters),
+        "phases": {
+            name: {
+                "count": phase.count,
+                "total_s": phase.total_ns / 1e9,
+                "mean_us": phase.total_ns / phase.count / 1e3 if phase.count else 0.0,
+                "max_us": phase.max_ns / 1e3,
+                "buckets": list(phase.buckets)
+            }
+            for name, phase in list(_phases.items())
+        }
+    }
+
+def to_prometheus(state: Optional[dict] = None, prefix: str = "poker_engine") -> str:
+    '''Prometheus text exposition format of a snapshot (the current one by default)'''
+    state = state or snapshot()
+    lines = []
+    for counter, value in sorted(state["counters"].items()):
+        lines += [f"# TYPE {prefix}_{counter}_total counter", f"{prefix}_{counter}_total {value}"]
+    histogram = f"{prefix}_phase_seconds"
+    lines.append(f"# TYPE {histogram} histogram")
+    for name, phase in sorted(state["phases"].items()):
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS_NS + (None,), phase["buckets"]):
+            cumulative += bucket
+            le = "+Inf" if bound is None else f"{bound / 1e9:g}"
+            lines.append(f'{histogram}_bucket{{phase="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{histogram}_sum{{phase="{name}"}} {phase["total_s"]:.9f}')
+        lines.append(f'{histogram}_count{{phase="{name}"}} {phase["count"]}')
+    lines.append(f"# TYPE {prefix}_phase_max_seconds gauge")
+    for name, phase in sorted(state["phases"].items()):
+        lines.append(f'{prefix}_phase_max_seconds{{phase="{name}"}} {phase["max_us"] / 1e6:.9f}')
+    return "\n".join(lines) + "\n"
+
+def to_json(state: Optional[dict] = None) -> str:
+    '''One JSON line of a snapshot (the current one by default)'''
+    return json.dumps(state or snapshot(), separators=(',', ':'))
+
+class Exporter:
+    '''
+    Writes a snapshot to path every interval seconds from a daemon thread, and
+    once more on stop. "prometheus" replaces the file atomically (for a textfile
+    collector), "jsonl" appends one line per export.
+    '''
+    def __init__(self, path: str, interval: float = 10.0, format: str = "prometheus"):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format}, expected one of {FORMATS}")
+        self.path = path
+        self.interval = interval
+        self.format = format
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self):
+        if self.format == "jsonl":
+            with open(self.path, "a") as f:
+                f.write(to_json() + "\n")
+        else:
+            temp = f"{self.path}.tmp"
+            with open(temp, "w") as f:
+                f.write(to_prometheus())
+            os.replace(temp, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def start(self) -> "Exporter":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="instrumentation-exporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.export()
+
+    def __enter__(self) -> "Exporter":
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+register(HandManager, "__init__", "deal", counters={"hands": _once})
+register(HandManager, "_get_available_options", "options")
+register(HandManager, "_handle_user_option", "action", counters={"actions": _once})
+register(HandManager, "betting_round", suspended_phase="decision")
+register(HandManager, "_showdown", counters={"showdowns": _once})
+register(HandManager, "_pot_distribution", "pot_distribution")
+register(HandManager, "_all_in_showdown", counters={"showdowns": _once})
+register(HandManager, "_all_in_distribution", "pot_distribution")
+register(evaluate_hand, "get_players_strength", "showdown", counters={"evaluator_calls": _once})
+register(evaluate_hand, "get_masks_strength", "showdown", counters={"evaluator_calls": _once})
@@ -1,10 +1,14 @@
 from .cards import Card
+from .card_mask import CardMask
+from .status_view import StatusView
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Hashable, Optional
 
 '''Assume use is single threaded (so no need for id_lock)'''
 class Player:
+    __slots__ = ("balance", "id", "initial_balance", "money_in", "hands", "hands_mask",
+                 "folded", "gone_max", "_public_status", "_private_status")
     _next_id = 0
     @classmethod
     def new_id(cls) -> int:
@@ -14,26 +18,54 @@ class Player:
         self.initial_balance: int = self.balance
         self.money_in: int = 0
         self.hands: Optional[tuple[Card]] = None
+        self.hands_mask: Optional[CardMask] = None
         self.folded: bool = False
         self.gone_max: bool = False
         
     def __init__(self, initial_balance: int):
         self.balance: int = initial_balance
         self.id = Player.new_id()
+        self._public_status: Optional[StatusView] = None
+        self._private_status: Optional[StatusView] = None
         self.reset_round()
 
+    _STATUS_FIELDS = {
+        'id': lambda player: player.id,
+        'balance': lambda player: player.balance,
+        'money_in': lambda player: player.money_in,
+        'folded': lambda player: player.folded,
+        'gone_max': lambda player: player.gone_max,
+        'initial_balance': lambda player: player.initial_balance
+    }
+    _PRIVATE_STATUS_FIELDS = {**_STATUS_FIELDS, 'hands': lambda player: player.hands}
+
+    @property
+    def public_status(self) -> StatusView:
+        '''Live read-only view (created once per player), snapshot() for a dict copy'''
+        if self._public_status is None:
+            self._public_status = StatusView(self, Player._STATUS_FIELDS)
+        return self._public_status
+
     @property
-    def public_status(self) -> dict:
-        return {
-            'id': self.id,
-            'balance': self.balance,
-            'money_in': self.money_in,
-            'folded': self.folded,
-            'gone_max': self.gone_max,
-            'initial_balance': self.initial_balance
-        }
+    def private_status(self) -> StatusView:
+        '''public_status with the player's hands, only for the player themselves'''
+        if self._private_status is None:
+            self._private_status = StatusView(self, Player._PRIVATE_STATUS_FIELDS)
+        return self._private_status
+
+    def __getstate__(self):
+        # status views hold the field lambdas, they are recreated on demand instead
+        state = dict(getattr(self, "__dict__", ()))
+        state.update((slot, getattr(self, slot)) for slot in Player.__slots__)
+        state["_public_status"] = state["_private_status"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
 
 class AutonomousPlayer(Player):
+    __slots__ = ()
     @abstractmethod
     def make_decision(self, state: dict, hand_status: dict, game_status: dict) -> dict:
         ''' 
@@ -43,11 +75,36 @@ class AutonomousPlayer(Player):
         hand_status: 
         - "round_num", "revealed_comm_cards", "pot_size", "players_in", "current_player_pos"
         game_status: 
-        - "players_info" (list of player statuses), "small_blind_player_pos",
+        - "players_info" (tuple of player status views), "small_blind_player_pos",
           "blinds", "game_num"
+        hand_status and game_status are live read-only views (see StatusView), use
+        their snapshot() to keep a copy
         '''
         pass
 
+class BatchedPlayer(AutonomousPlayer):
+    '''
+    Bot that decides for many seats at once: BatchGameRunner collects the pending
+    decisions of all seats with the same batch_key() across its tables and hands
+    them to make_decisions of one of those players, so equity or model inference
+    can be vectorised. Played one decision at a time elsewhere (GameRunner).
+    '''
+    __slots__ = ()
+    def batch_key(self) -> Hashable:
+        '''Seats with equal keys are decided together, by default per class'''
+        return type(self)
+
+    @abstractmethod
+    def make_decisions(self, decisions: list[tuple["BatchedPlayer", dict, dict, dict]]) -> list[dict]:
+        '''
+        decisions - (player, state, hand_status, game_status) per pending seat, same
+        arguments as make_decision. Returns the user dicts in the same order.
+        '''
+        pass
+
+    def make_decision(self, state: dict, hand_status: dict, game_status: dict) -> dict:
+        return self.make_decisions([(self, state, hand_status, game_status)])[0]
+
 class PlayerStats:
     player_id: int
     
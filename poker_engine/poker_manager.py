@@ -1,5 +1,5 @@
 from .hand_manager import HandManager
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 from typing import Optional
 from .players import *
 
@@ -16,33 +16,76 @@ Post-flop (Flop/Turn/River)
 '''
 from .cards import Card
 from .hand_manager import HandManager
+from .status_view import StatusView
+from .rng import RNG
+from .hand_recorder import HandRecorder
+from .all_in_settlement import AllInSettlement
 
 class PokerManager:
     def __init__(self, blinds : list[int],
                  players: list[Player],
-                 small_blind_i: int = 0):
+                 small_blind_i: int = 0,
+                 rng: Optional[RNG] = None,
+                 decks: Optional[Iterable[Sequence[int]]] = None,
+                 recorder: Optional[HandRecorder] = None,
+                 all_in_settlement: Optional[AllInSettlement] = None):
+        '''
+        rng - random.Random or numpy Generator used to deal every hand
+        decks - pre-shuffled decks (eg rng.deck_stream), one consumed per hand, takes
+        precedence over rng; when a finite decks runs out the game ends after its last hand
+        recorder - passed to every HandManager (eg hand_history.HandHistoryWriter)
+        all_in_settlement - passed to every HandManager (see all_in_settlement)
+        '''
         assert len(players) > 1
         assert len(blinds) == 2
         assert HandManager.COMM_CARDS + len(players) * HandManager.PLAYER_CARDS <= Card.DECK_SIZE
         self.players: list[Player] = players
         self.small_blind_player_pos = small_blind_i
         self.blinds = blinds
+        self.rng = rng
+        self._decks: Optional[Iterator[Sequence[int]]] = None if decks is None else iter(decks)
+        self.recorder = recorder
+        self.all_in_settlement = all_in_settlement
         self._game_num = 0
+        self._players_info: tuple[StatusView, ...] = ()
+        self._players_info_of: Optional[list[Player]] = None
+        self._status_view = StatusView(self, PokerManager._STATUS_FIELDS)
+
+    def _get_players_info(self) -> tuple[StatusView, ...]:
+        # the players' live status views, rebuilt only when the seated players change
+        if self._players_info_of is not self.players:
+            self._players_info_of = self.players
+            self._players_info = tuple(player.public_status for player in self.players)
+        return self._players_info
     
+    _STATUS_FIELDS = {
+        "players_info": lambda game: game._get_players_info(),
+        "small_blind_player_pos": lambda game: game.small_blind_player_pos,
+        "blinds": lambda game: game.blinds,
+        "game_num": lambda game: game._game_num
+    }
+
     @property
     def status(self) -> dict:
-        return {
-            "players_info": [player.public_status for player in self.players],
-            "small_blind_player_pos": self.small_blind_player_pos,
-            "blinds": self.blinds,
-            "game_num": self._game_num
-        }
+        return self._status_view.snapshot()
+
+    @property
+    def status_view(self) -> StatusView:
+        '''Live read-only view of status, fields computed on access'''
+        return self._status_view
     
     def advance(self) -> Generator[HandManager, None, None]:
         while len(self.players) > 1:
+            deck = None
+            if self._decks is not None:
+                deck = next(self._decks, None)
+                if deck is None:
+                    return
             new_hand = HandManager(
                 self.players,
-                self.small_blind_player_pos, self.blinds
+                self.small_blind_player_pos, self.blinds,
+                self.rng, deck,
+                self.recorder, self.all_in_settlement
             )
             yield new_hand
             self.update_for_new_round()
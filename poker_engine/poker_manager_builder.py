@@ -1,5 +1,8 @@
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Sequence
 from .poker_manager import PokerManager
+from .rng import RNG, make_rng
+from .hand_recorder import HandRecorder
+from .all_in_settlement import AllInSettlement
 from .hand_manager import HandManager
 from .players import Player
 
@@ -10,6 +13,10 @@ class PokerManagerBuilder:
         self._blinds: Optional[list[int]] = None
         self._players: list[int] = []
         self._small_blind_index: int = 0
+        self._rng: Optional[RNG] = None
+        self._decks: Optional[Iterable[Sequence[int]]] = None
+        self._recorder: Optional[HandRecorder] = None
+        self._all_in_settlement: Optional[AllInSettlement] = None
     
     def with_blinds(self, small_blind: int, big_blind: int) -> 'PokerManagerBuilder':
         """Set the blind amounts."""
@@ -56,6 +63,31 @@ class PokerManagerBuilder:
         self._small_blind_index = position
         return self
     
+    def with_seed(self, seed: int) -> 'PokerManagerBuilder':
+        """Deal from a random.Random seeded with seed, making games reproducible."""
+        self._rng = make_rng(seed)
+        return self
+
+    def with_rng(self, rng: RNG) -> 'PokerManagerBuilder':
+        """Deal from the given random.Random or numpy Generator."""
+        self._rng = rng
+        return self
+
+    def with_decks(self, decks: Iterable[Sequence[int]]) -> 'PokerManagerBuilder':
+        """Deal each hand from the next pre-shuffled deck (eg rng.deck_stream) until they run out."""
+        self._decks = decks
+        return self
+
+    def with_recorder(self, recorder: HandRecorder) -> 'PokerManagerBuilder':
+        """Notify recorder of every hand played (eg hand_history.HandHistoryWriter)."""
+        self._recorder = recorder
+        return self
+
+    def with_all_in_settlement(self, settlement: AllInSettlement) -> 'PokerManagerBuilder':
+        """Pay hands ending all in before the river with settlement (eg EquityChop())."""
+        self._all_in_settlement = settlement
+        return self
+
     def build(self) -> PokerManager:
         """Build and return the PokerManager instance."""
         self._validate()
@@ -63,7 +95,11 @@ class PokerManagerBuilder:
         return PokerManager(
             self._blinds,
             self._players,
-            self._small_blind_index
+            self._small_blind_index,
+            self._rng,
+            self._decks,
+            self._recorder,
+            self._all_in_settlement
         )
     
     def _validate(self) -> None:
@@ -0,0 +1,156 @@
+'''
+Integer side pot ledger of a hand, kept up to date as chips go in.
+
+Side pots are layers of the players' contributions: every all-in level is a cap,
+layer k holds the chips put in between caps[k - 1] and caps[k] (the last layer
+everything above the highest cap) and is contested by the players still in who
+put in more than caps[k - 1]. Adding chips only touches the layers they fill and
+a new cap splits one layer, so at showdown the pots already exist. The ledger
+also keeps, per layer, the players still in whose contribution ends in it, so
+settling needs no sort.
+
+Settlement is integer exact: a pot split between n winners gives each
+amount // n chips and the amount % n odd chips go one each to the winners
+nearest the small blind (clockwise). Chips put in above what anyone still in
+could contest (bets of players who folded later) go to the highest contested pot.
+'''
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+class PotLedger:
+    __slots__ = ("caps", "amounts", "contributions", "reached", "folded")
+
+    def __init__(self, player_num: int):
+        self.caps: list[int] = [] # distinct all-in levels, ascending
+        self.amounts: list[int] = [0] # chips per layer, len(caps) + 1
+        self.contributions: list[int] = [0] * player_num
+        # per layer, the positions still in whose contribution ends in it (the highest they reach)
+        self.reached: list[list[int]] = [[]]
+        self.folded: list[bool] = [False] * player_num
+
+    @property
+    def total(self) -> int:
+        return sum(self.amounts)
+
+    def add(self, pos: int, amount: int):
+        '''
+        Player pos puts amount more chips in, a negative amount takes them back
+        (a small blind calling a short all in big blind gets the excess back)
+        '''
+        contributions, caps, amounts = self.contributions, self.caps, self.amounts
+        start = contributions[pos]
+        end = contributions[pos] = start + amount
+        highest = caps[-1] if caps else 0
+        if amount > 0 and start >= highest:
+            amounts[-1] += amount # all above the highest all-in level, most bets
+            if start == highest and not self.folded[pos]: # was not in the top layer yet
+                if start:
+                    self.reached[-2].remove(pos)
+                self.reached[-1].append(pos)
+            return
+        if not self.folded[pos]:
+            if start:
+                self.reached[bisect_left(caps, start)].remove(pos)
+            if end:
+                self.reached[bisect_left(caps, end)].append(pos)
+        k = bisect_left(caps, start)
+        while start > end:
+            bottom = caps[k - 1] if k else 0
+            removed = start - max(end, bottom)
+            amounts[k] -= removed
+            start -= removed
+            k -= 1
+        k = bisect_right(caps, start)
+        while start < end:
+            top = caps[k] if k < len(caps) else end
+            filled = min(end, top) - start
+            amounts[k] += filled
+            start += filled
+            k += 1
+
+    def fold(self, pos: int):
+        '''Player pos folds, their chips stay in but they no longer contest any pot'''
+        self.folded[pos] = True
+        if self.contributions[pos]:
+            self.reached[bisect_left(self.caps, self.contributions[pos])].remove(pos)
+
+    def cap(self, level: int):
+        '''A player is all in having put in level chips: the layer around it is split'''
+        caps = self.caps
+        k = bisect_left(caps, level)
+        if not level or k < len(caps) and caps[k] == level:
+            return
+        bottom = caps[k - 1] if k else 0
+        below = sum(min(contribution, level) - min(contribution, bottom)
+                    for contribution in self.contributions if contribution > bottom)
+        caps.insert(k, level)
+        self.amounts.insert(k, below)
+        self.amounts[k + 1] -= below
+        layer, contributions = self.reached[k], self.contributions
+        self.reached.insert(k, [pos for pos in layer if contributions[pos] <= level])
+        self.reached[k + 1] = [pos for pos in layer if contributions[pos] > level]
+
+    def pots(self, in_hand: list[bool]) -> list[tuple[int, list[int]]]:
+        '''
+        (chips, positions contesting them in seat order) of every pot, main pot
+        first. in_hand[pos] is False for folded players, layers only they reached
+        are merged into the pot below as in settle.
+        '''
+        contributions = self.contributions
+        pots, carry = [], 0
+        for k in range(len(self.amounts) - 1, -1, -1):
+            bottom = self.caps[k - 1] if k else 0
+            amount = self.amounts[k] + carry
+            if not amount:
+                continue
+            contenders = [pos for pos, contribution in enumerate(contributions)
+                          if in_hand[pos] and contribution > bottom]
+            if not contenders:
+                carry = amount
+                continue
+            carry = 0
+            pots.append((amount, contenders))
+        pots.reverse()
+        return pots
+
+    def settle(self, strengths: list[Optional[object]], small_blind_pos: int
+               ) -> list[tuple[int, int, int]]:
+        '''
+        Splits every pot among its best contesting hands in one pass from the top
+        layer down. strengths - comparable per position (higher is better), None for
+        folded players (who must have been passed to fold). Returns (pot index from
+        the main pot, position, chips won), main pot first.
+        '''
+        amounts, reached = self.amounts, self.reached
+        # the layers above the highest one reached by a contender only had folded
+        # players in them and go to it, every non-empty layer up to it is a pot
+        top = len(amounts) - 1
+        while top and not reached[top]:
+            top -= 1
+        amount = sum(amounts[top:])
+        pot = top + 1 - amounts[:top].count(0) - (not amount)
+        best, winners = None, []
+        payouts = []
+        for k in range(top, -1, -1):
+            for pos in reached[k]:
+                strength = strengths[pos]
+                if best is None or strength > best:
+                    best, winners = strength, [pos]
+                elif strength == best:
+                    winners.append(pos)
+            if k < top:
+                amount = amounts[k]
+            if not amount:
+                continue
+            pot -= 1
+            if len(winners) == 1:
+                payouts.append((pot, winners[0], amount))
+                continue
+            share, odd = divmod(amount, len(winners))
+            if odd:
+                player_num = len(strengths)
+                winners.sort(key=lambda pos: (pos - small_blind_pos) % player_num)
+            payouts.extend((pot, pos, share + (i < odd)) for i, pos in reversed(list(enumerate(winners))))
+        # walked from the top pot down
+        payouts.reverse()
+        return payouts
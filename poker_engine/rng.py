@@ -0,0 +1,45 @@
+'''
+Random number generation helpers for reproducible dealing.
+
+Anything that deals cards takes an optional rng, either a random.Random or a
+numpy.random.Generator. None falls back to the global random module, which is
+not reproducible across parallel workers.
+For bulk simulations whole batches of shuffled decks can be pre-generated with
+NumPy (shuffled_decks / deck_stream) and fed to PokerManager through decks.
+'''
+import hashlib
+import random
+from collections.abc import Iterator
+from typing import Any, Optional, Union
+from .cards import Card
+
+RNG = Union[random.Random, Any] # Any covers numpy.random.Generator without importing numpy
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    return random.Random(seed)
+
+def derive_seed(seed: int, *keys) -> int:
+    '''
+    Deterministic 64-bit seed for an independent stream, eg derive_seed(seed, table_index)
+    '''
+    data = ':'.join(map(str, (seed, *keys))).encode()
+    return int.from_bytes(hashlib.sha256(data).digest()[:8], "big")
+
+def deal_ids(rng: Optional[RNG], count: int) -> list[int]:
+    '''count distinct random card ids'''
+    if rng is None:
+        return random.sample(Card.ALL_CARDS_ID, count)
+    if isinstance(rng, random.Random):
+        return rng.sample(Card.ALL_CARDS_ID, count)
+    return rng.choice(Card.DECK_SIZE, count, replace=False).tolist() # numpy Generator
+
+def shuffled_decks(count: int, generator):
+    '''(count, 52) int8 numpy array, one shuffled deck per row'''
+    import numpy as np
+    decks = np.tile(np.arange(Card.DECK_SIZE, dtype=np.int8), (count, 1))
+    return generator.permuted(decks, axis=1)
+
+def deck_stream(generator, batch_size: int = 4096) -> Iterator[list[int]]:
+    '''Endless stream of shuffled decks, generated batch_size at a time'''
+    while True:
+        yield from shuffled_decks(batch_size, generator).tolist()
@@ -0,0 +1,76 @@
+'''
+Headless simulation of bot-only games.
+
+SimulationRunner plays complete hands between AutonomousPlayer bots without any
+callbacks. Like GameRunner.play_game, bots receive the live
+HandManager.status_view and PokerManager.status_view, which only compute the
+fields the bot reads, but no player_status or callback plumbing is done per
+decision. Given the same seed and bots, the outcome is identical to the callback path.
+'''
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Optional
+from .poker_manager import PokerManager
+from .hand_manager import HandManager
+from .players import AutonomousPlayer
+
+@dataclass
+class SimulationResult:
+    hands_played: int = 0
+    decisions: int = 0
+    elapsed: float = 0.0
+    # player id -> balance at the end of the simulation (including busted players)
+    balances: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands_played / self.elapsed if self.elapsed else 0.0
+
+class SimulationRunner:
+    def __init__(self, poker_manager: PokerManager):
+        for player in poker_manager.players:
+            if not isinstance(player, AutonomousPlayer):
+                raise ValueError(f"Player {player.id} is not an AutonomousPlayer")
+        self.game: PokerManager = poker_manager
+
+    def run(self, max_hands: Optional[int] = None, seed: Optional[int] = None,
+            on_hand_end: Optional[Callable[[HandManager], Optional[bool]]] = None) -> SimulationResult:
+        '''
+        Plays until max_hands have been played or a single player is left.
+        seed seeds the random module before the first hand, which bots drawing from
+        it and a PokerManager without its own rng use (for bit-for-bit comparison
+        with GameRunner.play_game seeded the same way).
+        on_hand_end is called with each settled hand, before busted players are
+        removed from the game, and stops the run after that hand by returning False.
+        '''
+        if seed is not None:
+            random.seed(seed)
+        players = list(self.game.players) # busted players are dropped from the game
+        game_status = self.game.status_view
+        result = SimulationResult()
+        start = time.perf_counter()
+        if max_hands != 0:
+            for hand in self.game.advance():
+                hand_status = hand.status_view
+                while not hand.is_complete():
+                    curr_round = hand.betting_round()
+                    state = next(curr_round)
+                    while True:
+                        player: AutonomousPlayer = state.pop("player")
+                        result.decisions += 1
+                        try:
+                            state = curr_round.send(
+                                player.make_decision(state, hand_status, game_status)
+                            )
+                        except StopIteration:
+                            break
+                result.hands_played += 1
+                if on_hand_end and on_hand_end(hand) is False:
+                    break
+                if result.hands_played == max_hands:
+                    break
+        result.elapsed = time.perf_counter() - start
+        result.balances = {player.id: player.balance for player in players}
+        return result
@@ -0,0 +1,284 @@
+'''
+Multiprocess simulation farm: shards independent bot-only tables across a
+ProcessPoolExecutor and aggregates results in the parent as tables finish.
+
+- Bots are shipped by import path ("package.module:ClassName"), so any
+  AutonomousPlayer subclass importable by the workers can be used
+- Every table gets its own seed derived from the farm seed and the table index,
+  so a farm run is reproducible whatever the number of workers
+- Workers only send back per-bot running sums, the parent merges them into
+  chip deltas and bb/100 with a confidence interval per bot id
+
+Card luck dominates the results, two options cut the hands needed for a given
+confidence interval:
+- duplicate=True plays every table's deals once per rotation of the lineup
+  over the seats (each distinct seating once), so every bot is dealt every
+  seat's cards. A bot's sample is its result on one deal summed over the
+  rotations, in which the luck of the cards largely cancels out. A rotation
+  stops with the hand in which a player busts, as its later hands would no
+  longer match the other rotations' deals, and only deals played in every rotation count (use
+  rebuy=True to keep the full hands_per_table).
+- all_in_ev=True scores a hand ending all in with board cards to come by its
+  expected value over the rest of the board (HandManager.all_in_ev) instead of
+  the dealt runout. The difference has mean zero, so the win rates stay
+  unbiased while the runout luck is gone.
+rebuy=True tops every stack back up to its starting balance after each hand.
+'''
+import importlib
+import math
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Optional
+from .poker_manager import PokerManager
+from .hand_manager import HandManager
+from .simulation import SimulationRunner
+from .all_in_settlement import EquityChop
+from .rng import derive_seed, make_rng
+from . import evaluate_hand
+
+# boards EquityChop scores an all in hand with in all_in_ev mode: its sampling
+# noise is a 1 / ALL_IN_EV_BOARDS fraction of the runout's, at a fraction of the cost
+ALL_IN_EV_BOARDS = 300
+
+@dataclass(frozen=True)
+class BotSpec:
+    import_path: str # "package.module:ClassName" (or "package.module.ClassName")
+    balance: int
+    kwargs: dict = field(default_factory=dict)
+    name: Optional[str] = None # bot id results are aggregated under, defaults to import_path
+
+    @property
+    def bot_id(self) -> str:
+        return self.name or self.import_path
+
+@dataclass
+class BotStats:
+    '''
+    Running sums of a bot's chip deltas, one sample per hand or, in duplicate
+    mode, per deal (the sum of the bot's deltas over its hands on the deal)
+    '''
+    hands: int = 0
+    chips: int = 0
+    chips_sq: int = 0
+    samples: int = 0
+    hands_sq: int = 0
+    chips_hands: int = 0
+
+    def add(self, delta: int, hands: int = 1):
+        self.samples += 1
+        self.hands += hands
+        self.chips += delta
+        self.chips_sq += delta * delta
+        self.hands_sq += hands * hands
+        self.chips_hands += delta * hands
+
+    def merge(self, other: "BotStats"):
+        self.hands += other.hands
+        self.chips += other.chips
+        self.chips_sq += other.chips_sq
+        self.samples += other.samples
+        self.hands_sq += other.hands_sq
+        self.chips_hands += other.chips_hands
+
+    @property
+    def mean(self) -> float:
+        '''Chips won per hand'''
+        return self.chips / self.hands if self.hands else 0.0
+
+    @property
+    def std(self) -> float:
+        '''Standard deviation of a sample'''
+        if self.samples < 2:
+            return 0.0
+        variance = (self.chips_sq - self.chips * self.chips / self.samples) / (self.samples - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def standard_error(self) -> float:
+        '''
+        Of mean, as a ratio estimator (chips over hands) so that samples may cover
+        different numbers of hands, eg a bot's seats after one of them busted
+        '''
+        if self.samples < 2:
+            return 0.0
+        mean = self.mean
+        # sum over the samples of (delta - mean * hands) ** 2
+        residual = self.chips_sq - 2 * mean * self.chips_hands + mean * mean * self.hands_sq
+        variance = max(residual, 0.0) / (self.samples - 1)
+        return math.sqrt(variance * self.samples) / self.hands
+
+    def bb_per_100(self, big_blind: int) -> float:
+        return 100 * self.mean / big_blind
+
+    def bb_per_100_ci(self, big_blind: int, z: float = 1.96) -> tuple[float, float]:
+        '''Normal approximation confidence interval (95% by default)'''
+        half_width = z * self.standard_error * 100 / big_blind
+        centre = self.bb_per_100(big_blind)
+        return (centre - half_width, centre + half_width)
+
+@dataclass(frozen=True)
+class TableJob:
+    table_index: int
+    lineup: tuple[BotSpec, ...]
+    blinds: tuple[int, int]
+    hands: int
+    seed: int
+    evaluator: str = "table"
+    duplicate: bool = False
+    all_in_ev: bool = False
+    rebuy: bool = False
+
+@dataclass
+class TableResult:
+    table_index: int
+    hands_played: int
+    elapsed: float
+    stats: dict[str, BotStats]
+
+def load_class(import_path: str) -> type:
+    module_name, sep, class_name = import_path.partition(':')
+    if not sep:
+        module_name, _, class_name = import_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+def _play(job: TableJob, rotation: int) -> tuple[list[dict[str, list[int]]], int, float]:
+    # plays the table with the lineup rotated by rotation seats, returns for every
+    # hand each bot's [chips won, seats played], the hands played and the time taken
+    lineup = job.lineup[rotation:] + job.lineup[:rotation]
+    players = [load_class(spec.import_path)(spec.balance, **spec.kwargs) for spec in lineup]
+    bot_ids = {player.id: spec.bot_id for player, spec in zip(players, lineup)}
+    balances = {player.id: spec.balance for player, spec in zip(players, lineup)}
+    # independent streams for dealing and for bots drawing from the random module,
+    # the same in every rotation so that a seat is dealt the same cards in each
+    game = PokerManager(list(job.blinds), players, rng=make_rng(derive_seed(job.seed, "deal")))
+    settlement = EquityChop(ALL_IN_EV_BOARDS) if job.all_in_ev else None
+    hands: list[dict[str, list[int]]] = []
+
+    def on_hand_end(hand: HandManager) -> bool:
+        expected = None if settlement is None else hand.all_in_ev(settlement)
+        results: dict[str, list[int]] = {}
+        for pos, player in enumerate(hand.players):
+            if expected is None:
+                delta = player.balance - player.initial_balance
+            else:
+                delta = expected[pos] - player.money_in
+            result = results.setdefault(bot_ids[player.id], [0, 0])
+            result[0] += delta
+            result[1] += 1
+            if job.rebuy:
+                player.balance = balances[player.id]
+        hands.append(results)
+        # once a player busts the next deals no longer match the other rotations
+        return not (job.duplicate and any(player.balance == 0 for player in hand.players))
+
+    result = SimulationRunner(game).run(
+        job.hands, seed=derive_seed(job.seed, "bots"), on_hand_end=on_hand_end
+    )
+    return hands, result.hands_played, result.elapsed
+
+def run_table(job: TableJob) -> TableResult:
+    '''Worker entry point, also usable in-process'''
+    evaluate_hand.set_evaluator(job.evaluator)
+    stats: dict[str, BotStats] = {spec.bot_id: BotStats() for spec in job.lineup}
+    rotations = len(job.lineup) if job.duplicate else 1
+    hands_played, elapsed = 0, 0.0
+    deals: Optional[list[dict[str, list[int]]]] = None
+    seatings = set()
+    for rotation in range(rotations):
+        # a lineup with a period (eg two bots alternating) repeats its seatings,
+        # replaying one would only double its weight
+        seating = tuple(spec.bot_id for spec in job.lineup[rotation:] + job.lineup[:rotation])
+        if seating in seatings:
+            continue
+        seatings.add(seating)
+        hands, rotation_hands, rotation_elapsed = _play(job, rotation)
+        hands_played += rotation_hands
+        elapsed += rotation_elapsed
+        if deals is None:
+            deals = hands
+            continue
+        # a deal counts only if played in every rotation
+        del deals[len(hands):]
+        for deal, results in zip(deals, hands):
+            for bot_id, (chips, seats) in results.items():
+                total = deal.setdefault(bot_id, [0, 0])
+                total[0] += chips
+                total[1] += seats
+    # one sample per bot and hand (per deal in duplicate mode), its seats summed
+    for deal in deals:
+        for bot_id, (chips, seats) in deal.items():
+            stats[bot_id].add(chips, seats)
+    return TableResult(job.table_index, hands_played, elapsed, stats)
+
+@dataclass
+class FarmReport:
+    big_blind: int
+    tables: int = 0
+    hands: int = 0
+    elapsed: float = 0.0
+    stats: dict[str, BotStats] = field(default_factory=dict)
+
+    def add(self, table_result: TableResult):
+        self.tables += 1
+        self.hands += table_result.hands_played
+        for bot_id, bot_stats in table_result.stats.items():
+            self.stats.setdefault(bot_id, BotStats()).merge(bot_stats)
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> dict[str, dict]:
+        return {
+            bot_id: {
+                "hands": bot_stats.hands,
+                "samples": bot_stats.samples,
+                "chips": bot_stats.chips,
+                "bb_per_100": bot_stats.bb_per_100(self.big_blind),
+                "bb_per_100_ci": bot_stats.bb_per_100_ci(self.big_blind)
+            }
+            for bot_id, bot_stats in self.stats.items()
+        }
+
+class SimulationFarm:
+    def __init__(self, lineup: Sequence[BotSpec], blinds: tuple[int, int],
+                 tables: int, hands_per_table: int, seed: int = 0,
+                 max_workers: Optional[int] = None, evaluator: str = "table",
+                 duplicate: bool = False, all_in_ev: bool = False, rebuy: bool = False):
+        assert HandManager.MIN_PLAYERS <= len(lineup) <= HandManager.MAX_PLAYERS
+        self.lineup = tuple(lineup)
+        self.blinds = tuple(blinds)
+        self.tables = tables
+        self.hands_per_table = hands_per_table
+        self.seed = seed
+        self.max_workers = max_workers
+        self.evaluator = evaluator
+        self.duplicate = duplicate
+        self.all_in_ev = all_in_ev
+        self.rebuy = rebuy
+
+    def jobs(self) -> Iterator[TableJob]:
+        for table_index in range(self.tables):
+            yield TableJob(table_index, self.lineup, self.blinds, self.hands_per_table,
+                           derive_seed(self.seed, table_index), self.evaluator,
+                           self.duplicate, self.all_in_ev, self.rebuy)
+
+    def stream(self) -> Iterator[tuple[TableResult, FarmReport]]:
+        '''Yields each table result as it completes, with the report aggregated so far'''
+        report = FarmReport(self.blinds[1])
+        start = time.perf_counter()
+        with ProcessPoolExecutor(self.max_workers) as executor:
+            futures = [executor.submit(run_table, job) for job in self.jobs()]
+            for future in as_completed(futures):
+                table_result = future.result()
+                report.add(table_result)
+                report.elapsed = time.perf_counter() - start
+                yield table_result, report
+
+    def run(self) -> FarmReport:
+        report = FarmReport(self.blinds[1])
+        for _, report in self.stream():
+            pass
+        return report
@@ -0,0 +1,38 @@
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+class StatusView(Mapping):
+    '''
+    Read-only view with the same keys as a status dict, but each field is only
+    computed when it is accessed. One view is created per HandManager/PokerManager
+    and stays live, so it can be handed out on every decision without allocating.
+    Use snapshot() for a frozen dict copy.
+    '''
+    __slots__ = ("_source", "_fields")
+
+    def __init__(self, source: Any, fields: dict[str, Callable[[Any], Any]]):
+        self._source = source
+        self._fields = fields
+
+    def __getitem__(self, key: str) -> Any:
+        return self._fields[key](self._source)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def snapshot(self) -> dict:
+        return {key: _frozen(field(self._source)) for key, field in self._fields.items()}
+
+    def __repr__(self):
+        return f"StatusView({self.snapshot()})"
+
+def _frozen(value: Any) -> Any:
+    # nested views (eg players_info) are snapshotted too
+    if isinstance(value, StatusView):
+        return value.snapshot()
+    if isinstance(value, tuple) and value and isinstance(value[0], StatusView):
+        return [view.snapshot() for view in value]
+    return value
@@ -0,0 +1,200 @@
+"""
+Lookup-table hand evaluation, a drop-in backend for evaluate_hand.get_players_strength
+(select it with evaluate_hand.set_evaluator("table")).
+
+Every 5 to 7 card hand reduces to one of two table lookups:
+- Non-flush hands are keyed by their rank multiset, encoded as a base-5 number
+  (one digit per rank, since a rank appears at most 4 times).
+- Flush hands are keyed by the 13-bit rank mask of the flush suite. With at most
+  7 cards a flush can never coexist with a full house or four of a kind, so the
+  mask alone decides the hand.
+The tables are precomputed from the algorithmic evaluator in evaluate_hand when this
+module is first imported (~75k entries), so both backends return identical
+(HandRank, value) tuples.
+"""
+from collections.abc import Callable
+from itertools import combinations, combinations_with_replacement
+from typing import Iterable, Optional
+from .cards import Card
+from .card_mask import CARD_BITS, SUITE_SHIFT, RANK_MASK, suite_masks
+from .players import Player
+from .evaluate_hand import HandRank, _get_hand_strength
+
+_RANKS = len(Card.RANKS)
+_SUITES = len(Card.SUITES)
+_SUITE_BITS = 3 # enough to count up to 7 cards of one suite
+_MIN_CARDS, _MAX_CARDS = 5, 7
+
+# per card id contributions
+_CARD_RANK_KEY: list[int] = [5 ** (i // _SUITES) for i in Card.ALL_CARDS_ID]
+_CARD_SUITE_KEY: list[int] = [1 << (_SUITE_BITS * (i % _SUITES)) for i in Card.ALL_CARDS_ID]
+_CARD_RANK_BIT: list[int] = [1 << (i // _SUITES) for i in Card.ALL_CARDS_ID]
+# 13-bit suite lane of a CardMask -> sum of its rank keys
+_LANE_RANK_KEY: list[int] = [
+    sum(5 ** rank for rank in range(_RANKS) if mask >> rank & 1) for mask in range(1 << _RANKS)
+]
+# two card CardMask -> sum of its rank keys, for the 1326 hole card combinations
+_HOLE_RANK_KEY: dict[int, int] = {
+    CARD_BITS[id1] | CARD_BITS[id2]: _CARD_RANK_KEY[id1] + _CARD_RANK_KEY[id2]
+    for id1, id2 in combinations(Card.ALL_CARDS_ID, 2)
+}
+
+def _build_flush_suite_table() -> list[int]:
+    # suite counts key -> index of the suite with at least 5 cards, -1 if none
+    table = [-1] * (1 << (_SUITE_BITS * _SUITES))
+    digit_mask = (1 << _SUITE_BITS) - 1
+    for key in range(len(table)):
+        for suite in range(_SUITES):
+            if (key >> (_SUITE_BITS * suite)) & digit_mask >= 5:
+                table[key] = suite
+    return table
+
+def _build_rank_table() -> dict[int, tuple[HandRank, int]]:
+    table = {}
+    for card_num in range(_MIN_CARDS, _MAX_CARDS + 1):
+        for ranks in combinations_with_replacement(range(_RANKS), card_num):
+            rank_map: dict[int, int] = {}
+            for rank in ranks:
+                rank_map[rank] = rank_map.get(rank, 0) + 1
+            if max(rank_map.values()) > _SUITES:
+                continue
+            key = sum(5 ** rank for rank in ranks)
+            # an empty suite map means the algorithmic evaluator never considers a flush
+            table[key] = _get_hand_strength({}, rank_map)
+    return table
+
+def _build_flush_table() -> list[Optional[tuple[HandRank, int]]]:
+    table: list[Optional[tuple[HandRank, int]]] = [None] * (1 << _RANKS)
+    for mask in range(len(table)):
+        if not _MIN_CARDS <= mask.bit_count() <= _MAX_CARDS:
+            continue
+        ranks = {rank for rank in range(_RANKS) if mask >> rank & 1}
+        table[mask] = _get_hand_strength({'F': ranks}, dict.fromkeys(ranks, 1))
+    return table
+
+_FLUSH_SUITE: list[int] = _build_flush_suite_table()
+_RANK_TABLE: dict[int, tuple[HandRank, int]] = _build_rank_table()
+_FLUSH_TABLE: list[Optional[tuple[HandRank, int]]] = _build_flush_table()
+
+def evaluate_ids(card_ids: Iterable[int]) -> tuple[HandRank, int]:
+    '''Evaluate 5 to 7 distinct card ids'''
+    card_ids = tuple(card_ids)
+    rank_key = suite_key = 0
+    for card_id in card_ids:
+        rank_key += _CARD_RANK_KEY[card_id]
+        suite_key += _CARD_SUITE_KEY[card_id]
+    flush_suite = _FLUSH_SUITE[suite_key]
+    if flush_suite < 0:
+        return _RANK_TABLE[rank_key]
+    flush_mask = 0
+    for card_id in card_ids:
+        if card_id % _SUITES == flush_suite:
+            flush_mask |= _CARD_RANK_BIT[card_id]
+    return _FLUSH_TABLE[flush_mask]
+
+def evaluate_mask(mask: int) -> tuple[HandRank, int]:
+    '''Evaluate a CardMask (or plain int mask) of 5 to 7 cards'''
+    c, d, h, s = suite_masks(mask)
+    if c.bit_count() >= 5:
+        return _FLUSH_TABLE[c]
+    if d.bit_count() >= 5:
+        return _FLUSH_TABLE[d]
+    if h.bit_count() >= 5:
+        return _FLUSH_TABLE[h]
+    if s.bit_count() >= 5:
+        return _FLUSH_TABLE[s]
+    return _RANK_TABLE[_LANE_RANK_KEY[c] + _LANE_RANK_KEY[d] + _LANE_RANK_KEY[h] + _LANE_RANK_KEY[s]]
+
+def evaluate(cards: Iterable[Card]) -> tuple[HandRank, int]:
+    '''Evaluate 5 to 7 distinct cards'''
+    return evaluate_ids(card.id for card in cards)
+
+def get_players_strength(comm_cards: list[Card],
+                         players: list[Player]) -> list[Optional[tuple[HandRank, int]]]:
+    '''
+    Same contract as evaluate_hand.get_players_strength. The board keys are
+    accumulated once and each player only adds their two hole cards.
+    '''
+    board_ids = [card.id for card in comm_cards]
+    board_rank_key = board_suite_key = 0
+    for card_id in board_ids:
+        board_rank_key += _CARD_RANK_KEY[card_id]
+        board_suite_key += _CARD_SUITE_KEY[card_id]
+
+    player_strengths: list[Optional[tuple[HandRank, int]]] = []
+    for player in players:
+        if player.folded:
+            player_strengths.append(None)
+            continue
+        card1, card2 = player.hands
+        id1, id2 = card1.id, card2.id
+        flush_suite = _FLUSH_SUITE[
+            board_suite_key + _CARD_SUITE_KEY[id1] + _CARD_SUITE_KEY[id2]
+        ]
+        if flush_suite < 0:
+            player_strengths.append(_RANK_TABLE[
+                board_rank_key + _CARD_RANK_KEY[id1] + _CARD_RANK_KEY[id2]
+            ])
+            continue
+        flush_mask = 0
+        for card_id in (*board_ids, id1, id2):
+            if card_id % _SUITES == flush_suite:
+                flush_mask |= _CARD_RANK_BIT[card_id]
+        player_strengths.append(_FLUSH_TABLE[flush_mask])
+    return player_strengths
+
+def _board_keys(board: int) -> tuple[int, int, int]:
+    # rank key of the board, shift and lane of the suite it can still flush in
+    # (3 or more board cards, at most one suite), shift -1 if none
+    c, d, h, s = suite_masks(board)
+    rank_key = _LANE_RANK_KEY[c] + _LANE_RANK_KEY[d] + _LANE_RANK_KEY[h] + _LANE_RANK_KEY[s]
+    if c.bit_count() >= 3:
+        return rank_key, 0, c
+    if d.bit_count() >= 3:
+        return rank_key, SUITE_SHIFT, d
+    if h.bit_count() >= 3:
+        return rank_key, 2 * SUITE_SHIFT, h
+    if s.bit_count() >= 3:
+        return rank_key, 3 * SUITE_SHIFT, s
+    return rank_key, -1, 0
+
+def board_evaluator(board: int) -> Callable[[int], tuple[HandRank, int]]:
+    '''
+    Evaluator of hole card masks on a fixed board of 3 to 5 cards. The board's
+    rank key and the only suite it can still make a flush in are found once, so
+    a hand costs one rank table lookup plus, on boards with 3 or more cards of a
+    suite, a bit count of that suite's lane.
+    Hands other than two cards fall back to evaluate_mask.
+    '''
+    board = int(board) # plain int ops, CardMask.__or__ would allocate a CardMask per hand
+    board_rank_key, shift, flush_lane = _board_keys(board)
+    def evaluate(hand: int) -> tuple[HandRank, int]:
+        key = _HOLE_RANK_KEY.get(hand)
+        if key is None:
+            return evaluate_mask(board | hand)
+        # with 7 cards a flush beats anything the ranks alone can make
+        if shift >= 0 and (lane := flush_lane | hand >> shift & RANK_MASK).bit_count() >= 5:
+            return _FLUSH_TABLE[lane]
+        return _RANK_TABLE[board_rank_key + key]
+    return evaluate
+
+def get_masks_strength(board: int,
+                       hands: list[Optional[int]]) -> list[Optional[tuple[HandRank, int]]]:
+    '''
+    Same as get_players_strength with CardMask board and hands, None for folded
+    hands. The board work is shared as in board_evaluator.
+    '''
+    board = int(board)
+    board_rank_key, shift, flush_lane = _board_keys(board)
+    hole_rank_key, rank_table = _HOLE_RANK_KEY, _RANK_TABLE
+    strengths: list[Optional[tuple[HandRank, int]]] = []
+    for hand in hands:
+        if hand is None:
+            strengths.append(None)
+        elif (key := hole_rank_key.get(hand)) is None:
+            strengths.append(evaluate_mask(board | hand))
+        elif shift >= 0 and (lane := flush_lane | hand >> shift & RANK_MASK).bit_count() >= 5:
+            strengths.append(_FLUSH_TABLE[lane])
+        else:
+            strengths.append(rank_table[board_rank_key + key])
+    return strengths
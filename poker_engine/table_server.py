@@ -0,0 +1,292 @@
+'''
+Multi-table server: many PokerManager tables in one asyncio event loop, played by
+remote clients over a local TCP or Unix socket.
+
+Frames are a 4-byte big-endian length followed by a compact JSON object, "t"
+being the message type. A single connection may sit at several tables, every
+message carries its table.
+
+Client -> server
+- {"t": "join", "table": 0, "seat": 2, "token": null}  token from a previous
+  "joined" to reconnect to a running seat
+- {"t": "act", "table": 0, "seat": 2, "a": "R", "n": 20}  action code (F, C, A, R)
+  and raise amount
+Server -> client
+- {"t": "joined", "table", "seat", "token", "state"}  full public state
+- {"t": "cards", "table", "cards": [id, id]}  the seat's hole cards, each hand
+- {"t": "d", "table", ...}  state delta: only the public fields that changed
+  since the last push (hand, round, board, pot, turn and per seat
+  [balance, money_in, folded, gone_max] under "seats")
+- {"t": "turn", "table", "seat", "b", "o": [codes], "r": [min, max] | null}  your
+  move: current bet, available action codes and raise range
+- {"t": "hand", "table", "winners": [[seat, pot, balance], ...]}
+- {"t": "end", "table"} and {"t": "error", "msg"}
+Tables start once every seat has joined. A disconnected seat keeps its place:
+its turns time out (free check, else fold, see AsyncGameRunner) until it
+reconnects with its token, when it gets the full state, its cards and any
+pending turn (or the end of the table) again.
+'''
+import asyncio
+import json
+import secrets
+import struct
+from typing import Any, Optional
+from .action_type import ActionType
+from .async_game_runner import AsyncGameRunner
+from .players import Player
+from .poker_manager import PokerManager
+from .rng import derive_seed, make_rng
+
+FRAME = struct.Struct("!I")
+MAX_FRAME = 1 << 20
+
+_ACTION_CODES = {action.value: action for action in ActionType}
+
+def encode(message: dict) -> bytes:
+    body = json.dumps(message, separators=(',', ':')).encode()
+    return FRAME.pack(len(body)) + body
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[dict]:
+    '''
+    Next message, None once the peer has closed the connection. Raises ValueError
+    for a frame that is too large or not a JSON object.
+    '''
+    try:
+        header = await reader.readexactly(FRAME.size)
+        (size,) = FRAME.unpack(header)
+        if size > MAX_FRAME:
+            raise ValueError(f"Frame of {size} bytes is too large")
+        message = json.loads(await reader.readexactly(size))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    if not isinstance(message, dict):
+        raise ValueError("Frame is not a JSON object")
+    return message
+
+class _Seat:
+    __slots__ = ("player", "token", "writer", "pending", "turn")
+
+    def __init__(self, player: Player):
+        self.player = player
+        self.token: Optional[str] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Optional[asyncio.Future] = None
+        self.turn: Optional[dict] = None # last turn message, re-sent on reconnect
+
+    def send(self, data: bytes):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(data)
+
+class Table:
+    def __init__(self, table_id: int, seats: int, blinds: list[int], balance: int, seed: int,
+                 action_timeout: Optional[float] = None, max_hands: Optional[int] = None):
+        self.table_id = table_id
+        self.seats = [_Seat(Player(balance)) for _ in range(seats)]
+        self._seat_of = {seat.player.id: i for i, seat in enumerate(self.seats)}
+        self.game = PokerManager(list(blinds), [seat.player for seat in self.seats],
+                                 rng=make_rng(seed))
+        self.runner = AsyncGameRunner(self.game, action_timeout)
+        self.max_hands = max_hands
+        self.ready = asyncio.Event()
+        self.finished = False
+        self._hand_status = None
+        self._public: dict[str, Any] = {}
+
+    def public_state(self) -> dict:
+        game_status, hand_status = self.game.status_view, self._hand_status
+        state: dict[str, Any] = {
+            "hand": game_status["game_num"],
+            "seats": {str(i): [seat.player.balance, seat.player.money_in,
+                               seat.player.folded, seat.player.gone_max]
+                      for i, seat in enumerate(self.seats)}
+        }
+        if hand_status is not None:
+            state["round"] = hand_status["round_num"]
+            state["board"] = [card.id for card in hand_status["revealed_comm_cards"]]
+            state["pot"] = hand_status["pot_size"]
+            players = self.game.players
+            position = hand_status["current_player_pos"]
+            state["turn"] = self._seat_of[players[position].id] if position < len(players) else None
+        return state
+
+    def _broadcast(self, message: dict):
+        data = encode(message)
+        for seat in self.seats:
+            seat.send(data)
+
+    def push_delta(self, *_):
+        '''Sends the public fields changed since the last push to every seat'''
+        state = self.public_state()
+        delta: dict[str, Any] = {}
+        for key, value in state.items():
+            previous = self._public.get(key)
+            if key == "seats":
+                changed = {i: row for i, row in value.items()
+                           if previous is None or previous.get(i) != row}
+                if changed:
+                    delta[key] = changed
+            elif value != previous:
+                delta[key] = value
+        self._public = state
+        if delta:
+            delta.update(t="d", table=self.table_id)
+            self._broadcast(delta)
+
+    def _new_hand(self, hand_status, _):
+        self._hand_status = hand_status
+        for seat in self.seats:
+            if seat.player.hands is not None and seat.player in self.game.players:
+                seat.send(encode({"t": "cards", "table": self.table_id,
+                                  "cards": [card.id for card in seat.player.hands]}))
+        self.push_delta()
+
+    def _hand_end(self, winners, *_):
+        self.push_delta()
+        self._broadcast({
+            "t": "hand", "table": self.table_id,
+            "winners": [[self._seat_of[winner["id"]], winner["pot_count"], winner["new_balance"]]
+                        for winner in winners]
+        })
+
+    async def _on_turn(self, state: dict, *_) -> dict:
+        seat_index = self._seat_of[state["player_status"]["id"]]
+        seat = self.seats[seat_index]
+        options = state["options"]
+        seat.turn = {
+            "t": "turn", "table": self.table_id, "seat": seat_index, "b": state["current_bet"],
+            "o": [action.value for action in (ActionType.FOLD, ActionType.CALL, ActionType.ALL_IN)
+                  if options[action]],
+            "r": options[ActionType.RAISE]
+        }
+        self.push_delta()
+        seat.send(encode(seat.turn))
+        seat.pending = asyncio.get_running_loop().create_future()
+        try:
+            return await seat.pending
+        finally:
+            seat.pending = seat.turn = None
+
+    def act(self, seat_index: int, message: dict) -> Optional[str]:
+        '''Resolves the seat's pending turn, returns an error message if invalid'''
+        seat = self.seats[seat_index]
+        code = message.get("a")
+        action = _ACTION_CODES.get(code) if isinstance(code, str) else None
+        if seat.pending is None or seat.pending.done():
+            return "not your turn"
+        if action is None:
+            return "unknown action"
+        options = seat.turn
+        if action == ActionType.RAISE:
+            amount = message.get("n")
+            if options["r"] is None or not isinstance(amount, int) \
+              or not options["r"][0] <= amount <= options["r"][1]:
+                return "invalid raise"
+            seat.pending.set_result({"action": action, "amount": amount})
+        elif action.value not in options["o"]:
+            return "action not available"
+        else:
+            seat.pending.set_result({"action": action})
+        return None
+
+    def join(self, seat_index: int, token: Optional[str], writer: asyncio.StreamWriter) -> Optional[str]:
+        '''Takes or reconnects to a seat, returns an error message if refused'''
+        seat = self.seats[seat_index]
+        if seat.token is None:
+            seat.token = secrets.token_hex(8)
+        elif token != seat.token:
+            return "seat taken"
+        seat.writer = writer
+        seat.send(encode({"t": "joined", "table": self.table_id, "seat": seat_index,
+                          "token": seat.token, "state": self.public_state()}))
+        if self._hand_status is not None and seat.player.hands is not None \
+          and seat.player in self.game.players:
+            seat.send(encode({"t": "cards", "table": self.table_id,
+                              "cards": [card.id for card in seat.player.hands]}))
+        if seat.turn is not None:
+            seat.send(encode(seat.turn))
+        if self.finished:
+            seat.send(encode({"t": "end", "table": self.table_id}))
+        if all(seat.token is not None for seat in self.seats):
+            self.ready.set()
+        return None
+
+    def leave(self, writer: asyncio.StreamWriter):
+        for seat in self.seats:
+            if seat.writer is writer:
+                seat.writer = None
+
+    async def run(self):
+        await self.ready.wait()
+        self._public = {}
+        await self.runner.play_game(
+            self._on_turn, on_new_hand=self._new_hand, on_round_end=self.push_delta,
+            on_hand_end=self._hand_end, max_hands=self.max_hands
+        )
+        self.finished = True
+        self._broadcast({"t": "end", "table": self.table_id})
+
+class TableServer:
+    def __init__(self, tables: int, seats: int, blinds: tuple[int, int] = (5, 10),
+                 balance: int = 10_000, action_timeout: Optional[float] = 30.0,
+                 max_hands: Optional[int] = None, seed: int = 0):
+        self.tables = [
+            Table(i, seats, list(blinds), balance, derive_seed(seed, i), action_timeout, max_hands)
+            for i in range(tables)
+        ]
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._tasks: list[asyncio.Task] = []
+        self.connections = 0 # open client connections
+
+    async def start(self, path: Optional[str] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> asyncio.base_events.Server:
+        '''Listens on the Unix socket path if given, else on host:port (0 picks a free port)'''
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        self._tasks = [asyncio.create_task(table.run()) for table in self.tables]
+        return self._server
+
+    async def wait_finished(self):
+        await asyncio.gather(*self._tasks)
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        for task in self._tasks:
+            task.cancel()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        joined: set[int] = set()
+        self.connections += 1
+        try:
+            while (message := await read_message(reader)) is not None:
+                error = self._dispatch(message, writer, joined)
+                if error is not None:
+                    writer.write(encode({"t": "error", "msg": error, "req": message}))
+                await writer.drain()
+        except (ValueError, ConnectionError) as e:
+            writer.write(encode({"t": "error", "msg": str(e)}))
+        finally:
+            for table_id in joined:
+                self.tables[table_id].leave(writer)
+            self.connections -= 1
+            writer.close()
+
+    def _dispatch(self, message: dict, writer: asyncio.StreamWriter, joined: set[int]) -> Optional[str]:
+        table_id, seat_index = message.get("table"), message.get("seat")
+        if not isinstance(table_id, int) or not 0 <= table_id < len(self.tables):
+            return "unknown table"
+        table = self.tables[table_id]
+        if not isinstance(seat_index, int) or not 0 <= seat_index < len(table.seats):
+            return "unknown seat"
+        if message.get("t") == "join":
+            error = table.join(seat_index, message.get("token"), writer)
+            if error is None:
+                joined.add(table_id)
+            return error
+        if message.get("t") == "act":
+            if table.seats[seat_index].writer is not writer:
+                return "not your seat"
+            return table.act(seat_index, message)
+        return "unknown message type"
@@ -4,6 +4,7 @@ setup(
     name="wspokerengine",
     version="0.1.0",
     packages=find_packages(),
+    package_data={"poker_bot": ["data/*.bin"]},
     python_requires=">=3.8",
     author="Wesley Sze",
     description="A comprehensive Texas Hold'em poker engine",